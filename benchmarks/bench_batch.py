@@ -0,0 +1,69 @@
+"""
+Benchmark batch.BatchedGames against looping over Game objects, in actions per second.
+
+A random policy, batch.random_actions, picks one legal action per game per step, for the whole
+batch at once: pregame placements, rolls, robber moves and steals, and buying cities,
+settlements and roads, or ending the turn. The Game loop is given the same actions, see
+batch.apply_to_games. That both give the same games is checked by catan/test/test_batch.py.
+
+Both rates count the time taken to apply the actions only, not to choose them.
+
+Run from the repository root:
+    python -m benchmarks.bench_batch
+"""
+import logging
+import time
+
+import numpy
+
+from catan.batch import BatchedGames, apply_actions, apply_to_games, random_actions
+from catan.game import Game
+
+NUM_GAMES = 4096
+SCALAR_GAMES = 64
+STEPS = 300
+SEED = 0
+
+
+def measure_scalar():
+    rng = numpy.random.default_rng(SEED)
+    games = BatchedGames.random(SCALAR_GAMES, rng)
+    scalars = dict()
+    for i in range(SCALAR_GAMES):
+        scalars[i] = Game(board=games.board(i), logging='off')
+        scalars[i].start(Game.get_debug_players())
+    actions, elapsed = 0, 0.0
+    for _ in range(STEPS):
+        chosen = random_actions(games, rng, steal=False)
+        apply_actions(games, chosen)
+        start = time.perf_counter()
+        apply_to_games(scalars, chosen)
+        elapsed += time.perf_counter() - start
+        actions += sum(len(indexes) for _, indexes, _ in chosen)
+    return actions / elapsed
+
+
+def measure_batch():
+    rng = numpy.random.default_rng(SEED)
+    games = BatchedGames.random(NUM_GAMES, rng)
+    actions, elapsed = 0, 0.0
+    for _ in range(STEPS):
+        chosen = random_actions(games, rng)
+        start = time.perf_counter()
+        apply_actions(games, chosen)
+        elapsed += time.perf_counter() - start
+        actions += sum(len(indexes) for _, indexes, _ in chosen)
+    return actions / elapsed, games
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    scalar = measure_scalar()
+    batched, games = measure_batch()
+    print('Game loop:     {:>10.0f} actions/s'.format(scalar))
+    print('BatchedGames:  {:>10.0f} actions/s  ({} games, {:.0f}x)'.format(batched, NUM_GAMES, batched / scalar))
+    print('mean points after {} steps: {:.2f}'.format(STEPS, games.points().mean()))
+
+
+if __name__ == '__main__':
+    main()
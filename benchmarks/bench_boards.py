@@ -0,0 +1,63 @@
+"""
+Benchmark generating random board layouts, in boards per second: building a Board for each with
+boardbuilder.build, generating layouts with boardbuilder.generate_layouts, and generating them in
+NumPy blocks with boardbuilder.generate_layout_blocks. Also times building the Board for a layout,
+with Layout.board.
+
+Layouts have random terrain and random numbers.
+
+Run from the repository root:
+    python -m benchmarks.bench_boards
+"""
+import logging
+import time
+
+import numpy
+
+from catan import boardbuilder, streams
+from catan.boardbuilder import Opt
+
+NUM_BUILDS = 2000
+NUM_LAYOUTS = 200000
+NUM_BLOCK_LAYOUTS = 4000000
+BLOCK_SIZE = 4096
+SEED = 0
+OPTS = {'terrain': Opt.random, 'numbers': Opt.random}
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    rng = streams.RandomStream(SEED)
+    start = time.perf_counter()
+    for _ in range(NUM_BUILDS):
+        boardbuilder.build(dict(OPTS), rng=rng)
+    build = NUM_BUILDS / (time.perf_counter() - start)
+
+    layouts = boardbuilder.generate_layouts(OPTS['terrain'], OPTS['numbers'], rng=streams.RandomStream(SEED),
+                                            count=NUM_LAYOUTS)
+    start = time.perf_counter()
+    for layout in layouts:
+        pass
+    generated = NUM_LAYOUTS / (time.perf_counter() - start)
+
+    blocks = boardbuilder.generate_layout_blocks(BLOCK_SIZE, OPTS['terrain'], OPTS['numbers'],
+                                                 rng=numpy.random.default_rng(SEED), count=NUM_BLOCK_LAYOUTS)
+    start = time.perf_counter()
+    for terrain, numbers in blocks:
+        pass
+    blocked = NUM_BLOCK_LAYOUTS / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(NUM_BUILDS):
+        layout.board()
+    materialized = NUM_BUILDS / (time.perf_counter() - start)
+
+    print('boardbuilder.build:         {:>12.0f} boards/s'.format(build))
+    print('generate_layouts:           {:>12.0f} boards/s  ({:.0f}x)'.format(generated, generated / build))
+    print('generate_layout_blocks:     {:>12.0f} boards/s  ({:.0f}x, blocks of {})'.format(
+        blocked, blocked / build, BLOCK_SIZE))
+    print('Layout.board:               {:>12.0f} boards/s'.format(materialized))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark game actions with the catanlog off, on (CatanLog, writing on every action), and buffered
+(BufferedCatanLog, writing on a background thread).
+
+Each game plays the pregame and then random rolls, roads and turn ends, and ends with Game.end,
+which for the buffered log waits for a durable flush. Logs are written to a temporary directory.
+It reports actions per second and per-action latency percentiles.
+
+Run from the repository root:
+    python -m benchmarks.bench_catanlog
+"""
+import logging
+import os
+import random
+import tempfile
+import time
+
+from catan.game import Game
+from catan.pieces import PieceType
+
+NUM_GAMES = 20
+NUM_ACTIONS = 300
+SEED = 0
+
+
+def timed(latencies, action, *args):
+    start = time.perf_counter()
+    action(*args)
+    latencies.append(time.perf_counter() - start)
+
+
+def play(rng, log_mode, latencies):
+    game = Game(logging=log_mode)
+    timed(latencies, game.start, Game.get_debug_players())
+    for _ in range(8):
+        player = game.get_cur_player()
+        timed(latencies, game.place_settlement,
+              rng.choice(game.board.placement.legal_settlement_nodes(player, connected=False)))
+        timed(latencies, game.place_road, rng.choice(game.board.placement.legal_road_edges(player, pregame=True)))
+    for _ in range(NUM_ACTIONS):
+        player = game.get_cur_player()
+        edges = game.board.placement.legal_road_edges(player)
+        if game.state.can_roll():
+            timed(latencies, game.roll, rng.choice([2, 3, 4, 5, 6, 8, 9, 10, 11, 12]))
+        elif edges and rng.random() < 0.5:
+            timed(latencies, game.begin_placing, PieceType.road)
+            timed(latencies, game.place_road, rng.choice(edges))
+        else:
+            timed(latencies, game.end_turn)
+    timed(latencies, game.end)
+
+
+def measure(log_mode):
+    """
+    :return: actions per second, and the 50th, 99th and 99.9th percentile latency in seconds
+    """
+    rng = random.Random(SEED)
+    latencies = list()
+    start = time.perf_counter()
+    for _ in range(NUM_GAMES):
+        play(rng, log_mode, latencies)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    percentiles = [latencies[min(len(latencies) - 1, int(len(latencies) * p))] for p in (0.5, 0.99, 0.999)]
+    return len(latencies) / elapsed, percentiles
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as log_root:
+        print('games={}, actions per game={}'.format(NUM_GAMES, NUM_ACTIONS))
+        for log_mode in ('off', 'on', 'buffered'):
+            os.chdir(log_root)
+            os.makedirs(log_mode)
+            os.chdir(log_mode)
+            try:
+                rate, (p50, p99, p999) = measure(log_mode)
+            finally:
+                os.chdir(cwd)
+            print('logging={:<9} {:>8.0f} actions/s  p50={:>6.1f}us p99={:>7.1f}us p99.9={:>7.1f}us'.format(
+                log_mode, rate, p50 * 1e6, p99 * 1e6, p999 * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark the binary game codec against pickle: record size, encode rate and decode rate.
+
+Games are mid-game positions as in bench_snapshot. Decoding with the codec rebuilds the board's
+indexes, so it is timed separately from encoding, both into a new Game and into a reused one.
+
+Run from the repository root:
+    python -m benchmarks.bench_codec
+"""
+import logging
+import pickle
+import timeit
+
+from benchmarks.bench_snapshot import mid_game
+from catan import codec
+
+NUM_GAMES = 10
+NUMBER = 200
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    timings = {'codec encode': 0, 'codec decode': 0, 'codec decode into': 0, 'pickle dumps': 0, 'pickle loads': 0}
+    pickle_size = 0
+    for seed in range(NUM_GAMES):
+        game = mid_game(seed)
+        record = codec.encode_game(game)
+        pickled = pickle.dumps(game)
+        pickle_size += len(pickled)
+        assert codec.encode_game(codec.decode_game(record, players=game.players)) == record
+        timings['codec encode'] += timeit.timeit(lambda: codec.encode_game(game), number=NUMBER)
+        timings['codec decode'] += timeit.timeit(lambda: codec.decode_game(record, players=game.players),
+                                                 number=NUMBER)
+        into = codec.decode_game(record, players=game.players)
+        timings['codec decode into'] += timeit.timeit(
+            lambda: codec.decode_game(record, players=game.players, game=into), number=NUMBER)
+        timings['pickle dumps'] += timeit.timeit(lambda: pickle.dumps(game), number=NUMBER)
+        timings['pickle loads'] += timeit.timeit(lambda: pickle.loads(pickled), number=NUMBER)
+    runs = NUM_GAMES * NUMBER
+    print('games={}, runs per game={}'.format(NUM_GAMES, NUMBER))
+    print('codec record:  {:>10} bytes'.format(codec.GAME_RECORD_SIZE))
+    print('pickle:        {:>10.0f} bytes'.format(pickle_size / NUM_GAMES))
+    for name, elapsed in timings.items():
+        print('{:<18} {:>10.0f} games/s'.format(name + ':', runs / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark the game loop with many spectators attached, notified directly or through AsyncDispatcher.
+
+Each run plays the pregame and then random rolls, roads and turn ends, with NUM_SPECTATORS
+observers attached, NUM_SLOW of which take SLOW_SECONDS per notification. It reports how long the
+game loop spent on its actions, and, with the dispatcher, how long the spectators took to catch
+up and how many notifications were coalesced.
+
+Run from the repository root:
+    python -m benchmarks.bench_dispatch
+"""
+import asyncio
+import logging
+import random
+import time
+
+from catan.dispatch import AsyncDispatcher
+from catan.game import Game
+from catan.pieces import PieceType
+
+NUM_ACTIONS = 200
+NUM_SPECTATORS = 50
+NUM_SLOW = 5
+SLOW_SECONDS = 0.002
+SEED = 0
+
+
+class Spectator(object):
+    def __init__(self, slow):
+        self.slow = slow
+        self.seen_turn = None
+
+    def notify(self, game):
+        self.seen_turn = game._cur_turn
+        if self.slow:
+            time.sleep(SLOW_SECONDS)
+
+
+class AsyncSpectator(Spectator):
+    async def notify(self, game):
+        self.seen_turn = game._cur_turn
+        if self.slow:
+            await asyncio.sleep(SLOW_SECONDS)
+
+
+def spectators(cls):
+    return [cls(slow=i < NUM_SLOW) for i in range(NUM_SPECTATORS)]
+
+
+async def play(game, rng, num_actions):
+    """
+    Play, yielding to the event loop between actions as a game server would.
+
+    :return: seconds spent inside game actions
+    """
+    busy = 0
+    start = time.perf_counter()
+    game.start(Game.get_debug_players())
+    for _ in range(8):
+        player = game.get_cur_player()
+        with game.transaction():
+            game.place_settlement(rng.choice(game.board.placement.legal_settlement_nodes(player, connected=False)))
+            game.place_road(rng.choice(game.board.placement.legal_road_edges(player, pregame=True)))
+    busy += time.perf_counter() - start
+    for _ in range(num_actions):
+        start = time.perf_counter()
+        player = game.get_cur_player()
+        edges = game.board.placement.legal_road_edges(player)
+        if game.state.can_roll():
+            game.roll(rng.choice([2, 3, 4, 5, 6, 8, 9, 10, 11, 12]))
+        elif edges and rng.random() < 0.6:
+            game.begin_placing(PieceType.road)
+            game.place_road(rng.choice(edges))
+        else:
+            game.end_turn()
+        busy += time.perf_counter() - start
+        await asyncio.sleep(0)
+    return busy
+
+
+async def run_direct():
+    game = Game(logging='off')
+    game.observers.update(spectators(Spectator))
+    return await play(game, random.Random(SEED), NUM_ACTIONS)
+
+
+async def run_dispatched():
+    game = Game(logging='off')
+    dispatcher = AsyncDispatcher()
+    game.observers.add(dispatcher)
+    for spectator in spectators(AsyncSpectator):
+        dispatcher.add(spectator)
+    busy = await play(game, random.Random(SEED), NUM_ACTIONS)
+    start = time.perf_counter()
+    await dispatcher.drain()
+    catch_up = time.perf_counter() - start
+    stats = [dispatcher.stats(observer) for observer in dispatcher._subscribers]
+    await dispatcher.close()
+    return busy, catch_up, stats
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    direct = asyncio.run(run_direct())
+    dispatched, catch_up, stats = asyncio.run(run_dispatched())
+    slow = stats[:NUM_SLOW]
+    fast = stats[NUM_SLOW:]
+    print('actions={}, spectators={}, slow={} ({:.0f}ms per notification)'.format(
+        NUM_ACTIONS, NUM_SPECTATORS, NUM_SLOW, SLOW_SECONDS * 1e3))
+    print('direct notify:   {:>8.1f}ms in game actions'.format(direct * 1e3))
+    print('AsyncDispatcher: {:>8.1f}ms in game actions, {:.1f}ms for spectators to catch up'.format(
+        dispatched * 1e3, catch_up * 1e3))
+    for name, group in (('fast', fast), ('slow', slow)):
+        print('  {} spectator: {:>5.0f} delivered {:>5.0f} coalesced {:>5.0f} dropped'.format(
+            name, *[sum(s[i] for s in group) / len(group) for i in range(3)]))
+
+
+if __name__ == '__main__':
+    main()
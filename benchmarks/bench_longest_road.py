@@ -0,0 +1,75 @@
+"""
+Benchmark incremental longest road tracking against a full recompute, on dense late-game boards.
+
+Each board has 4 players with 3 settlements and 15 legally placed roads each.
+
+Run from the repository root:
+    python -m benchmarks.bench_longest_road
+"""
+import logging
+import random
+import timeit
+
+import hexgrid
+
+import catan.board
+from catan import longestroad
+from catan.game import Player
+from catan.pieces import Piece, PieceType
+from catan.production import NUM_SEATS
+
+NUM_BOARDS = 20
+NUMBER = 200
+
+
+def dense_board(seed):
+    rng = random.Random(seed)
+    board = catan.board.Board(pieces='empty')
+    players = [Player(seat, 'p{}'.format(seat), 'c{}'.format(seat)) for seat in range(1, 5)]
+    for _ in range(3):
+        for player in players:
+            nodes = board.placement.legal_settlement_nodes(player, connected=False)
+            board.place_piece(Piece(PieceType.settlement, player), rng.choice(nodes))
+    for _ in range(15):
+        for player in players:
+            edges = board.placement.legal_road_edges(player)
+            if edges:
+                board.place_piece(Piece(PieceType.road, player), rng.choice(edges))
+    return board, players
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    incremental = 0
+    full = 0
+    lengths = list()
+    for seed in range(NUM_BOARDS):
+        board, players = dense_board(seed)
+        player = players[seed % len(players)]
+        edge = board.placement.legal_road_edges(player)[0]
+        road = Piece(PieceType.road, player)
+
+        def place_and_remove():
+            board._set_piece(hexgrid.EDGE, edge, road)
+            board._set_piece(hexgrid.EDGE, edge, None)
+
+        def recompute():
+            board._piece_arrays[hexgrid.EDGE][edge] = road
+            longestroad.longest_road_lengths(board._piece_arrays)
+            board._piece_arrays[hexgrid.EDGE][edge] = None
+            longestroad.longest_road_lengths(board._piece_arrays)
+
+        incremental += timeit.timeit(place_and_remove, number=NUMBER)
+        full += timeit.timeit(recompute, number=NUMBER)
+        measured = [board.longest_road.length(seat_idx) for seat_idx in range(NUM_SEATS)]
+        assert measured == longestroad.longest_road_lengths(board._piece_arrays)
+        lengths.append(max(measured))
+    updates = NUM_BOARDS * NUMBER * 2
+    print('boards={}, mean longest road={:.1f}'.format(NUM_BOARDS, sum(lengths) / len(lengths)))
+    print('incremental update: {:>8.1f}us per road'.format(incremental / updates * 1e6))
+    print('full recompute:     {:>8.1f}us per road'.format(full / updates * 1e6))
+    print('speedup:            {:>8.1f}x'.format(full / incremental))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark replaying catanlogs with replay.replay, in events per second and games per second.
+
+Logs are made by playing random games with logging on, into a temporary directory, as in
+bench_catanlog.
+
+Run from the repository root:
+    python -m benchmarks.bench_replay
+"""
+import glob
+import logging
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_catanlog import play
+from catan import replay
+
+NUM_GAMES = 20
+REPEAT = 3
+SEED = 0
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as log_dir:
+        os.chdir(log_dir)
+        try:
+            rng = random.Random(SEED)
+            paths = list()
+            for i in range(NUM_GAMES):
+                play(rng, 'on', list())
+                # one game per file, whatever the timestamps
+                path = '{}.catan'.format(i)
+                os.rename(glob.glob(os.path.join('log', '*.catan'))[0], path)
+                paths.append(path)
+            events = 0
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                for path in paths:
+                    with replay.Replayer(path) as replayer:
+                        replayer.fast_forward()
+                        events += replayer.events
+            elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    print('games={}, events per game={:.0f}, repeat={}'.format(NUM_GAMES, events / REPEAT / NUM_GAMES, REPEAT))
+    print('replay: {:>8.0f} events/s {:>6.1f} games/s'.format(events / elapsed, NUM_GAMES * REPEAT / elapsed))
+
+
+if __name__ == '__main__':
+    main()
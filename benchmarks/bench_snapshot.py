@@ -0,0 +1,57 @@
+"""
+Benchmark Game.copy snapshots against copy.deepcopy, on mid-game states.
+
+Each game has 4 players with 3 settlements and 15 legally placed roads each. Besides plain
+snapshots, it times a snapshot followed by placing a road on it, which pays for the
+copy-on-write of the board.
+
+Run from the repository root:
+    python -m benchmarks.bench_snapshot
+"""
+import copy
+import logging
+import timeit
+
+from benchmarks.bench_longest_road import dense_board
+from catan.game import Game
+from catan.pieces import Piece, PieceType
+
+NUM_GAMES = 10
+NUMBER = 500
+
+
+def mid_game(seed):
+    board, players = dense_board(seed)
+    game = Game(players=players, board=board, logging='off')
+    game.set_players(players)
+    game.board.lock()
+    return game
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    snapshot = 0
+    deep = 0
+    snapshot_and_place = 0
+    for seed in range(NUM_GAMES):
+        game = mid_game(seed)
+        player = game.players[seed % len(game.players)]
+        edge = game.board.placement.legal_road_edges(player)[0]
+        road = Piece(PieceType.road, player)
+
+        def place():
+            game.copy().board.place_piece(road, edge)
+
+        snapshot += timeit.timeit(game.copy, number=NUMBER)
+        deep += timeit.timeit(lambda: copy.deepcopy(game), number=NUMBER)
+        snapshot_and_place += timeit.timeit(place, number=NUMBER)
+    copies = NUM_GAMES * NUMBER
+    print('games={}, copies per game={}'.format(NUM_GAMES, NUMBER))
+    print('Game.copy:          {:>10.0f} snapshots/s'.format(copies / snapshot))
+    print('Game.copy + road:   {:>10.0f} snapshots/s'.format(copies / snapshot_and_place))
+    print('copy.deepcopy:      {:>10.0f} snapshots/s'.format(copies / deep))
+    print('speedup:            {:>10.1f}x'.format(deep / snapshot))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark precomputed topology tables against the equivalent hexgrid calls.
+
+Run from the repository root:
+    python -m benchmarks.bench_topology
+"""
+import logging
+import timeit
+
+import hexgrid
+
+from catan import topology
+
+NUMBER = 20000
+
+
+def _bench(name, hexgrid_stmt, topology_stmt):
+    env = {'hexgrid': hexgrid, 'topology': topology}
+    old = timeit.timeit(hexgrid_stmt, globals=env, number=NUMBER) / NUMBER
+    new = timeit.timeit(topology_stmt, globals=env, number=NUMBER) / NUMBER
+    print('{:<28} hexgrid {:>9.3f}us  topology {:>8.3f}us  x{:.1f}'.format(
+        name, old * 1e6, new * 1e6, old / new))
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    _bench('nodes_touching_tile',
+           'hexgrid.nodes_touching_tile(10)',
+           'topology.NODES_TOUCHING_TILE[10]')
+    _bench('tile_id_to_coord',
+           'hexgrid.tile_id_to_coord(10)',
+           'topology.TILE_ID_TO_COORD[10]')
+    _bench('tile_id_from_coord',
+           'hexgrid.tile_id_from_coord(0x77)',
+           'topology.TILE_COORD_TO_ID[0x77]')
+    _bench('port nodes',
+           'hexgrid.nodes_touching_edge(hexgrid.edge_coord_in_direction(10, "NE"))',
+           'topology.NODES_TOUCHING_EDGE[topology.edge_coord_in_direction(10, "NE")]')
+    _bench('location(NODE)',
+           'hexgrid.location(hexgrid.NODE, 0x67)',
+           'topology.location(hexgrid.NODE, 0x67)')
+    _bench('legal_node_coords',
+           'hexgrid.legal_node_coords()',
+           'topology.NODE_COORDS')
+
+
+if __name__ == '__main__':
+    main()
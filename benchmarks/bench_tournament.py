@@ -0,0 +1,35 @@
+"""
+Benchmark tournament.run in games per second, with 1, 2, 4, ... up to os.cpu_count() worker
+processes, and the speedup over 1 worker.
+
+Run from the repository root:
+    python -m benchmarks.bench_tournament
+"""
+import os
+import tempfile
+import time
+
+from catan import tournament
+
+NUM_GAMES = 96
+AGENTS = ['catan.sim:random_agent'] * 4
+SEED = 0
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, cpus} | {2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus})
+    print('games={}, cpus={}'.format(NUM_GAMES, cpus))
+    base = None
+    with tempfile.TemporaryDirectory() as out_dir:
+        for workers in counts:
+            out = os.path.join(out_dir, 'results-{}.jsonl'.format(workers))
+            start = time.perf_counter()
+            tournament.run(AGENTS, NUM_GAMES, out, seed=SEED, workers=workers)
+            rate = NUM_GAMES / (time.perf_counter() - start)
+            base = base or rate
+            print('workers={:<3} {:>7.1f} games/s  speedup={:.2f}x'.format(workers, rate, rate / base))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark game actions per second with tracing off, and with tracing on into a ring buffer.
+
+Each game plays the pregame and then random rolls, robber moves, roads, settlements and turn
+ends. The root logger is left at its default level, WARNING, writing to os.devnull, so log
+records which pass the level are formatted and written as usual.
+
+Run from the repository root:
+    python -m benchmarks.bench_trace
+"""
+import logging
+import os
+import random
+import time
+
+from catan import trace
+from catan.game import Game
+from catan.pieces import PieceType
+
+NUM_GAMES = 20
+NUM_ACTIONS = 300
+REPEAT = 5
+SEED = 0
+
+
+def play(rng, num_actions):
+    """
+    :return: number of actions taken
+    """
+    game = Game(logging='off')
+    game.start(Game.get_debug_players())
+    actions = 1
+    for _ in range(8):
+        player = game.get_cur_player()
+        game.place_settlement(rng.choice(game.board.placement.legal_settlement_nodes(player, connected=False)))
+        game.place_road(rng.choice(game.board.placement.legal_road_edges(player, pregame=True)))
+        actions += 2
+    for _ in range(num_actions):
+        player = game.get_cur_player()
+        if game.state.can_roll():
+            game.roll(rng.choice([2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]))
+        elif game.state.can_move_robber():
+            game.move_robber(rng.choice([tile for tile in range(1, 20) if tile != game.robber_tile]))
+        elif game.state.can_steal():
+            victims = list(game.stealable_players())
+            game.steal(rng.choice(victims) if victims else None)
+        else:
+            nodes = game.board.placement.legal_settlement_nodes(player)
+            edges = game.board.placement.legal_road_edges(player)
+            if nodes and rng.random() < 0.3:
+                game.begin_placing(PieceType.settlement)
+                game.place_settlement(rng.choice(nodes))
+                actions += 1
+            elif edges and rng.random() < 0.5:
+                game.begin_placing(PieceType.road)
+                game.place_road(rng.choice(edges))
+                actions += 1
+            else:
+                game.end_turn()
+        actions += 1
+    return actions
+
+
+def measure():
+    """
+    :return: actions per second, best of REPEAT runs
+    """
+    best = 0
+    for _ in range(REPEAT):
+        rng = random.Random(SEED)
+        actions = 0
+        start = time.perf_counter()
+        for _ in range(NUM_GAMES):
+            actions += play(rng, NUM_ACTIONS)
+        best = max(best, actions / (time.perf_counter() - start))
+    return best
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING, stream=open(os.devnull, 'w'), force=True)
+    print('games={}, actions per game={}, best of {}'.format(NUM_GAMES, NUM_ACTIONS, REPEAT))
+    trace.disable()
+    print('tracing off:              {:>8.0f} actions/s'.format(measure()))
+    trace.enable(ring_size=trace.DEFAULT_RING_SIZE)
+    print('tracing on, ring buffer:  {:>8.0f} actions/s'.format(measure()))
+    trace.disable()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark undo history memory and undo latency, for the delta journal against whole-game snapshots.
+
+Each run plays the pregame and then random rolls, roads, settlements and turn ends, recording
+an undo step per action, then undoes every step through the undo manager. Three undo managers
+are compared:
+- undoredo.UndoManager, snapshotting with copy.deepcopy (the original Game.copy)
+- undoredo.UndoManager, snapshotting with the structural-sharing Game.copy
+- journal.UndoJournal, recording inverse deltas
+
+Run from the repository root:
+    python -m benchmarks.bench_undo
+"""
+import copy
+import gc
+import logging
+import random
+import time
+import tracemalloc
+
+import undoredo
+
+from catan import journal
+from catan.game import Game
+from catan.pieces import PieceType
+
+NUM_ACTIONS = 300
+SEED = 0
+
+
+class DeepCopyGame(Game):
+    def copy(self):
+        return copy.deepcopy(self)
+
+
+def play(game, rng, num_actions):
+    game.start(Game.get_debug_players())
+    for _ in range(8):
+        player = game.get_cur_player()
+        game.place_settlement(rng.choice(game.board.placement.legal_settlement_nodes(player, connected=False)))
+        game.place_road(rng.choice(game.board.placement.legal_road_edges(player, pregame=True)))
+    while len(game.undo_manager._undo_stack) < num_actions:
+        player = game.get_cur_player()
+        edges = game.board.placement.legal_road_edges(player)
+        nodes = game.board.placement.legal_settlement_nodes(player)
+        if game.state.can_roll():
+            game.roll(rng.choice([2, 3, 4, 5, 6, 8, 9, 10, 11, 12]))
+        elif nodes and rng.random() < 0.3:
+            game.begin_placing(PieceType.settlement)
+            game.place_settlement(rng.choice(nodes))
+        elif edges and rng.random() < 0.6:
+            game.begin_placing(PieceType.road)
+            game.place_road(rng.choice(edges))
+        else:
+            game.end_turn()
+
+
+def new_game(game_cls, undo_manager):
+    game = game_cls()
+    game.catanlog._auto_flush = False
+    game.undo_manager = undo_manager
+    return game
+
+
+def measure(game_cls, undo_manager_cls):
+    """
+    :return: undo steps recorded, history bytes per step, seconds per undo
+    """
+    undo_manager = undo_manager_cls()
+    game = new_game(game_cls, undo_manager)
+    gc.collect()
+    tracemalloc.start()
+    play(game, random.Random(SEED), NUM_ACTIONS)
+    gc.collect()
+    with_history = tracemalloc.get_traced_memory()[0]
+    steps = len(undo_manager._undo_stack)
+    undo_manager._undo_stack.clear()
+    gc.collect()
+    without_history = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    undo_manager = undo_manager_cls()
+    game = new_game(game_cls, undo_manager)
+    play(game, random.Random(SEED), NUM_ACTIONS)
+    start = time.perf_counter()
+    while undo_manager.can_undo():
+        undo_manager.undo()
+    elapsed = time.perf_counter() - start
+    return steps, (with_history - without_history) / steps, elapsed / steps
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    runs = (
+        ('UndoManager + deepcopy', DeepCopyGame, undoredo.UndoManager),
+        ('UndoManager + Game.copy', Game, undoredo.UndoManager),
+        ('UndoJournal', Game, journal.UndoJournal),
+    )
+    print('actions={}'.format(NUM_ACTIONS))
+    for name, game_cls, undo_manager_cls in runs:
+        steps, memory, latency = measure(game_cls, undo_manager_cls)
+        print('{:<24} steps={:>4} {:>9.0f} bytes/step {:>9.1f}us/undo'.format(
+            name, steps, memory, latency * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark validating catanlogs, in files per second: serially in this process, and with
+validate.validate_archive over 1 and os.cpu_count() worker processes.
+
+Logs are made by playing random games with logging on, into a temporary directory, as in
+bench_replay.
+
+Run from the repository root:
+    python -m benchmarks.bench_validate
+"""
+import glob
+import logging
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_catanlog import play
+from catan import validate
+
+NUM_GAMES = 40
+SEED = 0
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as log_dir:
+        os.chdir(log_dir)
+        try:
+            rng = random.Random(SEED)
+            paths = list()
+            for i in range(NUM_GAMES):
+                play(rng, 'on', list())
+                path = os.path.join(log_dir, '{}.catan'.format(i))
+                os.rename(glob.glob(os.path.join('log', '*.catan'))[0], path)
+                paths.append(path)
+
+            start = time.perf_counter()
+            verdicts = [validate.validate_file(path) for path in paths]
+            elapsed = time.perf_counter() - start
+            print('games={}, events per game={:.0f}, legal={}'.format(
+                NUM_GAMES, sum(v['events'] for v in verdicts) / NUM_GAMES,
+                sum(v['verdict'] == 'legal' for v in verdicts)))
+            print('serial:          {:>7.1f} files/s'.format(NUM_GAMES / elapsed))
+            for workers in sorted({1, os.cpu_count() or 1}):
+                out = os.path.join(log_dir, 'verdicts-{}.jsonl'.format(workers))
+                start = time.perf_counter()
+                validate.validate_archive(paths, out, workers=workers)
+                elapsed = time.perf_counter() - start
+                print('workers={:<3}     {:>7.1f} files/s'.format(workers, NUM_GAMES / elapsed))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    main()
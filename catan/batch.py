@@ -0,0 +1,569 @@
+"""
+module batch steps many games at once, holding their state as NumPy arrays with a row per game.
+
+class BatchedGames keeps N games as a structure of arrays:
+- terrain, numbers: (N, 19) tile terrain as an index into codec.TERRAIN, and dice numbers (0 for
+  none), tile i being tile id i+1
+- node_owner, node_level: (N, 54) seat index of the building on each node (-1 for none), and
+  1 for a settlement, 2 for a city, node i being topology.NODE_COORDS[i]
+- road_owner: (N, 72) seat index of the road on each edge (-1 for none), edge i being
+  topology.EDGE_COORDS[i]
+- robber: (N,) tile id of the robber
+- seat, turn: (N,) current player's seat index, and turns ended so far, as Game._cur_turn
+- state, placing: (N,) game state as an index into codec.GAME_STATES, and in the pregame the
+  piece being placed as an index into codec.PIECE_TYPES
+- hands: (N, NUM_SEATS, NUM_RESOURCES), as Game.hands
+
+Actions are applied to many games in one call, as vectorized operations: each takes an array of
+game indices and arrays of arguments, one per game. An action is only applied to the games in
+which it is legal. Games whose state doesn't allow it, see below, or whose placement is illegal,
+or who can't afford it, are left alone, and each action returns a bool array saying which games
+it was applied to.
+
+Each call takes a game at most once: a game takes one action at a time. Duplicate game indices
+raise a ValueError, since a NumPy update through repeated fancy indices keeps only one of them.
+
+Which actions each state allows is not written here. It is read from catan.states, by asking
+each state class's can_* methods once, see #capabilities. Placement follows the rules of module
+placement, as masks over the batch, see #settlement_mask, #road_mask and #city_mask.
+
+Dice rolls, robber moves and steals, pregame placement, buying roads, settlements and cities,
+and ending turns are supported. Dev cards, trades, longest road and largest army are not.
+
+Use #mismatches to check one game of the batch against a Game which was given the same actions,
+see #apply_to_games. #random_actions picks a random legal action for every game of a batch.
+
+e.g. batch = BatchedGames.random(4096, numpy.random.default_rng(0))
+     every = numpy.arange(batch.size)
+     batch.place_settlement(every, ...)
+"""
+import functools
+
+import hexgrid
+import numpy
+
+import catan.board
+import catan.boardbuilder
+import catan.game
+import catan.states
+from catan import codec, topology
+from catan.pieces import Piece, PieceType
+from catan.production import NUM_SEATS
+from catan.resources import CITY_COST, NUM_RESOURCES, ROAD_COST, SETTLEMENT_COST
+
+NUM_TILES = len(topology.TILE_IDS)
+NUM_NODES = len(topology.NODE_COORDS)
+NUM_EDGES = len(topology.EDGE_COORDS)
+
+# Game states used by the batch, as indexes into codec.GAME_STATES
+NOT_IN_GAME = codec.GAME_STATES.index(catan.states.GameStateNotInGame)
+PREGAME = codec.GAME_STATES.index(catan.states.GameStatePreGamePlacingPiece)
+BEGIN_TURN = codec.GAME_STATES.index(catan.states.GameStateBeginTurn)
+MOVE_ROBBER = codec.GAME_STATES.index(catan.states.GameStateMoveRobber)
+STEAL = codec.GAME_STATES.index(catan.states.GameStateSteal)
+AFTER_ROLL = codec.GAME_STATES.index(catan.states.GameStateDuringTurnAfterRoll)
+_STATES = (NOT_IN_GAME, PREGAME, BEGIN_TURN, MOVE_ROBBER, STEAL, AFTER_ROLL)
+# states entered after the current player has rolled
+_ROLLED_STATES = (MOVE_ROBBER, STEAL, AFTER_ROLL)
+
+# Capabilities read from catan.states, the columns of #capabilities
+CAPABILITIES = ('can_roll', 'can_move_robber', 'can_steal', 'can_buy_road', 'can_buy_settlement',
+                'can_buy_city', 'can_end_turn')
+
+_SETTLEMENT = codec.PIECE_TYPES.index(PieceType.settlement)
+_ROAD = codec.PIECE_TYPES.index(PieceType.road)
+_DESERT = codec.TERRAIN.index(catan.board.Terrain.desert)
+# Dice sums are in [2,12], see module production
+_NUM_DICE_NUMBERS = 13
+
+# Seat index of each pregame turn, in snake draft order, see GameStatePreGame.next_player
+_SNAKE = numpy.array(list(range(NUM_SEATS)) + list(reversed(range(NUM_SEATS))))
+
+
+def _build_matrices():
+    node_index = numpy.full(topology.COORD_SPACE, -1, dtype=numpy.int64)
+    node_index[list(topology.NODE_COORDS)] = numpy.arange(NUM_NODES)
+    edge_index = numpy.full(topology.COORD_SPACE, -1, dtype=numpy.int64)
+    edge_index[list(topology.EDGE_COORDS)] = numpy.arange(NUM_EDGES)
+    node_tiles = numpy.zeros((NUM_NODES, NUM_TILES), dtype=numpy.int64)
+    for node in topology.NODE_COORDS:
+        for tile_id in topology.TILES_TOUCHING_NODE[node]:
+            node_tiles[node_index[node], tile_id - 1] = 1
+    neighbourhood = numpy.eye(NUM_NODES, dtype=bool)
+    for node in topology.NODE_COORDS:
+        for adjacent in topology.NODES_ADJACENT_TO_NODE[node]:
+            neighbourhood[node_index[node], node_index[adjacent]] = True
+    edge_ends = numpy.array([[node_index[node] for node in topology.NODES_TOUCHING_EDGE[edge]]
+                             for edge in topology.EDGE_COORDS])
+    tile_nodes = numpy.array([[node_index[node] for node in topology.NODES_TOUCHING_TILE[tile_id]]
+                              for tile_id in topology.TILE_IDS])
+    node_tile_ids = numpy.array([[tile_id - 1 for tile_id in topology.TILES_TOUCHING_NODE[node]] +
+                                 [-1] * (3 - len(topology.TILES_TOUCHING_NODE[node]))
+                                 for node in topology.NODE_COORDS])
+    return node_index, edge_index, node_tiles, neighbourhood, edge_ends, tile_nodes, node_tile_ids
+
+
+# coord -> dense index (-1 off the board); node x tile and node x node (distance rule, the node
+# itself included) adjacency; the 2 nodes of each edge, the 6 nodes of each tile, and the 1 to 3
+# tiles of each node, padded with -1
+(_NODE_INDEX, _EDGE_INDEX, _NODE_TILES, _NEIGHBOURHOOD,
+ _EDGE_ENDS, _TILE_NODES, _NODE_TILE_IDS) = _build_matrices()
+_NODE_COORDS = numpy.array(topology.NODE_COORDS)
+# codec.TERRAIN index -> one-hot resource row, all zero for the desert
+_TERRAIN_RESOURCES = numpy.array([[int(catan.board.RESOURCE_INDEX.get(terrain) == i) for i in range(NUM_RESOURCES)]
+                                  for terrain in codec.TERRAIN], dtype=numpy.int64)
+# codec.TERRAIN index -> resource index, 0 for the desert, which has no number to produce on
+_TERRAIN_RESOURCE = _TERRAIN_RESOURCES.argmax(axis=1)
+_EDGE_COORDS = numpy.array(topology.EDGE_COORDS)
+
+
+@functools.lru_cache(maxsize=None)
+def capabilities():
+    """
+    Ask each game state class used by the batch what it allows, as a table.
+
+    :return: numpy bool array of shape (len(codec.GAME_STATES), len(CAPABILITIES)), read-only
+    """
+    game = catan.game.Game(logging='off', pregame='off')
+    game.start(catan.game.Game.get_debug_players())
+    table = numpy.zeros((len(codec.GAME_STATES), len(CAPABILITIES)), dtype=bool)
+    for state_id in _STATES:
+        if state_id == PREGAME:
+            # the pregame places pieces without buying them, see #place_settlement, #place_road
+            continue
+        state = codec.GAME_STATES[state_id](game)
+        game.last_player_to_roll = game.get_cur_player() if state_id in _ROLLED_STATES else None
+        for column, capability in enumerate(CAPABILITIES):
+            table[state_id, column] = bool(getattr(state, capability)())
+    table.setflags(write=False)
+    return table
+
+
+class BatchedGames(object):
+    """
+    class BatchedGames holds N games as arrays, and applies actions to many of them at once.
+    """
+    def __init__(self, terrain, numbers, pregame=True):
+        """
+        Start N games on the given layouts, with the robber on the desert.
+
+        :param terrain: (N, 19) array of indexes into codec.TERRAIN
+        :param numbers: (N, 19) array of dice numbers, 0 for none
+        :param pregame: if True, start in the pregame, otherwise at the first roll
+        """
+        self.terrain = numpy.array(terrain, dtype=numpy.int8)
+        self.numbers = numpy.array(numbers, dtype=numpy.int8)
+        self.size = n = len(self.terrain)
+        self.node_owner = numpy.full((n, NUM_NODES), -1, dtype=numpy.int8)
+        self.node_level = numpy.zeros((n, NUM_NODES), dtype=numpy.int8)
+        self.road_owner = numpy.full((n, NUM_EDGES), -1, dtype=numpy.int8)
+        self.robber = (numpy.argmax(self.terrain == _DESERT, axis=1) + 1).astype(numpy.int8)
+        self.seat = numpy.zeros(n, dtype=numpy.int8)
+        self.turn = numpy.zeros(n, dtype=numpy.int32)
+        self.state = numpy.full(n, PREGAME if pregame else BEGIN_TURN, dtype=numpy.int8)
+        self.placing = numpy.full(n, _SETTLEMENT, dtype=numpy.int8)
+        self.hands = numpy.zeros((n, NUM_SEATS, NUM_RESOURCES), dtype=numpy.int64)
+        self._can = capabilities()
+        # kept up to date as pieces are placed, like module placement's and production's indexes:
+        # nodes blocked by the distance rule, nodes each seat's roads reach, each seat's yield
+        # from each tile, ie its settlements and cities touching it, and what each seat collects
+        # on each dice number, robber aside
+        self._blocked = numpy.zeros((n, NUM_NODES), dtype=bool)
+        self._road_nodes = numpy.zeros((n, NUM_SEATS, NUM_NODES), dtype=bool)
+        self._yields = numpy.zeros((n, NUM_SEATS, NUM_TILES), dtype=numpy.int64)
+        self._by_number = numpy.zeros((n, _NUM_DICE_NUMBERS, NUM_SEATS, NUM_RESOURCES), dtype=numpy.int64)
+        # tile resource as an index, and as one-hot rows, the desert row all zero
+        self._tile_resource = _TERRAIN_RESOURCE[self.terrain]
+        self._tile_resources = _TERRAIN_RESOURCES[self.terrain]
+
+    @classmethod
+    def from_boards(cls, boards, pregame=True):
+        """
+        :param boards: one Board per game, eg from boardbuilder.build or sim.random_board
+        """
+        terrain = [[codec.TERRAIN.index(tile.terrain) for tile in board.tiles] for board in boards]
+        numbers = [[tile.number.value or 0 for tile in board.tiles] for board in boards]
+        return cls(terrain, numbers, pregame)
+
+    @classmethod
+    def random(cls, n, rng, pregame=True):
+        """
+        N games, each on boardbuilder's standard tiles and numbers, shuffled. The desert gets no
+        number, as in boardbuilder. See boardbuilder.generate_layout_blocks.
+
+        :param rng: numpy.random.Generator
+        """
+        terrain, numbers = next(catan.boardbuilder.generate_layout_blocks(n, rng=rng, count=n))
+        return cls(terrain, numbers, pregame)
+
+    def board(self, game):
+        """
+        Materialize one game's layout and pieces as a Board, eg to start a Game on it.
+
+        :param game: index into the batch, int
+        :return: Board
+        """
+        players = {player.seat: player for player in catan.game.Game.get_debug_players()}
+        board = catan.board.Board(terrain='empty', numbers='empty', pieces='empty')
+        board.tiles = [catan.board.Tile(tile_id, codec.TERRAIN[t], catan.board.HexNumber.from_digit_or_none(n or None))
+                       for tile_id, t, n in zip(topology.TILE_IDS, self.terrain[game].tolist(),
+                                                self.numbers[game].tolist())]
+        pieces = {(hexgrid.TILE, topology.tile_id_to_coord(int(self.robber[game]))): Piece(PieceType.robber, None)}
+        for i in numpy.flatnonzero(self.node_owner[game] >= 0):
+            piece_type = PieceType.city if self.node_level[game, i] == 2 else PieceType.settlement
+            pieces[hexgrid.NODE, int(_NODE_COORDS[i])] = Piece(piece_type, players[int(self.node_owner[game, i]) + 1])
+        for i in numpy.flatnonzero(self.road_owner[game] >= 0):
+            pieces[hexgrid.EDGE, int(_EDGE_COORDS[i])] = Piece(PieceType.road, players[int(self.road_owner[game, i]) + 1])
+        board.pieces = pieces
+        return board
+
+    def can(self, capability, games):
+        """
+        :param capability: one of CAPABILITIES
+        :param games: game indexes, int array
+        :return: whether each game's state allows it, bool array
+        """
+        return self._can[self.state[games], CAPABILITIES.index(capability)]
+
+    def settlement_mask(self, games, connected=True):
+        """
+        Legal settlement nodes for the current player of each game, see module placement.
+
+        :return: (len(games), 54) bool array
+        """
+        legal = ~self._blocked[games]
+        if connected:
+            legal &= self._road_nodes[games, self.seat[games]]
+        return legal
+
+    def city_mask(self, games):
+        """
+        :return: (len(games), 54) bool array, the current player's settlements
+        """
+        return (self.node_owner[games] == self.seat[games, None]) & (self.node_level[games] == 1)
+
+    def road_mask(self, games):
+        """
+        Legal road edges for the current player of each game: empty edges touching one of their
+        buildings, or one of their roads at a node without an opponent's building. In the
+        pregame, empty edges touching the settlement just placed, the one none of their roads
+        reach, as in module placement.
+
+        :return: (len(games), 72) bool array
+        """
+        owner = self.node_owner[games]
+        seats = self.seat[games]
+        road_nodes = self._road_nodes[games, seats]
+        anchors = numpy.where((self.state[games] == PREGAME)[:, None],
+                              (owner == seats[:, None]) & ~road_nodes,
+                              (owner == seats[:, None]) | (road_nodes & (owner < 0)))
+        return anchors[:, _EDGE_ENDS].any(axis=2) & (self.road_owner[games] < 0)
+
+    def points(self):
+        """
+        :return: (N, NUM_SEATS) victory points from settlements and cities
+        """
+        points = numpy.zeros((self.size, NUM_SEATS), dtype=numpy.int64)
+        for seat in range(NUM_SEATS):
+            points[:, seat] = numpy.where(self.node_owner == seat, self.node_level, 0).sum(axis=1)
+        return points
+
+    def roll(self, games, dice):
+        """
+        Roll the dice in each game, paying out production. A 7 moves to the robber.
+
+        :param games: game indexes, int array, each game at most once
+        :param dice: dice sum per game, int array
+        :return: which games rolled, bool array
+        """
+        games, dice = self._unique(games), numpy.asarray(dice)
+        ok = self.can('can_roll', games)
+        games, dice = games[ok], dice[ok]
+        # resources collected by each seat: buildings' yield on each tile, where the tile produces
+        collected = self._by_number[games, dice]
+        # the robber's tile produces nothing
+        robber = self.robber[games] - 1
+        robbed = numpy.flatnonzero(self.numbers[games, robber] == dice)
+        collected[robbed, :, self._tile_resource[games[robbed], robber[robbed]]] -= \
+            self._yields[games[robbed], :, robber[robbed]]
+        self.hands[games] += collected
+        self.state[games] = numpy.where(dice == 7, MOVE_ROBBER, AFTER_ROLL)
+        return ok
+
+    def move_robber(self, games, tile_ids):
+        """
+        :param tile_ids: tile id per game, which must differ from the robber's, int array
+        :return: which games moved the robber, bool array
+        """
+        games, tile_ids = self._unique(games), numpy.asarray(tile_ids)
+        ok = self.can('can_move_robber', games) & (tile_ids >= 1) & (tile_ids <= NUM_TILES)
+        ok &= tile_ids != self.robber[games]
+        games = games[ok]
+        self.robber[games] = tile_ids[ok]
+        self.state[games] = STEAL
+        return ok
+
+    def stealable(self, games):
+        """
+        :return: (len(games), NUM_SEATS) bool array, the players with a building on the robber's
+                 tile, other than the current player
+        """
+        games = numpy.asarray(games)
+        owner = self.node_owner[games[:, None], _TILE_NODES[self.robber[games] - 1]]
+        stealable = (owner[:, :, None] == numpy.arange(NUM_SEATS)).any(axis=1)
+        stealable[numpy.arange(len(games)), self.seat[games]] = False
+        return stealable
+
+    def steal(self, games, victims, picks):
+        """
+        Take one card from each victim's hand, the pick'th counting through the hand in resource
+        order, as Game._steal_resource does with its random pick.
+
+        :param victims: seat index per game, or -1 to steal from nobody, int array
+        :param picks: per game, a float in [0, 1) choosing the card, eg rng.random(len(games))
+        :return: which games stole, bool array. Stealing from nobody, or from an empty hand,
+                 counts, and takes nothing.
+        """
+        games, victims, picks = self._unique(games), numpy.asarray(victims), numpy.asarray(picks)
+        ok = self.can('can_steal', games)
+        stealable = self.stealable(games)
+        has_victim = victims >= 0
+        ok &= ~has_victim | stealable[numpy.arange(len(games)), numpy.maximum(victims, 0)]
+        games, victims, picks = games[ok], victims[ok], picks[ok]
+        self.state[games] = AFTER_ROLL
+        taking = victims >= 0
+        games, victims, picks = games[taking], victims[taking], picks[taking]
+        hands = self.hands[games, victims]
+        totals = hands.sum(axis=1)
+        taking = totals > 0
+        games, victims, hands = games[taking], victims[taking], hands[taking]
+        pick = (picks[taking] * totals[taking]).astype(numpy.int64)
+        resource = (numpy.cumsum(hands, axis=1) <= pick[:, None]).sum(axis=1)
+        self.hands[games, victims, resource] -= 1
+        self.hands[games, self.seat[games], resource] += 1
+        return ok
+
+    def place_settlement(self, games, nodes):
+        """
+        In the pregame, place the current player's settlement. Otherwise buy one.
+
+        :param nodes: node coord per game, int array
+        :return: which games placed it, bool array
+        """
+        return self._place(games, nodes, _SETTLEMENT, 'can_buy_settlement', SETTLEMENT_COST)
+
+    def place_road(self, games, edges):
+        """
+        In the pregame, place the current player's road, which ends their turn. Otherwise buy one.
+
+        :param edges: edge coord per game, int array
+        :return: which games placed it, bool array
+        """
+        return self._place(games, edges, _ROAD, 'can_buy_road', ROAD_COST)
+
+    def place_city(self, games, nodes):
+        """
+        Buy a city, on one of the current player's settlements.
+
+        :param nodes: node coord per game, int array
+        :return: which games placed it, bool array
+        """
+        return self._place(games, nodes, None, 'can_buy_city', CITY_COST)
+
+    def _place(self, games, coords, pregame_piece, capability, cost):
+        games, coords = self._unique(games), numpy.asarray(coords)
+        in_pregame = self.state[games] == PREGAME
+        # pregame pieces are free, and placed in turn, see GameStatePreGamePlacingPiece
+        placing = self.placing[games] == pregame_piece if pregame_piece is not None else False
+        ok = numpy.where(in_pregame, placing, self.can(capability, games))
+        seats = self.seat[games]
+        ok &= in_pregame | (self.hands[games, seats] >= cost).all(axis=1)
+        rows = numpy.arange(len(games))
+        if pregame_piece == _ROAD:
+            index = _EDGE_INDEX[coords]
+            ok &= (index >= 0) & self.road_mask(games)[rows, index]
+        else:
+            index = _NODE_INDEX[coords]
+            if pregame_piece == _SETTLEMENT:
+                legal = numpy.where(in_pregame[:, None], self.settlement_mask(games, connected=False),
+                                    self.settlement_mask(games))
+            else:
+                legal = self.city_mask(games)
+            ok &= (index >= 0) & legal[rows, index]
+        games, index, seats, in_pregame = games[ok], index[ok], seats[ok], in_pregame[ok]
+        self.hands[games[~in_pregame], seats[~in_pregame]] -= cost
+        self.state[games[~in_pregame]] = AFTER_ROLL
+        pregame = games[in_pregame]
+        if pregame_piece == _ROAD:
+            self.road_owner[games, index] = seats
+            self._road_nodes[games, seats, _EDGE_ENDS[index, 0]] = True
+            self._road_nodes[games, seats, _EDGE_ENDS[index, 1]] = True
+            self._end_turn(pregame)
+        else:
+            self.node_owner[games, index] = seats
+            self.node_level[games, index] = 1 if pregame_piece == _SETTLEMENT else 2
+            self._blocked[games] |= _NEIGHBOURHOOD[index]
+            # a city yields one more than the settlement it replaces
+            self._yields[games, seats] += _NODE_TILES[index]
+            for tiles in _NODE_TILE_IDS[index].T:
+                producing = (tiles >= 0) & (self.numbers[games, tiles] > 0)
+                self._by_number[games[producing], self.numbers[games[producing], tiles[producing]],
+                                seats[producing], self._tile_resource[games[producing], tiles[producing]]] += 1
+            self.placing[pregame] = _ROAD
+            # the second pregame settlement collects a resource from each tile it touches
+            second = in_pregame & ((self.node_owner[games] == seats[:, None]).sum(axis=1) == 2)
+            collect = games[second]
+            touching = _NODE_TILES[index[second]][:, :, None]
+            self.hands[collect, seats[second]] += (touching * self._tile_resources[collect]).sum(axis=1)
+        return ok
+
+    def end_turn(self, games):
+        """
+        End the current player's turn. Pregame roads end the turn by themselves.
+
+        :return: which games ended the turn, bool array
+        """
+        games = self._unique(games)
+        ok = self.can('can_end_turn', games)
+        self._end_turn(games[ok])
+        return ok
+
+    @staticmethod
+    def _unique(games):
+        games = numpy.asarray(games)
+        if len(games) > 1 and numpy.bincount(games).max() > 1:
+            raise ValueError('Each game can take one action per call, got repeated games {}'.format(
+                numpy.flatnonzero(numpy.bincount(games) > 1).tolist()))
+        return games
+
+    def _end_turn(self, games):
+        turn = self.turn[games] + 1
+        still_pregame = (self.state[games] == PREGAME) & (turn < len(_SNAKE))
+        self.seat[games] = numpy.where(still_pregame, _SNAKE[numpy.minimum(turn, len(_SNAKE) - 1)], turn % NUM_SEATS)
+        self.turn[games] = turn
+        self.state[games] = numpy.where(still_pregame, PREGAME, BEGIN_TURN)
+        self.placing[games] = _SETTLEMENT
+
+    def mismatches(self, game, scalar):
+        """
+        Compare one game of the batch with a Game, eg to check the batch against the engine.
+
+        :param game: index into the batch, int
+        :param scalar: Game
+        :return: the names of the fields which differ, list(str)
+        """
+        differ = list()
+        state = type(scalar.state)
+        if codec.GAME_STATES.index(state) != self.state[game]:
+            differ.append('state')
+        if state is catan.states.GameStatePreGamePlacingPiece and \
+                codec.PIECE_TYPES.index(scalar.state.piece_type) != self.placing[game]:
+            differ.append('placing')
+        if scalar.get_cur_player().seat - 1 != self.seat[game]:
+            differ.append('seat')
+        if scalar._cur_turn != self.turn[game]:
+            differ.append('turn')
+        if scalar.robber_tile != self.robber[game]:
+            differ.append('robber')
+        if not numpy.array_equal(scalar.hands, self.hands[game]):
+            differ.append('hands')
+        nodes = scalar.board._piece_arrays[hexgrid.NODE]
+        owner = [-1 if nodes[c] is None else nodes[c].owner.seat - 1 for c in topology.NODE_COORDS]
+        level = [0 if nodes[c] is None else 2 if nodes[c].type == PieceType.city else 1 for c in topology.NODE_COORDS]
+        if owner != self.node_owner[game].tolist() or level != self.node_level[game].tolist():
+            differ.append('nodes')
+        edges = scalar.board._piece_arrays[hexgrid.EDGE]
+        roads = [-1 if edges[c] is None else edges[c].owner.seat - 1 for c in topology.EDGE_COORDS]
+        if roads != self.road_owner[game].tolist():
+            differ.append('roads')
+        return differ
+
+
+def random_actions(games, rng, steal=True):
+    """
+    Pick one random legal action for every game of the batch, like sim.random_agent: pregame
+    placements, rolls, robber moves and steals, and buying a city, settlement or road, each with
+    probability 0.7 if affordable and legal, or ending the turn.
+
+    :param games: BatchedGames
+    :param rng: numpy.random.Generator
+    :param steal: if False, steals take from nobody
+    :return: the actions, as a list of (method name, game indexes, args), see #apply_actions
+    """
+    every = numpy.arange(games.size)
+    state = games.state
+    actions = list()
+
+    pregame = every[state == PREGAME]
+    settling = pregame[games.placing[pregame] == _SETTLEMENT]
+    node, _ = _choose(games.settlement_mask(settling, connected=False), rng)
+    actions.append(('place_settlement', settling, (_NODE_COORDS[node],)))
+    roading = pregame[games.placing[pregame] == _ROAD]
+    edge, _ = _choose(games.road_mask(roading), rng)
+    actions.append(('place_road', roading, (_EDGE_COORDS[edge],)))
+
+    rolling = every[state == BEGIN_TURN]
+    actions.append(('roll', rolling, (rng.integers(1, 7, len(rolling)) + rng.integers(1, 7, len(rolling)),)))
+    robbing = every[state == MOVE_ROBBER]
+    tiles = (games.robber[robbing] + rng.integers(0, NUM_TILES - 1, len(robbing))) % NUM_TILES + 1
+    actions.append(('move_robber', robbing, (tiles,)))
+    stealing = every[state == STEAL]
+    victims, any_victim = _choose(games.stealable(stealing), rng)
+    victims = numpy.where(any_victim & steal, victims, -1)
+    actions.append(('steal', stealing, (victims, rng.random(len(stealing)))))
+
+    building = every[state == AFTER_ROLL]
+    seats = games.seat[building]
+    hands = games.hands[building, seats]
+    done = numpy.zeros(len(building), dtype=bool)
+    for name, mask, cost, coords in (('place_city', games.city_mask(building), CITY_COST, _NODE_COORDS),
+                                     ('place_settlement', games.settlement_mask(building), SETTLEMENT_COST,
+                                      _NODE_COORDS),
+                                     ('place_road', games.road_mask(building), ROAD_COST, _EDGE_COORDS)):
+        target, legal = _choose(mask, rng)
+        take = ~done & legal & (hands >= cost).all(axis=1) & (rng.random(len(building)) < 0.7)
+        actions.append((name, building[take], (coords[target[take]],)))
+        done |= take
+    actions.append(('end_turn', building[~done], ()))
+    return actions
+
+
+def _choose(mask, rng):
+    """
+    :return: a random True column of each row, and whether the row had one
+    """
+    scores = numpy.where(mask, rng.random(mask.shape), -1.0)
+    return scores.argmax(axis=1), mask.any(axis=1)
+
+
+def apply_actions(games, actions):
+    """
+    :param games: BatchedGames
+    :param actions: list of (method name, game indexes, args), eg from #random_actions
+    """
+    for name, indexes, args in actions:
+        if len(indexes):
+            getattr(games, name)(indexes, *args)
+
+
+def apply_to_games(scalars, actions):
+    """
+    Apply a batch's actions to Game objects, one per game of the batch, eg to compare them with
+    #BatchedGames.mismatches. Seats are matched to Game.get_debug_players.
+
+    :param scalars: Game per game index, games missing from it are skipped, dict(int, Game)
+    :param actions: see #apply_actions
+    """
+    players = catan.game.Game.get_debug_players()
+    for name, indexes, args in actions:
+        for row, i in enumerate(indexes):
+            game = scalars.get(int(i))
+            if game is None:
+                continue
+            values = [int(arg[row]) if arg.ndim == 1 else arg[row] for arg in args]
+            if name == 'steal':
+                game.steal(players[values[0]] if values[0] >= 0 else None)
+                continue
+            if name.startswith('place_') and not game.state.is_in_pregame():
+                game.begin_placing(PieceType(name[len('place_'):]))
+            getattr(game, name)(*values)
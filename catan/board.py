@@ -1,22 +1,58 @@
+from collections.abc import MutableMapping
 import copy
 from enum import Enum
 import logging
 import hexgrid
-from catan import boardbuilder, states
+from catan import boardbuilder, longestroad, placement, production, states, streams, topology, trace, zobrist
 from catan.pieces import PieceType, Piece
+from catan.topology import COORD_SPACE
+
+_PIECE_TYPE_TO_HEX_TYPE = {
+    PieceType.road: hexgrid.EDGE,
+    PieceType.settlement: hexgrid.NODE,
+    PieceType.city: hexgrid.NODE,
+    PieceType.robber: hexgrid.TILE,
+}
 
 
 class Board(object):
     """
     class Board represents a catan board. It has tiles, ports, and pieces.
 
-    A Board has pieces, which is a dictionary mapping (hexgrid.TYPE, coord) -> Piece.
+    Pieces are stored in one fixed-size array per hexgrid type (edges, nodes, tiles), each
+    indexed directly by hexgrid coordinate. Empty coordinates hold None.
+
+    A Board has pieces, which is a dictionary-like view mapping (hexgrid.TYPE, coord) -> Piece.
+    It is kept for compatibility, prefer #get_piece_at in hot paths.
 
     Use #place_piece, #move_piece, and #remove_piece to manage pieces on the board.
 
+    Use #get_piece_at to get the piece at a coordinate of a hexgrid type, or None.
+
     Use #get_pieces to get all the pieces at a particular coordinate of the allowed types.
+
+    A Board keeps an index of the port types each player has access to. It is updated as
+    settlements and cities are placed and removed, use #player_has_port_type to query it.
+
+    A Board has production, a production.Production which is likewise kept up to date.
+    Use board.production.produce(roll, robber_tile) to get the resources collected on a roll.
+
+    A Board has placement, a placement.Placement which is likewise kept up to date.
+    Use it to generate legal placements, e.g. board.placement.legal_road_edges(player).
+
+    A Board has longest_road, a longestroad.LongestRoad which is likewise kept up to date.
+
+    A Board has zobrist, the Zobrist hash of its pieces, which is likewise kept up to date.
+    See module zobrist.
+
+    A Board has rng, a streams.RandomStream, which shuffles its tiles and numbers when they are
+    randomized.
+
+    Use #copy to take a cheap snapshot. Once the board is locked its tiles and ports never
+    change, so copies share them. The piece arrays and indexes are shared copy-on-write:
+    whichever board changes a piece first takes its own copy of them. Each copy has its own rng.
     """
-    def __init__(self, board=None, terrain=None, numbers=None, ports=None, pieces=None, players=None):
+    def __init__(self, board=None, terrain=None, numbers=None, ports=None, pieces=None, players=None, rng=None):
         """
         Create a new board. Creation will be delegated to module boardbuilder.
 
@@ -25,11 +61,25 @@ class Board(object):
         :param ports: ports option, boardbuilder.Opt
         :param pieces: pieces option, boardbuilder.Opt
         :param players: players option, boardbuilder.Opt
+        :param rng: streams.RandomStream, default a stream with a fresh key
         """
+        self.rng = rng if rng is not None else streams.RandomStream()
         self.tiles = list()
         self.ports = list()
         self.state = states.BoardState(self)
-        self.pieces = dict()
+        # indexed by hexgrid type: hexgrid.EDGE, hexgrid.NODE, hexgrid.TILE
+        self._piece_arrays = ([None] * COORD_SPACE,
+                              [None] * COORD_SPACE,
+                              [None] * COORD_SPACE)
+        self._port_nodes = dict() # node coord -> tuple(PortType), see #_index_ports
+        self._player_port_types = dict() # Player -> frozenset(PortType)
+        self._player_trade_ratios = dict() # Player -> tuple(int), indexed like RESOURCES
+        self.production = production.Production()
+        self.placement = placement.Placement()
+        self.longest_road = longestroad.LongestRoad()
+        self._shared = False # True while the piece arrays and indexes may be shared, see #copy
+        self.piece_journal = None # list of (hex_type, coord, old piece) while recording, see module journal
+        self.zobrist = 0
 
         self.opts = dict()
         if board is not None:
@@ -59,6 +109,51 @@ class Board(object):
                 setattr(result, k, copy.deepcopy(v, memo))
         return result
 
+    def copy(self):
+        """
+        Return a snapshot of this Board which shares everything it safely can with this Board.
+        See the class docstring.
+
+        :return: Board
+        """
+        result = object.__new__(Board)
+        if isinstance(self.state, states.BoardStateLocked):
+            result.tiles = self.tiles
+            result.ports = self.ports
+        else:
+            result.tiles = copy.deepcopy(self.tiles)
+            result.ports = copy.deepcopy(self.ports)
+        result.state = self.state.__class__(result)
+        result._piece_arrays = self._piece_arrays
+        result._port_nodes = self._port_nodes
+        result._player_port_types = self._player_port_types
+        result._player_trade_ratios = self._player_trade_ratios
+        result.production = self.production
+        result.placement = self.placement
+        result.longest_road = self.longest_road
+        result._shared = self._shared = True
+        result.piece_journal = None
+        result.zobrist = self.zobrist
+        result.opts = self.opts
+        result.rng = copy.copy(self.rng)
+        result.observers = set(self.observers)
+        return result
+
+    def _own_pieces(self):
+        """
+        Take private copies of the piece arrays and indexes if they may be shared with another
+        Board. Must be called before changing them in place.
+        """
+        if not self._shared:
+            return
+        self._piece_arrays = tuple(list(array) for array in self._piece_arrays)
+        self._player_port_types = dict(self._player_port_types)
+        self._player_trade_ratios = dict(self._player_trade_ratios)
+        self.production = self.production.copy()
+        self.placement = self.placement.copy()
+        self.longest_road = self.longest_road.copy()
+        self._shared = False
+
     def restore(self, board):
         """
         Restore this Board object to match the properties and state of the given Board object
@@ -70,7 +165,15 @@ class Board(object):
         self.state = board.state
         self.state.board = self
 
-        self.pieces = board.pieces
+        self._piece_arrays = board._piece_arrays
+        self._port_nodes = board._port_nodes
+        self._player_port_types = board._player_port_types
+        self._player_trade_ratios = board._player_trade_ratios
+        self.production = board.production
+        self.placement = board.placement
+        self.longest_road = board.longest_road
+        self._shared = board._shared = True
+        self.zobrist = board.zobrist
         self.opts = board.opts
         self.observers = board.observers
 
@@ -82,9 +185,10 @@ class Board(object):
 
     def lock(self):
         self.state = states.BoardStateLocked(self)
-        for port in self.ports.copy():
-            if port.type == PortType.none:
-                self.ports.remove(port)
+        none_ports = [port for port in self.ports if port.type == PortType.none]
+        if none_ports:
+            self.ports = [port for port in self.ports if port.type != PortType.none]
+            self._index_ports()
         self.notify_observers()
 
     def unlock(self):
@@ -106,67 +210,202 @@ class Board(object):
             opts['players'] = players
         boardbuilder.reset(self, opts=opts)
 
+    @property
+    def pieces(self):
+        """
+        Compatibility view of the piece arrays, mapping (hexgrid.TYPE, coord) -> Piece.
+
+        Assigning a dictionary of the same shape replaces all pieces on the board.
+        """
+        return PiecesView(self)
+
+    @pieces.setter
+    def pieces(self, pieces):
+        self._own_pieces()
+        piece_arrays = ([None] * COORD_SPACE,
+                        [None] * COORD_SPACE,
+                        [None] * COORD_SPACE)
+        for (hex_type, coord), piece in (pieces or dict()).items():
+            if not 0 <= coord < COORD_SPACE:
+                raise ValueError('Coordinate {} is outside of the hexgrid coordinate space'.format(coord))
+            piece_arrays[hex_type][coord] = piece
+        # fill the arrays first and index them once, rather than piece by piece
+        self._piece_arrays = piece_arrays
+        self.placement = placement.Placement()
+        self.placement.rebuild(piece_arrays[hexgrid.EDGE], piece_arrays[hexgrid.NODE])
+        self.longest_road = longestroad.LongestRoad()
+        self.longest_road.rebuild(piece_arrays)
+        self.zobrist = zobrist.board_key(self)
+        self._index_ports()
+        self._index_tiles()
+
     def can_place_piece(self, piece, coord):
+        """
+        Whether the piece can legally be placed at the coordinate, see module placement.
+
+        Settlements are only checked against the distance rule here. Whether they must also
+        touch a road depends on the game state, see the GameState place_settlement methods.
+
+        :param piece: Piece
+        :param coord: coordinate, int
+        :return: Boolean
+        """
         if piece.type == PieceType.road:
-            logging.warning('"Can place road" not yet implemented')
-            return True
+            return self.placement.can_place_road(piece.owner, coord)
         elif piece.type == PieceType.settlement:
-            logging.warning('"Can place settlement" not yet implemented')
-            return True
+            return self.placement.can_place_settlement(piece.owner, coord, connected=False)
         elif piece.type == PieceType.city:
-            logging.warning('"Can place city" not yet implemented')
-            return True
+            return self.placement.can_place_city(piece.owner, coord)
         elif piece.type == PieceType.robber:
-            logging.warning('"Can place robber" not yet implemented')
-            return True
+            return 0 <= coord < COORD_SPACE and topology.TILE_COORD_TO_ID[coord] != 0
         else:
             logging.debug('Can\'t place piece={} on coord={}'.format(
-                piece.value, hex(coord)
+                piece, hex(coord)
             ))
-            return self.pieces.get(coord) is None
+            return False
 
     def place_piece(self, piece, coord):
         if not self.can_place_piece(piece, coord):
             logging.critical('ILLEGAL: Attempted to place piece={} on coord={}'.format(
-                piece.value, hex(coord)
+                piece, hex(coord)
             ))
-        logging.debug('Placed piece={} on coord={}'.format(
-            piece, hex(coord)
-        ))
+        if __debug__ and trace.enabled:
+            trace.record('place_piece', piece=piece, coord=hex(coord))
         hex_type = self._piece_type_to_hex_type(piece.type)
-        self.pieces[(hex_type, coord)] = piece
+        self._set_piece(hex_type, coord, piece)
 
     def move_piece(self, piece, from_coord, to_coord):
-        from_index = (self._piece_type_to_hex_type(piece.type), from_coord)
-        if from_index not in self.pieces:
-            logging.warning('Attempted to move piece={} which was NOT on the board'.format(from_index))
+        hex_type = self._piece_type_to_hex_type(piece.type)
+        if self.get_piece_at(hex_type, from_coord) is None:
+            logging.warning('Attempted to move piece={} which was NOT on the board'.format((hex_type, from_coord)))
             return
         self.place_piece(piece, to_coord)
         self.remove_piece(piece, from_coord)
 
     def remove_piece(self, piece, coord):
-        index = (self._piece_type_to_hex_type(piece.type), coord)
-        try:
-            self.pieces.pop(index)
-            logging.debug('Removed piece={}'.format(index))
-        except ValueError:
-            logging.critical('Attempted to remove piece={} which was NOT on the board'.format(index))
+        hex_type = self._piece_type_to_hex_type(piece.type)
+        if self.get_piece_at(hex_type, coord) is None:
+            logging.critical('Attempted to remove piece={} which was NOT on the board'.format((hex_type, coord)))
+            return
+        self._set_piece(hex_type, coord, None)
+        if __debug__ and trace.enabled:
+            trace.record('remove_piece', hex_type=hex_type, coord=hex(coord))
+
+    def get_piece_at(self, hex_type, coord):
+        """
+        Get the piece at the given coordinate of the given hexgrid type. Allocation-free.
+
+        :param hex_type: hexgrid.EDGE, hexgrid.NODE, or hexgrid.TILE
+        :param coord: integer coordinate, see module hexgrid
+        :return: Piece, or None if there is no piece there
+        """
+        if 0 <= coord < COORD_SPACE:
+            return self._piece_arrays[hex_type][coord]
+        return None
 
     def get_pieces(self, types=tuple(), coord=None):
         if coord is None:
             logging.critical('Attempted to get_piece with coord={}'.format(coord))
             return Piece(None, None)
-        indexes = set((self._piece_type_to_hex_type(t), coord) for t in types)
-        pieces = [self.pieces[idx] for idx in indexes if idx in self.pieces]
-        if len(pieces) == 0:
-            #logging.warning('Found zero pieces at {}'.format(indexes))
-            pass
-        elif len(pieces) == 1:
-            logging.debug('Found one piece at {}: {}'.format(indexes, pieces[0]))
-        elif len(pieces) > 1:
-            logging.debug('Found {} pieces at {}: {}'.format(len(pieces), indexes, coord, pieces))
+        pieces = list()
+        hex_types = set(_PIECE_TYPE_TO_HEX_TYPE.get(t) for t in types)
+        for hex_type in (hexgrid.EDGE, hexgrid.NODE, hexgrid.TILE):
+            if hex_type in hex_types:
+                piece = self.get_piece_at(hex_type, coord)
+                if piece is not None:
+                    pieces.append(piece)
         return pieces
 
+    def _set_piece(self, hex_type, coord, piece):
+        """
+        Set or clear (piece=None) the piece at a coordinate. All piece changes go through here.
+        """
+        if not 0 <= coord < COORD_SPACE:
+            raise ValueError('Coordinate {} is outside of the hexgrid coordinate space'.format(coord))
+        if self._shared:
+            self._own_pieces()
+        old_piece = self._piece_arrays[hex_type][coord]
+        if self.piece_journal is not None:
+            self.piece_journal.append((hex_type, coord, old_piece))
+        self._piece_arrays[hex_type][coord] = piece
+        self.zobrist ^= zobrist.piece_key(coord, old_piece) ^ zobrist.piece_key(coord, piece)
+        if hex_type == hexgrid.NODE:
+            self.production.update(coord, old_piece, piece)
+            if coord in self._port_nodes:
+                if old_piece is not None:
+                    self._index_player_ports(old_piece.owner)
+                if piece is not None:
+                    self._index_player_ports(piece.owner)
+        if hex_type != hexgrid.TILE:
+            self.placement.update(hex_type, coord, old_piece, piece)
+            self.longest_road.update(hex_type, coord, old_piece, piece, self._piece_arrays)
+
+    def player_has_port_type(self, player, port_type):
+        """
+        Whether the player has a settlement or city on a port of the given type. O(1).
+
+        :param player: Player
+        :param port_type: PortType
+        :return: Boolean
+        """
+        return port_type in self._player_port_types.get(player, ())
+
+    def get_port_types(self, player):
+        """
+        :param player: Player
+        :return: the types of the ports the player has a settlement or city on, frozenset(PortType)
+        """
+        return self._player_port_types.get(player, frozenset())
+
+    def get_trade_ratios(self, player):
+        """
+        How many of each resource the player must give to get one resource from the bank,
+        using their best port. O(1).
+
+        :param player: Player
+        :return: tuple(int), indexed like RESOURCES
+        """
+        return self._player_trade_ratios.get(player, DEFAULT_TRADE_RATIOS)
+
+    def _index_tiles(self):
+        """
+        Rebuild the tile-dependent indexes from scratch. Must be called whenever self.tiles changes.
+        """
+        self._own_pieces()
+        self.production.rebuild(self.tiles, self._piece_arrays[hexgrid.NODE])
+
+    def _index_ports(self):
+        """
+        Rebuild the port index from scratch. Must be called whenever self.ports changes.
+        """
+        port_nodes = dict()
+        for port in self.ports:
+            for node in topology.nodes_touching_port(port):
+                port_nodes[node] = port_nodes.get(node, tuple()) + (port.type, )
+        self._port_nodes = port_nodes
+        self._player_port_types = dict()
+        self._player_trade_ratios = dict()
+        nodes = self._piece_arrays[hexgrid.NODE]
+        for node in port_nodes:
+            if nodes[node] is not None:
+                self._index_player_ports(nodes[node].owner)
+
+    def _index_player_ports(self, player):
+        """
+        Recompute the set of port types and the trade ratios the given player has access to.
+        """
+        nodes = self._piece_arrays[hexgrid.NODE]
+        port_types = set()
+        for node, types in self._port_nodes.items():
+            if nodes[node] is not None and nodes[node].owner == player:
+                port_types.update(types)
+        if port_types:
+            self._player_port_types[player] = frozenset(port_types)
+            self._player_trade_ratios[player] = trade_ratios(port_types)
+        else:
+            self._player_port_types.pop(player, None)
+            self._player_trade_ratios.pop(player, None)
+
     def get_port_at(self, tile_id, direction):
         """
         If no port is found, a new none port is made and added to self.ports.
@@ -181,19 +420,15 @@ class Board(object):
             if port.tile_id == tile_id and port.direction == direction:
                 return port
         port = Port(tile_id, direction, PortType.none)
-        self.ports.append(port)
+        self.ports = self.ports + [port]
+        self._index_ports()
         return port
 
     def _piece_type_to_hex_type(self, piece_type):
-        if piece_type in (PieceType.road, ):
-            return hexgrid.EDGE
-        elif piece_type in (PieceType.settlement, PieceType.city):
-            return hexgrid.NODE
-        elif piece_type in (PieceType.robber, ):
-            return hexgrid.TILE
-        else:
+        hex_type = _PIECE_TYPE_TO_HEX_TYPE.get(piece_type)
+        if hex_type is None:
             logging.critical('piece type={} has no corresponding hex type. Returning None'.format(piece_type))
-            return None
+        return hex_type
 
     def cycle_hex_type(self, tile_id):
         if self.state.modifiable():
@@ -201,6 +436,7 @@ class Board(object):
             next_idx = (list(Terrain).index(tile.terrain) + 1) % len(Terrain)
             next_terrain = list(Terrain)[next_idx]
             tile.terrain = next_terrain
+            self._index_tiles()
         else:
             logging.debug('Attempted to cycle terrain on tile={} on a locked board'.format(tile_id))
         self.notify_observers()
@@ -211,6 +447,7 @@ class Board(object):
             next_idx = (list(HexNumber).index(tile.number) + 1) % len(HexNumber)
             next_hex_number = list(HexNumber)[next_idx]
             tile.number = next_hex_number
+            self._index_tiles()
         else:
             logging.debug('Attempted to cycle number on tile={} on a locked board'.format(tile_id))
         self.notify_observers()
@@ -219,6 +456,7 @@ class Board(object):
         if self.state.modifiable():
             port = self.get_port_at(tile_id, direction)
             port.type = PortType.next_ui(port.type)
+            self._index_ports()
         else:
             logging.debug('Attempted to cycle port on coord=({},{}) on a locked board'.format(tile_id, direction))
         self.notify_observers()
@@ -228,19 +466,63 @@ class Board(object):
         Rotates the ports 90 degrees. Useful when using the default port setup but the spectator is watching
         at a "rotated" angle from "true north".
         """
-        for port in self.ports:
-            port.tile_id = ((port.tile_id + 1) % len(hexgrid.coastal_tile_ids())) + 1
-            port.direction = hexgrid.rotate_direction(hexgrid.EDGE, port.direction, ccw=True)
+        self.ports = [Port(((port.tile_id + 1) % len(hexgrid.coastal_tile_ids())) + 1,
+                           hexgrid.rotate_direction(hexgrid.EDGE, port.direction, ccw=True),
+                           port.type)
+                      for port in self.ports]
+        self._index_ports()
         self.notify_observers()
 
     def set_terrain(self, terrain):
         self.tiles = [Tile(tile.tile_id, t, tile.number) for t, tile in zip(terrain, self.tiles)]
+        self._index_tiles()
 
     def set_numbers(self, numbers):
         self.tiles = [Tile(tile.tile_id, tile.terrain, n) for n, tile in zip(numbers, self.tiles)]
+        self._index_tiles()
 
     def set_ports(self, ports):
         self.ports = ports
+        self._index_ports()
+
+
+class PiecesView(MutableMapping):
+    """
+    class PiecesView is a dictionary-like view of a Board's piece arrays.
+
+    It maps (hexgrid.TYPE, coord) -> Piece. Reads and writes go straight through to the Board.
+    """
+    def __init__(self, board):
+        self._board = board
+
+    def __getitem__(self, index):
+        hex_type, coord = index
+        piece = self._board.get_piece_at(hex_type, coord)
+        if piece is None:
+            raise KeyError(index)
+        return piece
+
+    def __setitem__(self, index, piece):
+        hex_type, coord = index
+        self._board._set_piece(hex_type, coord, piece)
+
+    def __delitem__(self, index):
+        hex_type, coord = index
+        if self._board.get_piece_at(hex_type, coord) is None:
+            raise KeyError(index)
+        self._board._set_piece(hex_type, coord, None)
+
+    def __iter__(self):
+        for hex_type, array in enumerate(self._board._piece_arrays):
+            for coord, piece in enumerate(array):
+                if piece is not None:
+                    yield (hex_type, coord)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
 
 
 class Tile(object):
@@ -293,6 +575,14 @@ class Terrain(Enum):
             raise ValueError('Illegal Terrain short form {}'.format(char))
 
 
+# Resource-producing terrain, in the order used by resource count vectors and arrays
+RESOURCES = (Terrain.wood, Terrain.brick, Terrain.wheat, Terrain.sheep, Terrain.ore)
+RESOURCE_INDEX = {terrain: i for i, terrain in enumerate(RESOURCES)}
+
+# Bank trade ratios of a player without ports, indexed like RESOURCES
+DEFAULT_TRADE_RATIOS = (4, ) * len(RESOURCES)
+
+
 class HexNumber(Enum):
     none = None
     two = 2
@@ -342,6 +632,20 @@ class PortType(Enum):
         return next_port_type
 
 
+def trade_ratios(port_types):
+    """
+    :param port_types: the port types a player has access to, iterable(PortType)
+    :return: the player's best bank trade ratio for each resource, tuple(int), indexed like RESOURCES
+    """
+    ratios = list(DEFAULT_TRADE_RATIOS)
+    for port_type in port_types:
+        if port_type == PortType.any3:
+            ratios = [min(ratio, 3) for ratio in ratios]
+        elif port_type not in (PortType.any4, PortType.none):
+            ratios[RESOURCE_INDEX[Terrain(port_type.value)]] = 2
+    return tuple(ratios)
+
+
 class Port(object):
     """
     class Port represents a single port on the board.
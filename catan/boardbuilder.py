@@ -15,16 +15,25 @@ Use #build to build a new board with the passed options.
 
 Use #modify to modify an existing board instead of building a new one.
 This will reset the board. #reset is an alias.
+
+Use #generate_layouts to generate many layouts without building a Board for each, eg for
+studies over millions of boards. A layout is only its terrain and numbers, as codes, see class
+Layout. Use Layout.board to build the Board for a layout when it's wanted.
+Use #generate_layout_blocks to generate them K at a time as NumPy arrays, shuffled with
+vectorized permutations.
 """
+import collections
 from enum import Enum
+import functools
 import logging
-import pprint
-import random
 import hexgrid
+import numpy
 import catan.game
 import catan.states
 import catan.board
 import catan.pieces
+import catan.streams
+import catan.trace
 
 
 class Opt(Enum):
@@ -65,20 +74,19 @@ def get_opts(opts):
         _opts.update(opts)
     except Exception:
         raise ValueError('Invalid options={}'.format(opts))
-    logging.debug('used defaults=\n{}\n on opts=\n{}\nreturned total opts=\n{}'.format(
-        pprint.pformat(defaults),
-        pprint.pformat(opts),
-        pprint.pformat(_opts)))
+    if __debug__ and catan.trace.enabled:
+        catan.trace.record('get_opts', defaults=defaults, opts=opts, total_opts=_opts)
     return _opts
 
 
-def build(opts=None):
+def build(opts=None, rng=None):
     """
     Build a new board using the given options.
     :param opts: dictionary mapping str->Opt
+    :param rng: the board's streams.RandomStream, or None for a fresh one
     :return: the new board, Board
     """
-    board = catan.board.Board()
+    board = catan.board.Board(rng=rng)
     modify(board, opts)
     return board
 
@@ -93,7 +101,7 @@ def reset(board, opts=None):
 
 def modify(board, opts=None):
     """
-    Reset an existing board using the given options.
+    Reset an existing board using the given options. Random layouts are drawn from board.rng.
     :param board: the board to reset
     :param opts: dictionary mapping str->Opt
     :return: None
@@ -102,14 +110,165 @@ def modify(board, opts=None):
     if opts['board'] is not None:
         board.tiles = _read_tiles_from_string(opts['board'])
     else:
-        board.tiles = _generate_tiles(opts['terrain'], opts['numbers'])
+        board.tiles = _generate_tiles(opts['terrain'], opts['numbers'], board.rng)
     board.ports = _get_ports(opts['ports'])
     board.state = catan.states.BoardStateModifiable(board)
     board.pieces = _get_pieces(board.tiles, board.ports, opts['players'], opts['pieces'])
     return None
 
 
-def _get_tiles(board=None, terrain=None, numbers=None):
+class Layout(collections.namedtuple('Layout', 'terrain numbers')):
+    """
+    class Layout is a board layout as codes, tile i being tile id i+1:
+    - terrain: tuple of indexes into tuple(catan.board.Terrain), ie codec.TERRAIN
+    - numbers: tuple of dice numbers, 0 for none
+    """
+    __slots__ = ()
+
+    def tiles(self):
+        """
+        :return: list(Tile)
+        """
+        terrain = _terrain_codes()
+        return [catan.board.Tile(tile_id, terrain[t], catan.board.HexNumber.from_digit_or_none(n or None))
+                for tile_id, (t, n) in enumerate(zip(self.terrain, self.numbers), 1)]
+
+    def to_string(self):
+        """
+        :return: the layout as a board string, eg for option 'board'
+        """
+        short_forms = _short_forms()
+        return ' '.join([short_forms[t] for t in self.terrain] +
+                        [str(n or None) for n in self.numbers])
+
+    def board(self, rng=None):
+        """
+        Build the Board for this layout, with preset ports and the robber on the desert. Its
+        option 'board' is the layout, so resetting it keeps the layout.
+
+        :param rng: the board's streams.RandomStream, or None for a fresh one
+        :return: Board
+        """
+        return catan.board.Board(board=self.to_string(), rng=rng)
+
+
+def generate_layouts(terrain_opts=Opt.random, numbers_opts=Opt.random, rng=None, count=None):
+    """
+    Generate layouts, shuffling as #_generate_tiles does. Given a stream with the same key, the
+    layouts are those of the boards #_generate_tiles would make with it.
+
+    :param terrain_opts: Opt, see #_get_tiles
+    :param numbers_opts: Opt, see #_get_tiles
+    :param rng: random.Random to shuffle with, eg a streams.RandomStream, or None for a fresh stream
+    :param count: number of layouts, int, or None to go on forever
+    :return: generator of Layout
+    """
+    if rng is None:
+        rng = catan.streams.RandomStream()
+    base_terrain, base_numbers = _base_codes(terrain_opts, numbers_opts)
+    shuffle_terrain = terrain_opts in (Opt.random, Opt.debug)
+    shuffle_numbers = numbers_opts in (Opt.random, Opt.debug)
+    desert = _terrain_codes().index(catan.board.Terrain.desert)
+    generated = 0
+    while count is None or generated < count:
+        terrain = list(base_terrain)
+        if shuffle_terrain:
+            rng.shuffle(terrain)
+        numbers = list(base_numbers)
+        if shuffle_numbers:
+            rng.shuffle(numbers)
+        if len(numbers) < len(terrain):
+            numbers.insert(terrain.index(desert), 0)
+        yield Layout(tuple(terrain), tuple(numbers))
+        generated += 1
+
+
+def generate_layout_blocks(k, terrain_opts=Opt.random, numbers_opts=Opt.random, rng=None, count=None):
+    """
+    Generate layouts K at a time, as arrays with a row per layout, coded like Layout. Each block
+    is shuffled in a few vectorized permutations rather than one layout at a time.
+
+    e.g. for terrain, numbers in generate_layout_blocks(4096, rng=numpy.random.default_rng(0)):
+             Layout(tuple(terrain[0]), tuple(numbers[0])).board()
+
+    :param k: layouts per block, int
+    :param terrain_opts: Opt, see #_get_tiles
+    :param numbers_opts: Opt, see #_get_tiles
+    :param rng: numpy.random.Generator, or None for a fresh one
+    :param count: number of layouts, int, or None to go on forever. The last block may be short.
+    :return: generator of (terrain, numbers), each a (K, 19) int8 array
+    """
+    if rng is None:
+        rng = numpy.random.default_rng()
+    base_terrain, base_numbers = _base_codes(terrain_opts, numbers_opts)
+    base_terrain = numpy.array(base_terrain, dtype=numpy.int8)
+    base_numbers = numpy.array(base_numbers, dtype=numpy.int8)
+    shuffle_terrain = terrain_opts in (Opt.random, Opt.debug)
+    shuffle_numbers = numbers_opts in (Opt.random, Opt.debug)
+    desert = _terrain_codes().index(catan.board.Terrain.desert)
+    generated = 0
+    while count is None or generated < count:
+        n = k if count is None else min(k, count - generated)
+        terrain = numpy.tile(base_terrain, (n, 1))
+        if shuffle_terrain:
+            terrain = rng.permuted(terrain, axis=1)
+        numbers = numpy.tile(base_numbers, (n, 1))
+        if shuffle_numbers:
+            numbers = rng.permuted(numbers, axis=1)
+        if base_numbers.size < base_terrain.size:
+            # the first desert of each layout gets no number, and the rest follow in order
+            numbered = numpy.ones(terrain.shape, dtype=bool)
+            numbered[numpy.arange(n), numpy.argmax(terrain == desert, axis=1)] = False
+            spread = numpy.zeros(terrain.shape, dtype=numpy.int8)
+            spread[numbered] = numbers.ravel()
+            numbers = spread
+        yield terrain, numbers
+        generated += n
+
+
+@functools.lru_cache(maxsize=None)
+def _terrain_codes():
+    """
+    :return: Terrain by code, tuple(Terrain). Module board imports this module, so it can't be
+             read at import time.
+    """
+    return tuple(catan.board.Terrain)
+
+
+@functools.lru_cache(maxsize=None)
+def _short_forms():
+    """
+    :return: the short form of each terrain code, tuple(str), see Terrain.from_short_form
+    """
+    by_terrain = {catan.board.Terrain.from_short_form(char): char for char in 'wbhsod'}
+    return tuple(by_terrain[terrain] for terrain in _terrain_codes())
+
+
+@functools.lru_cache(maxsize=None)
+def _base_codes(terrain_opts, numbers_opts):
+    """
+    :return: the unshuffled terrain codes, and the unshuffled number codes of the numbered
+             tiles, or of every tile for Opt.empty, each tuple(int)
+    """
+    terrain = _terrain_codes()
+    if terrain_opts == Opt.empty:
+        base_terrain = [catan.board.Terrain.desert] * catan.board.NUM_TILES
+    elif terrain_opts in (Opt.random, Opt.debug):
+        base_terrain = _random_terrain()
+    else:
+        base_terrain = [tile.terrain for tile in _generate_tiles(Opt.preset, Opt.preset)]
+    if numbers_opts == Opt.empty:
+        base_numbers = [catan.board.HexNumber.none] * catan.board.NUM_TILES
+    elif numbers_opts in (Opt.random, Opt.debug):
+        base_numbers = _random_numbers()
+    else:
+        base_numbers = [tile.number for tile in _generate_tiles(Opt.preset, Opt.preset)
+                        if tile.number != catan.board.HexNumber.none]
+    return (tuple(terrain.index(t) for t in base_terrain),
+            tuple(number.value or 0 for number in base_numbers))
+
+
+def _get_tiles(board=None, terrain=None, numbers=None, rng=None):
     """
     Generate a list of tiles using the given terrain and numbers options.
 
@@ -127,6 +286,7 @@ def _get_tiles(board=None, terrain=None, numbers=None):
 
     :param terrain_opts: Opt
     :param numbers_opts: Opt
+    :param rng: random.Random to shuffle with, eg a streams.RandomStream, or None for a fresh stream
     :return: list(Tile)
     """
     if board is not None:
@@ -135,7 +295,7 @@ def _get_tiles(board=None, terrain=None, numbers=None):
         tiles = _read_tiles_from_string(board)
     else:
         # we are being asked to generate a board
-        tiles = _generate_tiles(terrain, numbers)
+        tiles = _generate_tiles(terrain, numbers, rng)
 
     return tiles
 
@@ -145,27 +305,25 @@ def _read_tiles_from_string(board_str):
                if char in ('w', 'b', 'h', 's', 'o', 'd')]
     numbers = [catan.board.HexNumber.from_digit_or_none(num) for num in board_str.split(' ')
                if num in ('2','3','4','5','6','8','9','10','11','12','None')]
-    logging.info('terrain:{}, numbers:{}'.format(terrain, numbers))
+    if __debug__ and catan.trace.enabled:
+        catan.trace.record('read_tiles_from_string', terrain=terrain, numbers=numbers)
     tile_data = list(zip(terrain, numbers))
     tiles = [catan.board.Tile(i, t, n) for i, (t, n) in enumerate(tile_data, 1)]
 
     return tiles
 
 
-def _generate_tiles(terrain_opts, numbers_opts):
+def _generate_tiles(terrain_opts, numbers_opts, rng=None):
+    if rng is None:
+        rng = catan.streams.RandomStream()
     terrain = None
     numbers = None
 
     if terrain_opts == Opt.empty:
         terrain = ([catan.board.Terrain.desert] * catan.board.NUM_TILES)
     elif terrain_opts in (Opt.random, Opt.debug):
-        terrain = ([catan.board.Terrain.desert] +
-                   [catan.board.Terrain.brick] * 3 +
-                   [catan.board.Terrain.ore] * 3 +
-                   [catan.board.Terrain.wood] * 4 +
-                   [catan.board.Terrain.sheep] * 4 +
-                   [catan.board.Terrain.wheat] * 4)
-        random.shuffle(terrain)
+        terrain = _random_terrain()
+        rng.shuffle(terrain)
     elif terrain_opts == Opt.preset:
         terrain = ([catan.board.Terrain.wood,
                     catan.board.Terrain.wheat,
@@ -190,13 +348,8 @@ def _generate_tiles(terrain_opts, numbers_opts):
     if numbers_opts == Opt.empty:
         numbers = ([catan.board.HexNumber.none] * catan.board.NUM_TILES)
     elif numbers_opts in (Opt.random, Opt.debug):
-        numbers = ([catan.board.HexNumber.two] +
-                   [catan.board.HexNumber.three]*2 + [catan.board.HexNumber.four]*2 +
-                   [catan.board.HexNumber.five]*2 + [catan.board.HexNumber.six]*2 +
-                   [catan.board.HexNumber.eight]*2 + [catan.board.HexNumber.nine]*2 +
-                   [catan.board.HexNumber.ten]*2 + [catan.board.HexNumber.eleven]*2 +
-                   [catan.board.HexNumber.twelve])
-        random.shuffle(numbers)
+        numbers = _random_numbers()
+        rng.shuffle(numbers)
         numbers.insert(terrain.index(catan.board.Terrain.desert), catan.board.HexNumber.none)
     elif numbers_opts == Opt.preset:
         numbers = ([catan.board.HexNumber.five,
@@ -228,6 +381,30 @@ def _generate_tiles(terrain_opts, numbers_opts):
     return tiles
 
 
+def _random_terrain():
+    """
+    :return: the terrain of Opt.random, before shuffling, list(Terrain)
+    """
+    return ([catan.board.Terrain.desert] +
+            [catan.board.Terrain.brick] * 3 +
+            [catan.board.Terrain.ore] * 3 +
+            [catan.board.Terrain.wood] * 4 +
+            [catan.board.Terrain.sheep] * 4 +
+            [catan.board.Terrain.wheat] * 4)
+
+
+def _random_numbers():
+    """
+    :return: the numbers of Opt.random, before shuffling and without the desert's, list(HexNumber)
+    """
+    return ([catan.board.HexNumber.two] +
+            [catan.board.HexNumber.three]*2 + [catan.board.HexNumber.four]*2 +
+            [catan.board.HexNumber.five]*2 + [catan.board.HexNumber.six]*2 +
+            [catan.board.HexNumber.eight]*2 + [catan.board.HexNumber.nine]*2 +
+            [catan.board.HexNumber.ten]*2 + [catan.board.HexNumber.eleven]*2 +
+            [catan.board.HexNumber.twelve])
+
+
 def _get_ports(port_opts):
     """
     Generate a list of ports using the given options.
@@ -0,0 +1,197 @@
+"""
+module bufferedlog provides a catanlog which writes to file on a background thread.
+
+catanlog.CatanLog opens, appends to and closes the log file on every log_* call, on the game's
+thread. class BufferedCatanLog instead keeps records in memory, and hands them to a background
+writer thread:
+- at the end of every turn
+- when more than flush_chars characters are waiting
+- when the log is reset for a new game
+- on #flush and #sync
+
+Use it with Game(logging='buffered'). Game.end calls #sync, which waits until everything logged
+so far has been written and fsync'd, in order.
+
+One writer thread serves every BufferedCatanLog in the process, so running many games with
+logging on costs one thread. Records still waiting at interpreter exit are written by an atexit
+handler.
+"""
+import atexit
+import collections
+import logging
+import os
+import queue
+import sys
+import threading
+import weakref
+
+import catanlog
+
+# Hand records to the writer once this many characters are waiting
+DEFAULT_FLUSH_CHARS = 4096
+
+
+class BufferedCatanLog(catanlog.CatanLog):
+    """
+    class BufferedCatanLog is a CatanLog whose file writes happen on a background thread.
+
+    The log's text, #dump, and its file contents once synced are the same as CatanLog's.
+    """
+    def __init__(self, log_dir='log', use_stdout=False, flush_chars=DEFAULT_FLUSH_CHARS):
+        """
+        :param log_dir: directory to write the log to, str
+        :param use_stdout: if True, write to stdout instead of to file
+        :param flush_chars: hand records to the writer once this many characters are waiting, int
+        """
+        super(BufferedCatanLog, self).__init__(auto_flush=False, log_dir=log_dir, use_stdout=use_stdout)
+        self._flush_chars = flush_chars
+        self._path_key = None
+        self._path = None
+        _logs.add(self)
+
+    def _log(self, content):
+        self._buffer += content
+        if len(self._buffer) - self._chars_flushed >= self._flush_chars:
+            self.flush()
+
+    def flush(self):
+        """
+        Hand everything logged since the last flush to the writer thread, without waiting for it
+        to be written. See #sync.
+        """
+        latest = self._latest()
+        if not latest:
+            return
+        self._chars_flushed += len(latest)
+        _writer().write(self._current_path(), latest)
+
+    def sync(self):
+        """
+        Flush, and wait until everything logged so far is written to the file and fsync'd.
+
+        :raises OSError: if the writer failed to write this log's file since the last sync
+        """
+        self.flush()
+        _writer().sync(self._current_path())
+
+    def reset(self):
+        # a new game starts a new file, so the old game's records must be handed over first
+        self.flush()
+        super(BufferedCatanLog, self).reset()
+
+    def log_ends_turn(self, player):
+        super(BufferedCatanLog, self).log_ends_turn(player)
+        self.flush()
+
+    def _current_path(self):
+        """
+        :return: #logpath, or None if writing to stdout. Only recomputed when the timestamp or
+                 players change, since logpath checks the filesystem.
+        """
+        if self._use_stdout:
+            return None
+        key = (self._game_start_timestamp, tuple(player.name for player in self._players))
+        if key != self._path_key:
+            self._path = self.logpath()
+            self._path_key = key
+        return self._path
+
+
+class _Writer(object):
+    """
+    class _Writer appends text to log files on a daemon thread, in the order it was handed over.
+
+    Each pass takes everything queued, and opens each file once to write all of its text.
+    """
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._errors = dict()
+        self._thread = threading.Thread(target=self._run, name='catan-bufferedlog', daemon=True)
+        self._thread.start()
+
+    def write(self, path, text):
+        """
+        :param path: file to append to, or None for stdout
+        :param text: str
+        """
+        self._queue.put((path, text, None))
+
+    def sync(self, path):
+        """
+        Wait until everything handed over so far is written, and the file fsync'd.
+
+        :param path: file to fsync, or None for stdout
+        """
+        done = threading.Event()
+        self._queue.put((path, None, done))
+        done.wait()
+        error = self._errors.pop(path, None)
+        if error is not None:
+            raise error
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            texts = collections.OrderedDict()
+            synced = set()
+            barriers = list()
+            for path, text, done in items:
+                if done is None:
+                    texts.setdefault(path, list()).append(text)
+                else:
+                    synced.add(path)
+                    barriers.append(done)
+            for path in list(texts) + [path for path in synced if path not in texts]:
+                try:
+                    self._write(path, ''.join(texts.get(path, ())), path in synced)
+                except OSError as e:
+                    logging.exception('Failed to write catanlog file={}'.format(path))
+                    self._errors[path] = e
+            for done in barriers:
+                done.set()
+
+    @staticmethod
+    def _write(path, text, durable):
+        if path is None:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return
+        if not os.path.isdir(os.path.dirname(path) or '.'):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'a') as file:
+            file.write(text)
+            if durable:
+                file.flush()
+                os.fsync(file.fileno())
+
+
+_writer_instance = None
+_writer_lock = threading.Lock()
+_logs = weakref.WeakSet()
+
+
+def _writer():
+    """
+    :return: the process's writer, started on first use
+    """
+    global _writer_instance
+    if _writer_instance is None:
+        with _writer_lock:
+            if _writer_instance is None:
+                _writer_instance = _Writer()
+                atexit.register(_flush_all)
+    return _writer_instance
+
+
+def _flush_all():
+    """
+    Hand over every log's waiting records, and wait for them to be written.
+    """
+    for log in list(_logs):
+        log.flush()
+    _writer_instance.sync(None)
@@ -0,0 +1,32 @@
+"""
+module checkpoint reads JSON lines files of results which are appended to as they come in, and
+so double as a checkpoint to resume from, eg validate's verdicts and tournament's game records.
+
+A process killed while appending leaves a last line cut short. #read_checkpoint removes it, so
+the work it recorded is done again on resume.
+"""
+import json
+import os
+
+
+def read_checkpoint(out):
+    """
+    Read a JSON lines file of results written as they came in, eg verdicts.
+
+    :param out: path, str
+    :return: the records already in out, list(dict). A last line cut short by a crash is
+             removed from the file, so its work is done again.
+    """
+    if not os.path.exists(out):
+        return list()
+    records = list()
+    with open(out, 'r+') as file:
+        offset = 0
+        for line in iter(file.readline, ''):
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                file.truncate(offset)
+                break
+            offset = file.tell()
+    return records
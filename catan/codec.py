@@ -0,0 +1,319 @@
+"""
+module codec packs a Game or Board into a compact fixed-layout binary record, and back.
+
+A game record is GAME_RECORD_SIZE bytes: a header, the game section and the board section.
+A board record is the board section alone, BOARD_RECORD_SIZE bytes. All fields are unsigned
+bytes unless noted, little-endian, without padding.
+
+header:  magic b'CG', version
+game:    state id, piece type being placed, road builder roads placed (count, 2 edge coords),
+         dev card state id, seats in play (bitmask), current player seat, turn (uint32),
+         last roll, last player to roll seat, robber tile id, hands (4x5 int32), victory point
+         cards per seat (4), knights per seat (4), largest army seat, longest road holder seat
+board:   locked, terrain per tile (19), number per tile (19), port type per coastal location (30),
+         road owner seat per edge (72), settlement or city per node (54), robber tile id
+
+Seats, tile ids, rolls and piece types use 0 for none. States and enums are stored as their
+index in the tuples below, so new members must be appended to keep old records readable.
+
+Records are fixed-size, so many can be stored back to back, eg in a file. Decoding reads fields
+straight out of any buffer with struct.unpack_from, so a memoryview over an mmap'd file of
+records decodes without copying it, see #iter_games.
+
+To decode many records, pass the Game or Board to decode into, see #decode_game: its objects
+and index tables are reused rather than building a new Game and Board through boardbuilder.
+
+Players are stored by seat only. Decoding matches seats to the players passed in, or to
+Game.get_debug_players by default.
+
+Not stored: observers, the catanlog, undo history, board options, and last_production.
+"""
+import struct
+
+import hexgrid
+import numpy
+
+import catan.board
+import catan.game
+import catan.scoring
+import catan.states
+from catan import topology
+from catan.pieces import Piece, PieceType
+from catan.production import NUM_SEATS
+from catan.resources import NUM_RESOURCES
+
+MAGIC = b'CG'
+# 2: hands are int32, they were int8
+VERSION = 2
+
+GAME_STATES = (
+    catan.states.GameStateNotInGame,
+    catan.states.GameStateNotInGameMoveRobber,
+    catan.states.GameStatePreGamePlaceSettlement,
+    catan.states.GameStatePreGamePlaceRoad,
+    catan.states.GameStatePreGamePlacingPiece,
+    catan.states.GameStateBeginTurn,
+    catan.states.GameStateMoveRobber,
+    catan.states.GameStateMoveRobberUsingKnight,
+    catan.states.GameStateSteal,
+    catan.states.GameStateStealUsingKnight,
+    catan.states.GameStateDuringTurnAfterRoll,
+    catan.states.GameStatePlacingPiece,
+    catan.states.GameStatePlacingRoadBuilderPieces,
+)
+DEV_CARD_STATES = (
+    catan.states.DevCardNotPlayedState,
+    catan.states.DevCardPlayedState,
+)
+PIECE_TYPES = tuple(PieceType)
+TERRAIN = tuple(catan.board.Terrain)
+PORT_TYPES = tuple(catan.board.PortType)
+
+_HEADER = struct.Struct('<2sB')
+_GAME_SCALARS = '<BBBBBBBBIBBB'
+_GAME = struct.Struct('{}{}i{}B{}BBB'.format(_GAME_SCALARS, NUM_SEATS * NUM_RESOURCES, NUM_SEATS, NUM_SEATS))
+# where the hands start in the game section
+_HANDS_OFFSET = struct.calcsize(_GAME_SCALARS)
+_HAND_MIN, _HAND_MAX = -2 ** 31, 2 ** 31 - 1
+_BOARD = struct.Struct('<B{}B{}B{}B{}B{}BB'.format(
+    len(topology.TILE_IDS), len(topology.TILE_IDS), len(topology.COASTAL_COORDS),
+    len(topology.EDGE_COORDS), len(topology.NODE_COORDS)))
+
+BOARD_RECORD_SIZE = _BOARD.size
+GAME_RECORD_SIZE = _HEADER.size + _GAME.size + _BOARD.size
+
+_GAME_STATE_IDS = {cls: i for i, cls in enumerate(GAME_STATES)}
+_DEV_CARD_STATE_IDS = {cls: i for i, cls in enumerate(DEV_CARD_STATES)}
+_COASTAL_INDEX = {coastal: i for i, coastal in enumerate(topology.COASTAL_COORDS)}
+
+
+def encode_board(board, buffer=None, offset=0):
+    """
+    :param board: Board
+    :param buffer: writable buffer to pack into, eg a bytearray. If None, a new bytes is returned.
+    :param offset: where in the buffer to pack the record, int
+    :return: the record as bytes if no buffer was given, otherwise None
+    """
+    values = _board_values(board)
+    if buffer is None:
+        return _BOARD.pack(*values)
+    _BOARD.pack_into(buffer, offset, *values)
+
+
+def decode_board(data, offset=0, players=None, board=None):
+    """
+    :param data: buffer holding a board record, eg bytes or memoryview
+    :param offset: where in the buffer the record starts, int
+    :param players: players to own the pieces, matched by seat, iterable(Player)
+    :param board: Board to decode into, reusing it, or None for a new Board
+    :return: Board
+    """
+    return _board_from_values(_BOARD.unpack_from(data, offset), _players_by_seat(players), board)
+
+
+def encode_game(game, buffer=None, offset=0):
+    """
+    :param game: Game
+    :param buffer: writable buffer to pack into, eg a bytearray. If None, a new bytes is returned.
+    :param offset: where in the buffer to pack the record, int
+    :return: the record as bytes if no buffer was given, otherwise None
+    """
+    if buffer is None:
+        buffer = bytearray(GAME_RECORD_SIZE)
+        encode_game(game, buffer)
+        return bytes(buffer)
+    _HEADER.pack_into(buffer, offset, MAGIC, VERSION)
+    if game.hands.min() < _HAND_MIN or game.hands.max() > _HAND_MAX:
+        raise ValueError('Hands must fit in int32 to be encoded, got {}'.format(game.hands.tolist()))
+    _GAME.pack_into(buffer, offset + _HEADER.size, *_game_values(game))
+    _BOARD.pack_into(buffer, offset + _HEADER.size + _GAME.size, *_board_values(game.board))
+
+
+def decode_game(data, offset=0, players=None, logging='off', game=None):
+    """
+    :param data: buffer holding a game record, eg bytes or memoryview
+    :param offset: where in the buffer the record starts, int
+    :param players: the game's players, matched by seat, iterable(Player)
+    :param logging: (on|off), see Game. Ignored when decoding into a game.
+    :param game: Game to decode into, reusing it and its Board, or None for a new Game. Its
+                 undo history is cleared. Its observers and catanlog are kept.
+    :return: Game
+    """
+    magic, version = _HEADER.unpack_from(data, offset)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a version {} game record: magic={}, version={}'.format(VERSION, magic, version))
+    players_by_seat = _players_by_seat(players)
+    board_values = _BOARD.unpack_from(data, offset + _HEADER.size + _GAME.size)
+    board = _board_from_values(board_values, players_by_seat, game.board if game is not None else None)
+    hands = numpy.frombuffer(data, dtype='<i4', count=NUM_SEATS * NUM_RESOURCES,
+                             offset=offset + _HEADER.size + _HANDS_OFFSET)
+    game = _game_from_values(_GAME.unpack_from(data, offset + _HEADER.size), hands, board, players_by_seat,
+                             logging, game)
+    # Game() unlocks the board
+    _set_locked(board, board_values[0])
+    return game
+
+
+def iter_games(data, players=None, logging='off', game=None):
+    """
+    Decode back to back game records, without copying the buffer.
+
+    :param data: buffer holding game records, eg bytes, bytearray or mmap
+    :param players: see #decode_game
+    :param logging: see #decode_game
+    :param game: Game to decode every record into, see #decode_game. Each Game yielded is then
+                 this same Game, overwritten by the next record.
+    :return: generator of Game
+    """
+    view = memoryview(data)
+    for offset in range(0, len(view) - GAME_RECORD_SIZE + 1, GAME_RECORD_SIZE):
+        yield decode_game(view, offset, players, logging, game)
+
+
+def _players_by_seat(players):
+    if players is None:
+        players = catan.game.Game.get_debug_players()
+    return {player.seat: player for player in players}
+
+
+def _seat(player):
+    return player.seat if player is not None else 0
+
+
+def _game_values(game):
+    state_fields = vars(game.state)
+    piece_type = state_fields.get('piece_type')
+    edges = list(state_fields.get('edges', ()))
+    seats = 0
+    for player in game.players:
+        seats |= 1 << (player.seat - 1)
+    longest_road_holder = game.board.longest_road.holder_seat_idx
+    largest_army_holder = game.score_ledger.largest_army_seat_idx
+    return ((_GAME_STATE_IDS[type(game.state)],
+             PIECE_TYPES.index(piece_type) + 1 if piece_type is not None else 0,
+             len(edges)) +
+            tuple(edges + [0] * (2 - len(edges))) +
+            (_DEV_CARD_STATE_IDS[type(game.dev_card_state)],
+             seats,
+             _seat(game._cur_player),
+             game._cur_turn,
+             int(game.last_roll) if game.last_roll is not None else 0,
+             _seat(game.last_player_to_roll),
+             game.robber_tile or 0) +
+            tuple(int(n) for n in game.hands.flat) +
+            tuple(game.score_ledger.victory_point_cards(i) for i in range(NUM_SEATS)) +
+            tuple(game.score_ledger.knights(i) for i in range(NUM_SEATS)) +
+            (largest_army_holder + 1 if largest_army_holder is not None else 0,
+             longest_road_holder + 1 if longest_road_holder is not None else 0))
+
+
+def _game_from_values(values, hands, board, players_by_seat, logging, game=None):
+    (state_id, piece_type, num_edges, edge1, edge2, dev_card_state_id, seats, cur_seat, turn,
+     last_roll, last_seat, robber_tile) = values[:12]
+    num_hands = NUM_SEATS * NUM_RESOURCES
+    victory_point_cards = values[12 + num_hands:12 + num_hands + NUM_SEATS]
+    knights = values[12 + num_hands + NUM_SEATS:12 + num_hands + 2 * NUM_SEATS]
+    largest_army_seat, longest_road_seat = values[-2:]
+
+    players = [players_by_seat[seat] for seat in range(1, NUM_SEATS + 1) if seats & (1 << (seat - 1))]
+    if game is None:
+        game = catan.game.Game(players=players, board=board, logging=logging)
+    else:
+        game.players = players
+        game.last_production = None
+        game.score_ledger = catan.scoring.ScoreLedger()
+        game.undo_manager.checkpoint()
+    game._cur_player = players_by_seat.get(cur_seat)
+    game._cur_turn = turn
+    game.last_roll = last_roll or None
+    game.last_player_to_roll = players_by_seat.get(last_seat)
+    game.robber_tile = robber_tile or None
+    game.hands = hands.reshape((NUM_SEATS, NUM_RESOURCES)).astype(numpy.int64)
+
+    game.score_ledger._victory_point_cards = list(victory_point_cards)
+    game.score_ledger._knights = list(knights)
+    game.score_ledger.largest_army_seat_idx = largest_army_seat - 1 if largest_army_seat else None
+    board.longest_road.holder_seat_idx = longest_road_seat - 1 if longest_road_seat else None
+
+    state = object.__new__(GAME_STATES[state_id])
+    state.game = game
+    if piece_type:
+        state.piece_type = PIECE_TYPES[piece_type - 1]
+    if GAME_STATES[state_id] is catan.states.GameStatePlacingRoadBuilderPieces:
+        state.edges = [edge1, edge2][:num_edges]
+    game.state = state
+    game.dev_card_state = DEV_CARD_STATES[dev_card_state_id](game)
+    return game
+
+
+def _board_values(board):
+    ports = [0] * len(topology.COASTAL_COORDS)
+    for port in board.ports:
+        if (port.tile_id, port.direction) not in _COASTAL_INDEX:
+            raise ValueError('Port {} is not on the coast, it can\'t be encoded'.format(port))
+        ports[_COASTAL_INDEX[port.tile_id, port.direction]] = PORT_TYPES.index(port.type) + 1
+    edges = board._piece_arrays[hexgrid.EDGE]
+    nodes = board._piece_arrays[hexgrid.NODE]
+    node_values = list()
+    for node in topology.NODE_COORDS:
+        piece = nodes[node]
+        if piece is None:
+            node_values.append(0)
+        elif piece.type == PieceType.city:
+            node_values.append(NUM_SEATS + piece.owner.seat)
+        else:
+            node_values.append(piece.owner.seat)
+    robber_tile = 0
+    tiles = board._piece_arrays[hexgrid.TILE]
+    for tile_id in topology.TILE_IDS:
+        if tiles[topology.TILE_ID_TO_COORD[tile_id]] is not None:
+            robber_tile = tile_id
+    return ((int(isinstance(board.state, catan.states.BoardStateLocked)), ) +
+            tuple(TERRAIN.index(tile.terrain) for tile in board.tiles) +
+            tuple(tile.number.value or 0 for tile in board.tiles) +
+            tuple(ports) +
+            tuple(_seat(edges[edge] and edges[edge].owner) for edge in topology.EDGE_COORDS) +
+            tuple(node_values) +
+            (robber_tile, ))
+
+
+def _board_from_values(values, players_by_seat, board=None):
+    num_tiles = len(topology.TILE_IDS)
+    num_coastal = len(topology.COASTAL_COORDS)
+    locked = values[0]
+    terrain = values[1:1 + num_tiles]
+    numbers = values[1 + num_tiles:1 + 2 * num_tiles]
+    ports = values[1 + 2 * num_tiles:1 + 2 * num_tiles + num_coastal]
+    edges = values[1 + 2 * num_tiles + num_coastal:1 + 2 * num_tiles + num_coastal + len(topology.EDGE_COORDS)]
+    nodes = values[-1 - len(topology.NODE_COORDS):-1]
+    robber_tile = values[-1]
+
+    if board is None:
+        board = catan.board.Board(terrain='empty', numbers='empty', ports='empty', pieces='empty')
+    else:
+        board.state = catan.states.BoardStateModifiable(board)
+    board.tiles = [catan.board.Tile(tile_id, TERRAIN[t], catan.board.HexNumber(n or None))
+                   for tile_id, t, n in zip(topology.TILE_IDS, terrain, numbers)]
+    board.ports = [catan.board.Port(tile_id, direction, PORT_TYPES[port - 1])
+                   for (tile_id, direction), port in zip(topology.COASTAL_COORDS, ports) if port]
+    pieces = dict()
+    for edge, seat in zip(topology.EDGE_COORDS, edges):
+        if seat:
+            pieces[hexgrid.EDGE, edge] = Piece(PieceType.road, players_by_seat[seat])
+    for node, value in zip(topology.NODE_COORDS, nodes):
+        if value > NUM_SEATS:
+            pieces[hexgrid.NODE, node] = Piece(PieceType.city, players_by_seat[value - NUM_SEATS])
+        elif value:
+            pieces[hexgrid.NODE, node] = Piece(PieceType.settlement, players_by_seat[value])
+    if robber_tile:
+        pieces[hexgrid.TILE, topology.TILE_ID_TO_COORD[robber_tile]] = Piece(PieceType.robber, None)
+    board.pieces = pieces
+    _set_locked(board, locked)
+    return board
+
+
+def _set_locked(board, locked):
+    if locked:
+        board.lock()
+    else:
+        board.unlock()
@@ -0,0 +1,191 @@
+"""
+module dispatch delivers Game and Board notifications to many observers through asyncio, so a
+slow observer never holds up the game.
+
+class AsyncDispatcher is itself an observer. Add it to a Game's (and/or Board's) observers set,
+and add the real observers, eg spectator connections, to the dispatcher. When notified, it
+queues the notification for each of its observers and returns at once. Each observer has its own
+task, draining its own queue, so observers are notified concurrently and at their own pace.
+
+e.g. dispatcher = AsyncDispatcher()
+     game.observers.add(dispatcher)
+     dispatcher.add(spectator)
+
+Observers keep the usual protocol: notify(observable) is called with the Game or Board, and
+the observer polls it. notify may also be a coroutine function.
+
+Queues are bounded, and slow observers get coalesced notifications: latest state wins.
+- a notification from an observable which already has one queued for the observer is dropped,
+  since the observer will poll the latest state when it gets the queued one
+- when an observer's queue is full, its oldest item is dropped to make room
+
+The dispatcher can also carry the typed events of module events. Subscribe its #publish to the
+game, and observers with an on_event(event) method get them, through the same queues.
+
+e.g. game.subscribe(dispatcher.publish, events.Rolled)
+"""
+import asyncio
+import inspect
+import logging
+
+# Default bound on the number of items queued per observer
+DEFAULT_QUEUE_SIZE = 64
+
+_NOTIFY = 'notify'
+_EVENT = 'event'
+
+
+class AsyncDispatcher(object):
+    """
+    class AsyncDispatcher fans notifications out to observers, each through a bounded queue
+    drained by its own asyncio task.
+
+    Observers must be added from within the event loop, which then runs their tasks.
+    #notify and #publish may be called from any thread.
+    """
+    def __init__(self, maxsize=DEFAULT_QUEUE_SIZE):
+        """
+        :param maxsize: the most items queued per observer, int
+        """
+        self.maxsize = maxsize
+        self._subscribers = dict()
+        self._loop = None
+
+    def add(self, observer):
+        """
+        Start notifying the observer. Must be called from within the running event loop.
+
+        :param observer: object with a notify(observable) method, and optionally on_event(event)
+        """
+        if observer in self._subscribers:
+            return
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+        elif self._loop is not loop:
+            raise ValueError('AsyncDispatcher observers must all be added from the same event loop')
+        subscriber = _Subscriber(observer, self.maxsize)
+        subscriber.task = loop.create_task(self._run(subscriber))
+        self._subscribers[observer] = subscriber
+
+    def remove(self, observer):
+        """
+        Stop notifying the observer. Anything still queued for it is dropped.
+
+        :param observer: observer passed to #add
+        """
+        subscriber = self._subscribers.pop(observer, None)
+        if subscriber is not None:
+            subscriber.task.cancel()
+
+    def notify(self, observable):
+        """
+        Queue a notification of the observable for every observer, without waiting for them.
+
+        :param observable: Game or Board
+        """
+        self._call_in_loop(self._put, _NOTIFY, observable)
+
+    def publish(self, event):
+        """
+        Queue the event for every observer which has an on_event method. For Game.subscribe.
+
+        :param event: events.Event
+        """
+        self._call_in_loop(self._put, _EVENT, event)
+
+    async def drain(self):
+        """
+        Wait until every observer has been given everything queued so far.
+        """
+        await asyncio.gather(*[subscriber.queue.join() for subscriber in list(self._subscribers.values())])
+
+    async def close(self):
+        """
+        Stop notifying all observers, dropping anything still queued.
+        """
+        subscribers = list(self._subscribers.values())
+        self._subscribers.clear()
+        for subscriber in subscribers:
+            subscriber.task.cancel()
+        await asyncio.gather(*[subscriber.task for subscriber in subscribers], return_exceptions=True)
+
+    def stats(self, observer):
+        """
+        :param observer: observer passed to #add
+        :return: (delivered, coalesced, dropped, queued) item counts for the observer, tuple(int)
+        """
+        subscriber = self._subscribers[observer]
+        return subscriber.delivered, subscriber.coalesced, subscriber.dropped, subscriber.queue.qsize()
+
+    def _call_in_loop(self, method, *args):
+        if self._loop is None:
+            return
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            method(*args)
+        else:
+            self._loop.call_soon_threadsafe(method, *args)
+
+    def _put(self, kind, item):
+        for subscriber in list(self._subscribers.values()):
+            subscriber.put(kind, item)
+
+    async def _run(self, subscriber):
+        observer = subscriber.observer
+        while True:
+            kind, item = await subscriber.queue.get()
+            try:
+                if kind == _NOTIFY:
+                    # from here on, a new notification of the observable must be queued again
+                    subscriber.queued_observables.discard(id(item))
+                    result = observer.notify(item)
+                else:
+                    result = observer.on_event(item)
+                if inspect.isawaitable(result):
+                    await result
+                subscriber.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception('Observer {} failed on {} {}'.format(observer, kind, item))
+            finally:
+                subscriber.queue.task_done()
+
+
+class _Subscriber(object):
+    """
+    class _Subscriber is one observer of an AsyncDispatcher: its queue, its task and its counts.
+    """
+    def __init__(self, observer, maxsize):
+        self.observer = observer
+        self.queue = asyncio.Queue(maxsize)
+        self.queued_observables = set()
+        self.wants_events = callable(getattr(observer, 'on_event', None))
+        self.task = None
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def put(self, kind, item):
+        """
+        Queue the item, coalescing notifications and dropping the oldest item if full.
+        """
+        if kind == _NOTIFY:
+            if id(item) in self.queued_observables:
+                self.coalesced += 1
+                return
+        elif not self.wants_events:
+            return
+        if self.queue.full():
+            old_kind, old_item = self.queue.get_nowait()
+            self.queue.task_done()
+            if old_kind == _NOTIFY:
+                self.queued_observables.discard(id(old_item))
+            self.dropped += 1
+        self.queue.put_nowait((kind, item))
+        if kind == _NOTIFY:
+            self.queued_observables.add(id(item))
@@ -0,0 +1,128 @@
+"""
+module events defines the typed change events a Game publishes to its subscribers.
+
+Subscribe to the event types you care about, and the callback is called with each event of those
+types (or their subclasses) as it happens. Each event carries a small payload describing the
+change, so there is no need to re-poll the whole game.
+
+e.g. game.subscribe(on_roll, events.Rolled)
+     game.subscribe(on_anything)  # every event, same as events.Event
+     game.unsubscribe(on_roll)
+
+Within an action or a Game.transaction, events are delivered in order when it ends. Events of a
+transaction which raises are dropped, since the game is put back the way it was.
+
+Subscriptions sit alongside the observers set, which is still notified with notify(game).
+"""
+
+
+class Event(object):
+    """
+    class Event is the base of all events. Subscribing to it subscribes to every event.
+    """
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self):
+        return hash((type(self), ) + tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__))
+
+
+class PiecePlaced(Event):
+    """
+    A road, settlement or city was built.
+
+    :param piece: Piece
+    :param coord: where it was placed, edge or node coordinate, int
+    """
+    __slots__ = ('piece', 'coord')
+
+    def __init__(self, piece, coord):
+        self.piece = piece
+        self.coord = coord
+
+
+class StateChanged(Event):
+    """
+    The game moved to a new GameState.
+
+    :param old: type of the previous GameState, or None
+    :param new: type of the new GameState
+    """
+    __slots__ = ('old', 'new')
+
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+
+
+class Rolled(Event):
+    """
+    A player rolled the dice.
+
+    :param player: Player who rolled
+    :param roll: dice sum, int or str as passed to Game.roll
+    """
+    __slots__ = ('player', 'roll')
+
+    def __init__(self, player, roll):
+        self.player = player
+        self.roll = roll
+
+
+class RobberMoved(Event):
+    """
+    The robber moved between tiles.
+
+    :param player: Player who moved it
+    :param from_tile: tile id, or None if the robber was not on the board
+    :param to_tile: tile id
+    """
+    __slots__ = ('player', 'from_tile', 'to_tile')
+
+    def __init__(self, player, from_tile, to_tile):
+        self.player = player
+        self.from_tile = from_tile
+        self.to_tile = to_tile
+
+
+class Traded(Event):
+    """
+    A trade was made, with another player or a port.
+
+    :param trade: CatanTrade
+    """
+    __slots__ = ('trade', )
+
+    def __init__(self, trade):
+        self.trade = trade
+
+
+class TurnEnded(Event):
+    """
+    A player ended their turn.
+
+    :param player: Player whose turn ended
+    :param next_player: Player whose turn it is now
+    :param turn: number of turns ended so far, int
+    """
+    __slots__ = ('player', 'next_player', 'turn')
+
+    def __init__(self, player, next_player, turn):
+        self.player = player
+        self.next_player = next_player
+        self.turn = turn
+
+
+class Undone(Event):
+    """
+    The latest action was undone. Subscribers which keep their own view of the game should
+    re-read it. Redo needs no event of its own, since it repeats the action's events.
+    """
+    __slots__ = ()
@@ -1,5 +1,5 @@
+import contextlib
 import copy
-import logging
 
 import hexgrid
 import catanlog
@@ -7,7 +7,18 @@ import undoredo
 
 import catan.states
 import catan.board
+import catan.bufferedlog
+import catan.events
+import catan.journal
 import catan.pieces
+import catan.production
+import catan.resources
+import catan.scoring
+import catan.streams
+import catan.topology
+import catan.trace
+import catan.trading
+import catan.zobrist
 
 
 class Game(object):
@@ -20,45 +31,78 @@ class Game(object):
 
     e.g. self.game.observers.add(self)
 
+    Inside a transaction, notifications are deferred, and observers are notified once when it ends.
+    Each undoable action is its own transaction.
+
+    e.g. with game.transaction():
+             game.roll(8)
+             game.end_turn()
+
+    Observers which only care about some changes can subscribe to typed events instead, each
+    carrying what changed. See module events.
+
+    e.g. self.game.subscribe(self.on_roll, events.Rolled)
+
     A Game has state. When changing state, remember to pass the current game to the
     state's constructor. This allows the state to modify the game as appropriate in
     the current state.
 
     e.g. self.set_state(states.GameStateNotInGame(self))
+
+    A Game keeps each player's hand of resources in #hands, a count array with a row per seat,
+    see module resources. Rolls, buys, trades, steals and dev cards move resources between hands.
+    Buying is not refused for lack of resources, so hands are only accurate when every
+    resource-changing action goes through the Game.
+
+    A Game has rng, its own streams.RandomStream. It draws the dice in #roll_dice and the card
+    taken by each steal, and a Game made without a board lays out a new Board from a child
+    stream. A game's key, game.rng.key, and its players' actions are enough to play it again.
+    Undo does not rewind the rng.
     """
-    def __init__(self, players=None, board=None, logging='on', pregame='on', use_stdout=False):
+    def __init__(self, players=None, board=None, logging='on', pregame='on', use_stdout=False, rng=None):
         """
         Create a Game with the given options.
 
         :param players: list(Player)
         :param board: Board
-        :param logging: (on|off)
+        :param logging: (on|buffered|off). buffered writes the log on a background thread,
+                        see module bufferedlog.
         :param pregame: (on|off)
         :param use_stdout: bool (log to stdout?)
+        :param rng: streams.RandomStream, default a stream with a fresh key
         """
         self.observers = set()
-        self.undo_manager = undoredo.UndoManager()
+        self._subscriptions = dict()
+        self._pending_events = list()
+        self._transaction_depth = 0
+        self._notify_pending = False
+        self.undo_manager = catan.journal.UndoJournal()
         self.options = {
             'pregame': pregame,
         }
         self.players = players or list()
-        self.board = board or catan.board.Board()
+        self.rng = rng if rng is not None else catan.streams.RandomStream()
+        self.board = board or catan.board.Board(rng=self.rng.spawn('board'))
         self.robber = catan.pieces.Piece(catan.pieces.PieceType.robber, None)
 
-        # catanlog: writing, reading
+        # catanlog: writing. For reading a log back into a Game, see module replay
         if logging == 'on':
             self.catanlog = catanlog.CatanLog(use_stdout=use_stdout)
+        elif logging == 'buffered':
+            self.catanlog = catan.bufferedlog.BufferedCatanLog(use_stdout=use_stdout)
         else:
             self.catanlog = catanlog.NoopCatanLog()
-        # self.catanlog_reader = catanlog.Reader()
 
         self.state = None # set in #set_state
         self.dev_card_state = None # set in #set_dev_card_state
         self._cur_player = None # set in #set_players
         self.last_roll = None # set in #roll
         self.last_player_to_roll = None # set in #roll
+        self.last_production = None # set in #roll
         self._cur_turn = 0 # incremented in #end_turn
         self.robber_tile = None # set in #move_robber
+        self.score_ledger = catan.scoring.ScoreLedger()
+        self.hands = catan.production.empty_counts()
 
         self.board.observers.add(self)
 
@@ -72,6 +116,10 @@ class Game(object):
         for k, v in self.__dict__.items():
             if k == 'observers':
                 setattr(result, k, set(v))
+            elif k == '_subscriptions':
+                setattr(result, k, {event_type: list(callbacks) for event_type, callbacks in v.items()})
+            elif k == '_pending_events':
+                setattr(result, k, list())
             elif k == 'state':
                 setattr(result, k, v)
             elif k == 'undo_manager':
@@ -85,31 +133,67 @@ class Game(object):
         Does the command using the undo_manager's stack
         :param command: Command
         """
-        self.undo_manager.do(command)
-        self.notify_observers()
+        with self._deferred_notifications():
+            self.undo_manager.do(command)
+            self.notify_observers()
 
     def undo(self):
         """
         Rewind the game to the previous state.
         """
-        self.undo_manager.undo()
-        self.notify_observers()
-        logging.debug('undo_manager undo stack={}'.format(self.undo_manager._undo_stack))
+        with self._deferred_notifications():
+            self.undo_manager.undo()
+            self._emit(catan.events.Undone())
+            self.notify_observers()
+        if __debug__ and catan.trace.enabled:
+            catan.trace.record('undo', undo_steps=len(self.undo_manager._undo_stack),
+                               redo_steps=len(self.undo_manager._redo_stack))
 
     def redo(self):
         """
         Redo the latest undone command.
         """
-        self.undo_manager.redo()
-        self.notify_observers()
-        logging.debug('undo_manager redo stack={}'.format(self.undo_manager._redo_stack))
+        with self._deferred_notifications():
+            self.undo_manager.redo()
+            self.notify_observers()
+        if __debug__ and catan.trace.enabled:
+            catan.trace.record('redo', undo_steps=len(self.undo_manager._undo_stack),
+                               redo_steps=len(self.undo_manager._redo_stack))
 
     def copy(self):
         """
-        Return a deep copy of this Game object. See Game.__deepcopy__ for the copy implementation.
+        Return a snapshot of this Game object, for undo and for search.
+
+        Only mutable state is copied. Players, pieces and the last production are never changed
+        in place, so they are shared, and the board is copied with Board.copy, which shares
+        tiles, ports and pieces. The game states are copied shallowly and point at the copy.
+        The copy's rng starts where this game's rng is, but draws from it don't advance this
+        game's rng, so the copy rolls the same dice until the two games part ways.
+        The copy starts with an empty undo history of its own. The catanlog is copied shallowly, which is enough to
+        rewind it since it only ever appends.
+
+        Use copy.deepcopy(game) for a fully independent copy, see Game.__deepcopy__.
+
         :return: Game
         """
-        return copy.deepcopy(self)
+        result = object.__new__(Game)
+        result.__dict__.update(self.__dict__)
+        result.observers = set(self.observers)
+        result._subscriptions = {event_type: list(callbacks)
+                                 for event_type, callbacks in self._subscriptions.items()}
+        result._pending_events = list()
+        result._transaction_depth = 0
+        result._notify_pending = False
+        result.board = self.board.copy()
+        result.state = _copy_state(self.state, result)
+        result.dev_card_state = _copy_state(self.dev_card_state, result)
+        result.catanlog = copy.copy(self.catanlog)
+        result.score_ledger = self.score_ledger.copy()
+        result.hands = self.hands.copy()
+        result.rng = copy.copy(self.rng)
+        result.undo_manager = catan.journal.UndoJournal(getattr(self.undo_manager, 'max_steps',
+                                                                catan.journal.MAX_STEPS))
+        return result
 
     def restore(self, game):
         """
@@ -128,39 +212,132 @@ class Game(object):
         self.state.game = self
 
         self.dev_card_state = game.dev_card_state
+        self.dev_card_state.game = self
 
         self._cur_player = game._cur_player
         self.last_roll = game.last_roll
         self.last_player_to_roll = game.last_player_to_roll
+        self.last_production = game.last_production
         self._cur_turn = game._cur_turn
         self.robber_tile = game.robber_tile
+        self.score_ledger = game.score_ledger.copy()
+        self.hands = game.hands.copy()
 
         self.notify_observers()
 
-    # def read_from_file(self, file):
-    #     self.catanlog_reader.use_file(file)
-
     def notify(self, observable):
         self.notify_observers()
 
     def notify_observers(self):
+        if self._transaction_depth > 0:
+            self._notify_pending = True
+            return
         for obs in self.observers.copy():
             obs.notify(self)
 
+    def subscribe(self, callback, *event_types):
+        """
+        Call the callback with each event of the given types, or their subclasses.
+
+        :param callback: function taking an events.Event
+        :param event_types: types from module events. If none are given, every event.
+        """
+        for event_type in event_types or (catan.events.Event, ):
+            callbacks = self._subscriptions.setdefault(event_type, list())
+            if callback not in callbacks:
+                callbacks.append(callback)
+
+    def unsubscribe(self, callback, *event_types):
+        """
+        Stop calling the callback with events of the given types.
+
+        :param callback: function passed to #subscribe
+        :param event_types: types from module events. If none are given, all of them.
+        """
+        for event_type in event_types or list(self._subscriptions):
+            callbacks = self._subscriptions.get(event_type, ())
+            if callback in callbacks:
+                callbacks.remove(callback)
+                if not callbacks:
+                    del self._subscriptions[event_type]
+
+    def _emit(self, event):
+        """
+        Deliver the event to its subscribers, or queue it until the transaction ends.
+        """
+        if not self._subscriptions:
+            return
+        if self._transaction_depth > 0:
+            self._pending_events.append(event)
+            return
+        for event_type in type(event).__mro__:
+            for callback in list(self._subscriptions.get(event_type, ())):
+                callback(event)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Apply several actions as one.
+
+        Observers are notified once, when the outermost transaction ends, instead of after each
+        change. The undoable actions called inside are recorded as a single undo step, so one
+        #undo rewinds them all, see UndoJournal.group. If an action raises, the game is put back
+        the way it was before the transaction.
+
+        Transactions can be nested. Only the outermost one groups and notifies.
+
+        e.g. with game.transaction():
+                 game.begin_placing(PieceType.road)
+                 game.place_road(edge)
+        """
+        group = getattr(self.undo_manager, 'group', None)
+        with self._deferred_notifications():
+            if group is None:
+                # e.g. undoredo.UndoManager, each action stays its own step
+                yield
+            else:
+                with group(self):
+                    yield
+
+    @contextlib.contextmanager
+    def _deferred_notifications(self):
+        """
+        Hold notify_observers calls and events until the outermost block ends, then deliver the
+        events and notify once if any calls were made. If the outermost block raises, its events
+        are dropped.
+        """
+        self._transaction_depth += 1
+        try:
+            yield
+        except BaseException:
+            if self._transaction_depth == 1:
+                self._pending_events = list()
+            raise
+        finally:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                events, self._pending_events = self._pending_events, list()
+                for event in events:
+                    self._emit(event)
+                if self._notify_pending:
+                    self._notify_pending = False
+                    self.notify_observers()
+
     def set_state(self, game_state):
         _old_state = self.state
         _old_board_state = self.board.state
         self.state = game_state
+        self._emit(catan.events.StateChanged(type(_old_state) if _old_state is not None else None,
+                                             type(game_state)))
         if game_state.is_in_game():
             self.board.lock()
         else:
             self.board.unlock()
-        logging.info('Game now={}, was={}. Board now={}, was={}'.format(
-            type(self.state).__name__,
-            type(_old_state).__name__,
-            type(self.board.state).__name__,
-            type(_old_board_state).__name__
-        ))
+        if __debug__ and catan.trace.enabled:
+            catan.trace.record('set_state',
+                               game_now=type(self.state).__name__, game_was=type(_old_state).__name__,
+                               board_now=type(self.board.state).__name__,
+                               board_was=type(_old_board_state).__name__)
         self.notify_observers()
 
     def set_dev_card_state(self, dev_state):
@@ -188,10 +365,12 @@ class Game(object):
             players = Game.get_debug_players()
         self.set_players(players)
         if self.options.get('pregame') is None or self.options.get('pregame') == 'on':
-            logging.debug('Entering pregame, game options={}'.format(self.options))
+            if __debug__ and catan.trace.enabled:
+                catan.trace.record('start', pregame=True, options=self.options)
             self.set_state(catan.states.GameStatePreGamePlacingPiece(self, catan.pieces.PieceType.settlement))
         elif self.options.get('pregame') == 'off':
-            logging.debug('Skipping pregame, game options={}'.format(self.options))
+            if __debug__ and catan.trace.enabled:
+                catan.trace.record('start', pregame=False, options=self.options)
             self.set_state(catan.states.GameStateBeginTurn(self))
 
         terrain = list()
@@ -202,14 +381,18 @@ class Game(object):
 
         for (_, coord), piece in self.board.pieces.items():
             if piece.type == catan.pieces.PieceType.robber:
-                self.robber_tile = hexgrid.tile_id_from_coord(coord)
-                logging.debug('Found robber at coord={}, set robber_tile={}'.format(coord, self.robber_tile))
+                self.robber_tile = catan.topology.TILE_COORD_TO_ID[coord]
+                if __debug__ and catan.trace.enabled:
+                    catan.trace.record('found_robber', coord=coord, robber_tile=self.robber_tile)
 
         self.catanlog.log_game_start(self.players, terrain, numbers, self.board.ports)
         self.notify_observers()
 
     def end(self):
         self.catanlog.log_player_wins(self.get_cur_player())
+        if isinstance(self.catanlog, catan.bufferedlog.BufferedCatanLog):
+            # the game is over, its log must be on disk before we return
+            self.catanlog.sync()
         self.set_state(catan.states.GameStateNotInGame(self))
 
     def reset(self):
@@ -218,8 +401,11 @@ class Game(object):
 
         self.last_roll = None
         self.last_player_to_roll = None
+        self.last_production = None
         self._cur_player = None
         self._cur_turn = 0
+        self.score_ledger = catan.scoring.ScoreLedger()
+        self.hands = catan.production.empty_counts()
 
         self.notify_observers()
 
@@ -241,32 +427,168 @@ class Game(object):
         return self.player_has_port_type(self.get_cur_player(), port_type)
 
     def player_has_port_type(self, player, port_type):
-        for port in self.board.ports:
-            if port.type == port_type and self._player_has_port(player, port):
-                return True
-        return False
-
-    def _player_has_port(self, player, port):
-        edge_coord = hexgrid.edge_coord_in_direction(port.tile_id, port.direction)
-        for node in hexgrid.nodes_touching_edge(edge_coord):
-            pieces = self.board.get_pieces((catan.pieces.PieceType.settlement, catan.pieces.PieceType.city), node)
-            if len(pieces) < 1:
-                continue
-            elif len(pieces) > 1:
-                raise Exception('Probably a bug, num={} pieces found on node={}'.format(
-                    len(pieces), node
-                ))
-            assert len(pieces) == 1  # will be asserted by previous if/elif combo
-            piece = pieces[0]
-            if piece.owner == player:
-                return True
-        return False
+        return self.board.player_has_port_type(player, port_type)
+
+    def longest_road_holder(self):
+        """
+        :return: the player holding the longest road, or None. See module longestroad.
+        """
+        seat_idx = self.board.longest_road.holder_seat_idx
+        if seat_idx is None:
+            return None
+        return self._player_in_seat(seat_idx + 1)
+
+    def longest_road_length(self, player=None):
+        """
+        :param player: Player, or None for the length of the longest road overall
+        :return: length of the player's longest road, int
+        """
+        if player is None:
+            return self.board.longest_road.holder_length()
+        return self.board.longest_road.length(player.seat - 1)
+
+    def largest_army_holder(self):
+        """
+        :return: the player holding the largest army, or None. See module scoring.
+        """
+        seat_idx = self.score_ledger.largest_army_seat_idx
+        if seat_idx is None:
+            return None
+        return self._player_in_seat(seat_idx + 1)
+
+    def score(self, player):
+        """
+        The player's victory points. O(1), see module scoring.
+
+        :param player: Player
+        :return: int
+        """
+        seat_idx = player.seat - 1
+        points = (self.board.placement.num_settlements(player)
+                  + 2 * self.board.placement.num_cities(player)
+                  + self.score_ledger.victory_point_cards(seat_idx))
+        if self.board.longest_road.holder_seat_idx == seat_idx:
+            points += catan.scoring.LONGEST_ROAD_POINTS
+        if self.score_ledger.largest_army_seat_idx == seat_idx:
+            points += catan.scoring.LARGEST_ARMY_POINTS
+        return points
+
+    def winner(self):
+        """
+        The player who has reached catan.scoring.VICTORY_POINTS_TO_WIN, or None.
+
+        If several players have, the current player wins, since only they can have just scored.
+
+        :return: Player or None
+        """
+        cur_player = self.get_cur_player()
+        if cur_player in self.players and self.score(cur_player) >= catan.scoring.VICTORY_POINTS_TO_WIN:
+            return cur_player
+        for player in self.players:
+            if self.score(player) >= catan.scoring.VICTORY_POINTS_TO_WIN:
+                return player
+        return None
+
+    def zobrist_hash(self):
+        """
+        64-bit Zobrist hash of the position, for transposition tables. O(1), see module zobrist.
+
+        :return: int
+        """
+        return self.board.zobrist ^ catan.zobrist.game_key(self)
+
+    def hand(self, player):
+        """
+        :param player: Player
+        :return: the player's resources, a count vector. It is a view into #hands, do not modify it.
+        """
+        return self.hands[player.seat - 1]
+
+    def can_afford(self, player, cost):
+        """
+        :param player: Player
+        :param cost: count vector, eg catan.resources.CITY_COST
+        :return: Boolean
+        """
+        return catan.resources.can_afford(self.hands[player.seat - 1], cost)
+
+    def maritime_trades(self, player=None):
+        """
+        Every trade with the bank or a port the player can make with their hand right now.
+        Use catan.trading.maritime_trade to turn one into a CatanTrade.
+
+        :param player: Player, defaults to the current player
+        :return: tuple of (give vector, get vector, ratio), see catan.trading.maritime_trades
+        """
+        player = player or self.get_cur_player()
+        return catan.trading.maritime_trades(self.hands[player.seat - 1],
+                                             self.board.get_trade_ratios(player))
+
+    def _pay(self, cost):
+        """
+        Take the cost from the current player's hand, unless in the pregame where pieces are free.
+        """
+        if not self.state.is_in_pregame():
+            self.hands[self.get_cur_player().seat - 1] -= cost
+
+    def _collect_starting_resources(self, node):
+        """
+        Give the current player one resource for each producing tile touching the node.
+        """
+        hand = self.hands[self.get_cur_player().seat - 1]
+        for tile_id in catan.topology.TILES_TOUCHING_NODE[node]:
+            terrain = self.board.tiles[tile_id - 1].terrain
+            if terrain in catan.board.RESOURCE_INDEX:
+                hand[catan.board.RESOURCE_INDEX[terrain]] += 1
+
+    def _steal_resource(self, victim):
+        """
+        Move one resource, chosen at random, from the victim's hand to the current player's hand.
+        """
+        if victim not in self.players:
+            return
+        victim_hand = self.hands[victim.seat - 1]
+        total = int(victim_hand.sum())
+        if total <= 0:
+            return
+        pick = self.rng.randrange(total)
+        for idx, count in enumerate(victim_hand):
+            if pick < count:
+                break
+            pick -= count
+        victim_hand[idx] -= 1
+        self.hands[self.get_cur_player().seat - 1][idx] += 1
+
+    def _player_in_seat(self, seat):
+        for player in self.players:
+            if player.seat == seat:
+                return player
+        return None
+
+    def roll_dice(self):
+        """
+        Roll two dice from the game's rng, see #roll.
+
+        :return: the dice sum, int
+        """
+        roll = catan.streams.roll_dice(self.rng)
+        self.roll(roll)
+        return roll
 
     @undoredo.undoable
     def roll(self, roll):
+        """
+        Roll the dice. Sets last_production to the resources collected by each seat on this roll,
+        see module production, and adds them to the hands.
+
+        :param roll: dice sum, int or str
+        """
         self.catanlog.log_roll(self.get_cur_player(), roll)
         self.last_roll = roll
         self.last_player_to_roll = self.get_cur_player()
+        self.last_production = self.board.production.produce(int(roll), self.robber_tile)
+        self.hands += self.last_production
+        self._emit(catan.events.Rolled(self.last_player_to_roll, roll))
         if int(roll) == 7:
             self.set_state(catan.states.GameStateMoveRobber(self))
         else:
@@ -274,7 +596,10 @@ class Game(object):
 
     @undoredo.undoable
     def move_robber(self, tile):
+        from_tile = self.robber_tile
         self.state.move_robber(tile)
+        if self.robber_tile != from_tile:
+            self._emit(catan.events.RobberMoved(self.get_cur_player(), from_tile, self.robber_tile))
 
     @undoredo.undoable
     def steal(self, victim):
@@ -286,14 +611,14 @@ class Game(object):
         if self.robber_tile is None:
             return list()
         stealable = set()
-        for node in hexgrid.nodes_touching_tile(self.robber_tile):
-            pieces = self.board.get_pieces(types=(catan.pieces.PieceType.settlement, catan.pieces.PieceType.city), coord=node)
-            if pieces:
-                logging.debug('found stealable player={}, cur={}'.format(pieces[0].owner, self.get_cur_player()))
-                stealable.add(pieces[0].owner)
+        for node in catan.topology.NODES_TOUCHING_TILE[self.robber_tile]:
+            piece = self.board.get_piece_at(hexgrid.NODE, node)
+            if piece is not None:
+                stealable.add(piece.owner)
         if self.get_cur_player() in stealable:
             stealable.remove(self.get_cur_player())
-        logging.debug('stealable players={} at robber tile={}'.format(stealable, self.robber_tile))
+        if __debug__ and catan.trace.enabled:
+            catan.trace.record('stealable_players', players=stealable, robber_tile=self.robber_tile)
         return stealable
 
     @undoredo.undoable
@@ -308,7 +633,9 @@ class Game(object):
         #self.assert_legal_road(edge)
         piece = catan.pieces.Piece(catan.pieces.PieceType.road, self.get_cur_player())
         self.board.place_piece(piece, edge)
-        self.catanlog.log_buys_road(self.get_cur_player(), hexgrid.location(hexgrid.EDGE, edge))
+        self._emit(catan.events.PiecePlaced(piece, edge))
+        self.catanlog.log_buys_road(self.get_cur_player(), catan.topology.location(hexgrid.EDGE, edge))
+        self._pay(catan.resources.ROAD_COST)
         if self.state.is_in_pregame():
             self.end_turn()
         else:
@@ -319,8 +646,12 @@ class Game(object):
         #self.assert_legal_settlement(node)
         piece = catan.pieces.Piece(catan.pieces.PieceType.settlement, self.get_cur_player())
         self.board.place_piece(piece, node)
-        self.catanlog.log_buys_settlement(self.get_cur_player(), hexgrid.location(hexgrid.NODE, node))
+        self._emit(catan.events.PiecePlaced(piece, node))
+        self.catanlog.log_buys_settlement(self.get_cur_player(), catan.topology.location(hexgrid.NODE, node))
+        self._pay(catan.resources.SETTLEMENT_COST)
         if self.state.is_in_pregame():
+            if self.board.placement.num_settlements(self.get_cur_player()) == 2:
+                self._collect_starting_resources(node)
             self.set_state(catan.states.GameStatePreGamePlacingPiece(self, catan.pieces.PieceType.road))
         else:
             self.set_state(catan.states.GameStateDuringTurnAfterRoll(self))
@@ -330,12 +661,15 @@ class Game(object):
         #self.assert_legal_city(node)
         piece = catan.pieces.Piece(catan.pieces.PieceType.city, self.get_cur_player())
         self.board.place_piece(piece, node)
-        self.catanlog.log_buys_city(self.get_cur_player(), hexgrid.location(hexgrid.NODE, node))
+        self._emit(catan.events.PiecePlaced(piece, node))
+        self.catanlog.log_buys_city(self.get_cur_player(), catan.topology.location(hexgrid.NODE, node))
+        self._pay(catan.resources.CITY_COST)
         self.set_state(catan.states.GameStateDuringTurnAfterRoll(self))
 
     @undoredo.undoable
     def buy_dev_card(self):
         self.catanlog.log_buys_dev_card(self.get_cur_player())
+        self._pay(catan.resources.DEV_CARD_COST)
         self.notify_observers()
 
     @undoredo.undoable
@@ -352,51 +686,76 @@ class Game(object):
 
     @undoredo.undoable
     def trade(self, trade):
+        """
+        Make the trade, moving its resources between hands. See catan.trading.CatanTrade.
+
+        :param trade: CatanTrade
+        """
         giver = trade.giver()
         giving = trade.giving()
         getting = trade.getting()
         if hasattr(trade.getter(), 'type') and trade.getter().type in catan.board.PortType:
             getter = trade.getter()
             self.catanlog.log_trades_with_port(giver, giving, getter, getting)
-            logging.debug('trading {} to port={} to get={}'.format(giving, getter, getting))
+            if __debug__ and catan.trace.enabled:
+                catan.trace.record('trade', giving=giving, port=getter, getting=getting)
         else:
+            getter_hand = self.hands[trade.getter().seat - 1]
+            getter_hand += trade.giving_vector()
+            getter_hand -= trade.getting_vector()
             getter = trade.getter()
             self.catanlog.log_trades_with_player(giver, giving, getter, getting)
-            logging.debug('trading {} to player={} to get={}'.format(giving, getter, getting))
+            if __debug__ and catan.trace.enabled:
+                catan.trace.record('trade', giving=giving, player=getter, getting=getting)
+        giver_hand = self.hands[giver.seat - 1]
+        giver_hand -= trade.giving_vector()
+        giver_hand += trade.getting_vector()
+        self._emit(catan.events.Traded(trade))
         self.notify_observers()
 
     @undoredo.undoable
     def play_knight(self):
+        self.score_ledger.play_knight(self.get_cur_player().seat - 1)
         self.set_dev_card_state(catan.states.DevCardPlayedState(self))
         self.set_state(catan.states.GameStateMoveRobberUsingKnight(self))
 
     @undoredo.undoable
     def play_monopoly(self, resource):
         self.catanlog.log_plays_monopoly(self.get_cur_player(), resource)
+        idx = catan.resources.index(resource)
+        total = self.hands[:, idx].sum()
+        self.hands[:, idx] = 0
+        self.hands[self.get_cur_player().seat - 1, idx] = total
         self.set_dev_card_state(catan.states.DevCardPlayedState(self))
 
     @undoredo.undoable
     def play_year_of_plenty(self, resource1, resource2):
         self.catanlog.log_plays_year_of_plenty(self.get_cur_player(), resource1, resource2)
+        hand = self.hands[self.get_cur_player().seat - 1]
+        hand[catan.resources.index(resource1)] += 1
+        hand[catan.resources.index(resource2)] += 1
         self.set_dev_card_state(catan.states.DevCardPlayedState(self))
 
     @undoredo.undoable
     def play_road_builder(self, edge1, edge2):
         self.catanlog.log_plays_road_builder(self.get_cur_player(),
-                                                    hexgrid.location(hexgrid.EDGE, edge1),
-                                                    hexgrid.location(hexgrid.EDGE, edge2))
+                                                    catan.topology.location(hexgrid.EDGE, edge1),
+                                                    catan.topology.location(hexgrid.EDGE, edge2))
         self.set_dev_card_state(catan.states.DevCardPlayedState(self))
 
     @undoredo.undoable
     def play_victory_point(self):
         self.catanlog.log_plays_victory_point(self.get_cur_player())
+        self.score_ledger.play_victory_point(self.get_cur_player().seat - 1)
         self.set_dev_card_state(catan.states.DevCardPlayedState(self))
 
     @undoredo.undoable
     def end_turn(self):
-        self.catanlog.log_ends_turn(self.get_cur_player())
+        player = self.get_cur_player()
+        self.catanlog.log_ends_turn(player)
         self.set_cur_player(self.state.next_player())
         self._cur_turn += 1
+        self._emit(catan.events.TurnEnded(player, self.get_cur_player(), self._cur_turn))
 
         self.set_dev_card_state(catan.states.DevCardNotPlayedState(self))
         if self.state.is_in_pregame():
@@ -412,6 +771,19 @@ class Game(object):
                 Player(4, 'ross', 'red')]
 
 
+def _copy_state(state, game):
+    """
+    Copy a game state or dev card state shallowly, pointing it at the given game.
+
+    copy.copy can't be used: it looks up __setstate__, which GameState.__getattr__ answers
+    with a no-op, so the copy would lose its attributes, eg piece_type.
+    """
+    result = object.__new__(type(state))
+    result.__dict__.update(state.__dict__)
+    result.game = game
+    return result
+
+
 class Player(object):
     """class Player represents a single player on the game board.
 
@@ -440,5 +812,5 @@ class Player(object):
         return '{} ({})'.format(self.color, self.name)
 
     def __hash__(self):
-        return sum(bytes(str(self), encoding='utf8'))
+        return hash((self.seat, self.name, self.color))
 
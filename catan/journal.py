@@ -0,0 +1,239 @@
+"""
+module journal provides delta-based undo and redo for Game.
+
+class UndoJournal is a drop-in replacement for undoredo.UndoManager. Instead of snapshotting
+the whole game before every command, each command records only what it changed:
+- the pieces it placed or removed, as (hex_type, coord, old piece), recorded by Board._set_piece
+- the game and board fields it reassigned (state, current player, turn, last roll, ...)
+- the hands and score ledger, only if the command changed them
+- the longest road holder, which depends on the order roads were placed in
+- how far the catanlog had been written
+
+Undo applies these in reverse. Redo calls the command again.
+
+Undoable commands which call other undoable commands (e.g. place_road -> buy_road -> end_turn
+in the pregame) are recorded as a single step. So are all the commands called inside a #group,
+see Game.transaction.
+
+History is bounded. Once it holds max_steps steps, recording another evicts the oldest, and the
+game as it was after the evicted step becomes the earliest point undo can reach. Use
+#checkpoint to make the current game that point, eg at the end of each turn.
+"""
+import collections
+import contextlib
+
+import catanlog
+import numpy
+import undoredo
+
+# Game and Board fields which commands reassign, but never change in place
+_GAME_FIELDS = ('players', 'state', 'dev_card_state', '_cur_player', '_cur_turn', 'last_roll',
+                'last_player_to_roll', 'last_production', 'robber_tile')
+_BOARD_FIELDS = ('state', 'ports')
+
+# Default bound on the number of undoable steps
+MAX_STEPS = 1000
+
+
+class UndoJournal(object):
+    """
+    class UndoJournal keeps a bounded history of undoable steps, each an inverse delta.
+
+    It has the interface of undoredo.UndoManager, so it works with the @undoredo.undoable
+    decorator: the decorated method's Command is passed to #do.
+    """
+    def __init__(self, max_steps=MAX_STEPS):
+        """
+        :param max_steps: the most steps kept for undo, int
+        """
+        self.max_steps = max_steps
+        self._undo_stack = collections.deque(maxlen=max_steps)
+        self._redo_stack = list()
+        self._recording = False
+        self._group = None
+
+    def do(self, command):
+        # a command called by another, eg while redoing it, is part of that step
+        if not self._recording:
+            self._redo_stack.clear()
+        return self._record(command)
+
+    def can_undo(self):
+        return len(self._undo_stack) > 0
+
+    def can_redo(self):
+        return len(self._redo_stack) > 0
+
+    def undo(self):
+        if len(self._undo_stack) < 1:
+            raise Exception('Cannot perform undo, undo stack is empty')
+        step = self._undo_stack.pop()
+        step.revert()
+        self._redo_stack.append(step.command)
+
+    def redo(self):
+        if len(self._redo_stack) < 1:
+            raise Exception('Cannot perform redo, redo stack is empty')
+        return self._record(self._redo_stack.pop())
+
+    def checkpoint(self):
+        """
+        Forget all history. The game as it is now becomes the earliest point undo can reach.
+        """
+        self._undo_stack.clear()
+        self._redo_stack.clear()
+
+    @contextlib.contextmanager
+    def group(self, game):
+        """
+        Record every command called inside the with block as a single step. Redoing the step
+        calls the commands again, in order.
+
+        If the block raises, the game is put back the way it was before the block.
+        Groups inside a group or a command are part of the outer step.
+
+        :param game: Game the commands are called on
+        """
+        if self._recording:
+            yield
+            return
+        commands = list()
+        step = _Step(undoredo.Command(game, _do_commands, commands))
+        self._group = commands
+        self._start(step)
+        try:
+            yield
+        except BaseException:
+            self._stop(step)
+            self._group = None
+            step.revert()
+            raise
+        self._stop(step)
+        self._group = None
+        if commands:
+            self._redo_stack.clear()
+            step.close()
+            self._undo_stack.append(step)
+
+    def _record(self, command):
+        """
+        Call the command, recording the step it makes. Nested commands are part of the outer step.
+        """
+        game = command.obj
+        if self._recording:
+            if self._group is not None:
+                # a command called directly in a group, remember it for redo
+                group, self._group = self._group, None
+                group.append(command)
+                try:
+                    return command.do_method(game, *command.args)
+                finally:
+                    self._group = group
+            return command.do_method(game, *command.args)
+        step = _Step(command)
+        self._start(step)
+        try:
+            result = command.do_method(game, *command.args)
+        except BaseException:
+            self._stop(step)
+            step.revert()
+            raise
+        self._stop(step)
+        step.close()
+        self._undo_stack.append(step)
+        return result
+
+    def _start(self, step):
+        self._recording = True
+        step.command.obj.board.piece_journal = step.pieces
+
+    def _stop(self, step):
+        step.command.obj.board.piece_journal = None
+        self._recording = False
+
+
+def _do_commands(game, commands):
+    """
+    Call the commands recorded in a #UndoJournal.group, for redo.
+    """
+    for command in commands:
+        command.do_method(game, *command.args)
+
+
+class _Step(object):
+    """
+    class _Step is one undoable step: a command, and the inverse delta of calling it.
+    """
+    __slots__ = ('command', 'pieces', 'fields', 'hands', 'score_ledger', 'longest_road_holder',
+                 'log_position')
+
+    def __init__(self, command):
+        game = command.obj
+        board = game.board
+        self.command = command
+        self.pieces = list()
+        self.fields = ([(game, name, getattr(game, name)) for name in _GAME_FIELDS]
+                       + [(board, name, getattr(board, name)) for name in _BOARD_FIELDS])
+        self.hands = game.hands.copy()
+        self.score_ledger = game.score_ledger.copy()
+        self.longest_road_holder = board.longest_road.holder_seat_idx
+        self.log_position = _log_position(game.catanlog)
+
+    def close(self):
+        """
+        Drop everything the command left unchanged.
+        """
+        game = self.command.obj
+        self.fields = [(target, name, value) for target, name, value in self.fields
+                       if getattr(target, name) is not value]
+        if numpy.array_equal(self.hands, game.hands):
+            self.hands = None
+        if vars(self.score_ledger) == vars(game.score_ledger):
+            self.score_ledger = None
+        if self.log_position == _log_position(game.catanlog):
+            self.log_position = None
+
+    def revert(self):
+        """
+        Put the game back the way it was before the command.
+        """
+        game = self.command.obj
+        board = game.board
+        for hex_type, coord, piece in reversed(self.pieces):
+            board._set_piece(hex_type, coord, piece)
+        board.longest_road.holder_seat_idx = self.longest_road_holder
+        for target, name, value in self.fields:
+            setattr(target, name, value)
+            if target is board and name == 'ports':
+                board._index_ports()
+        game.state.game = game
+        game.dev_card_state.game = game
+        board.state.board = board
+        if self.hands is not None:
+            game.hands = self.hands
+        if self.score_ledger is not None:
+            game.score_ledger = self.score_ledger
+        if self.log_position is not None:
+            _rewind_log(game.catanlog, self.log_position)
+
+
+def _log_position(log):
+    """
+    :return: how far the log has been written and flushed, and the time of its latest line,
+             or None if not logging
+    """
+    if isinstance(log, catanlog.CatanLog):
+        return len(log._buffer), log._chars_flushed, log._latest_timestamp
+    return None
+
+
+def _rewind_log(log, position):
+    """
+    Truncate the log back to a position from #_log_position. A log which has since been reset
+    is left alone.
+    """
+    length, chars_flushed, latest_timestamp = position
+    if isinstance(log, catanlog.CatanLog) and len(log._buffer) >= length:
+        log._buffer = log._buffer[:length]
+        log._chars_flushed = chars_flushed
+        log._latest_timestamp = latest_timestamp
@@ -0,0 +1,260 @@
+"""
+module longestroad tracks each player's longest road, and who holds the longest road.
+
+A player's roads split into connected components. Two roads are connected if they meet at a
+node which is empty or holds one of the player's own settlements or cities. An opponent's
+settlement or city breaks a road: roads can end there, but cannot pass through.
+
+class LongestRoad remembers every component and its longest trail. When a road is placed or
+removed, or a settlement or city changes a node, only the components touching that location
+are recomputed. #rebuild only notes the piece arrays, and the components are measured when
+first needed, so that boards made in bulk, eg decoded by module codec, don't pay for it.
+
+The longest road is held by the player with the longest road of at least MIN_LENGTH roads.
+The holder keeps it until another player's road is strictly longer. If the holder loses it
+and several players tie for the longest road, nobody holds it.
+"""
+import hexgrid
+
+from catan import topology
+from catan.production import NUM_SEATS
+
+# The longest road must be at least this many roads long
+MIN_LENGTH = 5
+
+
+class LongestRoad(object):
+    """
+    class LongestRoad maintains road components, road lengths, and the longest road holder.
+
+    Seats are indexed from 0, ie seat_idx = Player.seat - 1.
+
+    Use #update when a piece changes, and #rebuild to recompute everything from piece arrays.
+    """
+    def __init__(self):
+        # per seat: edge coord -> the frozenset of edges in its component
+        self._components = [dict() for _ in range(NUM_SEATS)]
+        # component (frozenset of edges) -> length of its longest trail
+        self._component_lengths = dict()
+        self._lengths = [0] * NUM_SEATS
+        self._holder_seat_idx = None
+        # piece arrays to measure from scratch on first use, see #rebuild, or None
+        self._pending = None
+        # whether the holder was set since #rebuild, and is to be kept when measuring
+        self._holder_set = False
+
+    @property
+    def holder_seat_idx(self):
+        self._measure()
+        return self._holder_seat_idx
+
+    @holder_seat_idx.setter
+    def holder_seat_idx(self, seat_idx):
+        self._holder_seat_idx = seat_idx
+        self._holder_set = self._pending is not None
+
+    def copy(self):
+        """
+        :return: a LongestRoad which can be updated independently of this one
+        """
+        result = object.__new__(LongestRoad)
+        result._components = [dict(components) for components in self._components]
+        result._component_lengths = dict(self._component_lengths)
+        result._lengths = list(self._lengths)
+        result._holder_seat_idx = self._holder_seat_idx
+        result._pending = self._pending
+        result._holder_set = self._holder_set
+        return result
+
+    def rebuild(self, piece_arrays):
+        """
+        Recompute every component from the board's piece arrays, when they are next needed.
+
+        :param piece_arrays: the board's piece arrays, indexed by hexgrid type then coord
+        """
+        self.__init__()
+        self._pending = piece_arrays
+
+    def _measure(self):
+        """
+        Measure the components from the piece arrays given to #rebuild, if that's still to do.
+        """
+        piece_arrays = self._pending
+        if piece_arrays is None:
+            return
+        self._pending = None
+        edges_by_seat = [set() for _ in range(NUM_SEATS)]
+        for edge in topology.EDGE_COORDS:
+            piece = piece_arrays[hexgrid.EDGE][edge]
+            if piece is not None:
+                edges_by_seat[piece.owner.seat - 1].add(edge)
+        for seat_idx, edges in enumerate(edges_by_seat):
+            self._recompute(seat_idx, edges, piece_arrays)
+        if not self._holder_set:
+            self._update_holder()
+        self._holder_set = False
+
+    def update(self, hex_type, coord, old_piece, new_piece, piece_arrays):
+        """
+        Account for the piece at a coordinate changing from old_piece to new_piece. Either may be None.
+        piece_arrays must already hold new_piece.
+
+        :param hex_type: hexgrid.EDGE, hexgrid.NODE, hexgrid.TILE
+        :param coord: coordinate, int
+        :param old_piece: Piece
+        :param new_piece: Piece
+        :param piece_arrays: the board's piece arrays, indexed by hexgrid type then coord
+        """
+        if self._pending is not None:
+            # measure from scratch, from the arrays as they are now, ie with this change
+            self._pending = piece_arrays
+            self._measure()
+            self._update_holder()
+            return
+        if hex_type == hexgrid.EDGE:
+            if old_piece is not None:
+                seat_idx = old_piece.owner.seat - 1
+                component = self._components[seat_idx].pop(coord, frozenset())
+                self._component_lengths.pop(component, None)
+                self._recompute(seat_idx, component - {coord}, piece_arrays)
+            if new_piece is not None:
+                seat_idx = new_piece.owner.seat - 1
+                affected = {coord}
+                for node in topology.NODES_TOUCHING_EDGE[coord]:
+                    if self._passable(seat_idx, node, piece_arrays):
+                        for edge in topology.EDGES_TOUCHING_NODE[node]:
+                            affected |= self._components[seat_idx].get(edge, frozenset())
+                self._recompute(seat_idx, affected, piece_arrays)
+        elif hex_type == hexgrid.NODE:
+            old_owner = old_piece.owner.seat - 1 if old_piece is not None else None
+            new_owner = new_piece.owner.seat - 1 if new_piece is not None else None
+            if old_owner == new_owner:
+                return
+            for seat_idx in range(NUM_SEATS):
+                affected = set()
+                for edge in topology.EDGES_TOUCHING_NODE[coord]:
+                    affected |= self._components[seat_idx].get(edge, frozenset())
+                if affected:
+                    self._recompute(seat_idx, affected, piece_arrays)
+        else:
+            return
+        self._update_holder()
+
+    def length(self, seat_idx):
+        """
+        :param seat_idx: Player.seat - 1
+        :return: length of the seat's longest road, int
+        """
+        self._measure()
+        return self._lengths[seat_idx]
+
+    def holder_length(self):
+        """
+        :return: length of the longest road, or 0 if nobody holds it, int
+        """
+        self._measure()
+        if self._holder_seat_idx is None:
+            return 0
+        return self._lengths[self._holder_seat_idx]
+
+    def _passable(self, seat_idx, node, piece_arrays):
+        piece = piece_arrays[hexgrid.NODE][node]
+        return piece is None or piece.owner.seat - 1 == seat_idx
+
+    def _recompute(self, seat_idx, edges, piece_arrays):
+        """
+        Re-partition the given edges of a seat into components and measure each of them.
+        The edges must be a union of whole components, plus any newly placed road.
+        """
+        components = self._components[seat_idx]
+        for edge in edges:
+            old = components.pop(edge, None)
+            if old is not None:
+                self._component_lengths.pop(old, None)
+
+        remaining = set(edges)
+        while remaining:
+            start = remaining.pop()
+            component = {start}
+            frontier = [start]
+            while frontier:
+                edge = frontier.pop()
+                for node in topology.NODES_TOUCHING_EDGE[edge]:
+                    if not self._passable(seat_idx, node, piece_arrays):
+                        continue
+                    for other in topology.EDGES_TOUCHING_NODE[node]:
+                        if other in remaining:
+                            remaining.remove(other)
+                            component.add(other)
+                            frontier.append(other)
+            component = frozenset(component)
+            for edge in component:
+                components[edge] = component
+            self._component_lengths[component] = longest_trail(seat_idx, component, piece_arrays)
+
+        lengths = [self._component_lengths[c] for c in set(components.values())]
+        self._lengths[seat_idx] = max(lengths) if lengths else 0
+
+    def _update_holder(self):
+        best = max(self._lengths)
+        holder = self._holder_seat_idx
+        if holder is not None and self._lengths[holder] == best and best >= MIN_LENGTH:
+            return
+        leaders = [seat_idx for seat_idx, length in enumerate(self._lengths) if length == best]
+        if best >= MIN_LENGTH and len(leaders) == 1:
+            self._holder_seat_idx = leaders[0]
+        else:
+            self._holder_seat_idx = None
+
+
+def longest_trail(seat_idx, edges, piece_arrays):
+    """
+    Length of the longest trail (a path which uses each edge at most once) through the given
+    connected edges of a seat. Trails may start or end at an opponent's settlement or city,
+    but not pass through it.
+
+    :param seat_idx: Player.seat - 1
+    :param edges: connected edge coords, set(int)
+    :param piece_arrays: the board's piece arrays, indexed by hexgrid type then coord
+    :return: int
+    """
+    nodes = piece_arrays[hexgrid.NODE]
+
+    def blocked(node):
+        return nodes[node] is not None and nodes[node].owner.seat - 1 != seat_idx
+
+    def walk(node, used):
+        best = 0
+        for edge in topology.EDGES_TOUCHING_NODE[node]:
+            if edge in edges and edge not in used:
+                a, b = topology.NODES_TOUCHING_EDGE[edge]
+                other = b if a == node else a
+                used.add(edge)
+                if blocked(other):
+                    length = 1
+                else:
+                    length = 1 + walk(other, used)
+                used.remove(edge)
+                if length > best:
+                    best = length
+        return best
+
+    start_nodes = set()
+    for edge in edges:
+        start_nodes.update(topology.NODES_TOUCHING_EDGE[edge])
+    best = 0
+    for node in start_nodes:
+        best = max(best, walk(node, set()))
+    return best
+
+
+def longest_road_lengths(piece_arrays):
+    """
+    Compute every seat's longest road from scratch, without any incremental state.
+
+    :param piece_arrays: the board's piece arrays, indexed by hexgrid type then coord
+    :return: list of lengths, indexed by seat_idx
+    """
+    tracker = LongestRoad()
+    tracker.rebuild(piece_arrays)
+    return [tracker.length(seat_idx) for seat_idx in range(NUM_SEATS)]
@@ -0,0 +1,208 @@
+"""
+module placement generates legal piece placements using bitboards.
+
+class Placement keeps bitmasks over the board's nodes and edges (see module topology for
+the bit layout): occupied nodes and edges, nodes blocked by the distance rule, and each
+seat's settlements, cities, roads and the nodes its roads reach. The masks are updated
+incrementally as pieces are placed and removed, so legal placements are a handful of
+integer operations away.
+
+Placement rules:
+- settlement: on an empty node which is not adjacent to any settlement or city (distance rule).
+  Outside of the pregame, it must also touch one of the player's roads.
+- road: on an empty edge which touches one of the player's settlements or cities, or touches
+  one of the player's roads at a node which is not occupied by an opponent. In the pregame, it
+  must touch the settlement just placed, which is the player's only settlement without a road.
+- city: on one of the player's settlements.
+"""
+import hexgrid
+
+import catan.pieces
+from catan import topology
+from catan.production import NUM_SEATS
+
+
+class Placement(object):
+    """
+    class Placement maintains the bitboards used to generate and check legal placements.
+
+    Use #update when a piece changes, and #rebuild to recompute everything from piece arrays.
+    """
+    def __init__(self):
+        self._occupied_nodes = 0
+        self._occupied_edges = 0
+        self._blocked_nodes = 0
+        self._settlements = [0] * NUM_SEATS
+        self._cities = [0] * NUM_SEATS
+        self._roads = [0] * NUM_SEATS
+        self._road_nodes = [0] * NUM_SEATS
+
+    def copy(self):
+        """
+        :return: a Placement which can be updated independently of this one
+        """
+        result = object.__new__(Placement)
+        result._occupied_nodes = self._occupied_nodes
+        result._occupied_edges = self._occupied_edges
+        result._blocked_nodes = self._blocked_nodes
+        result._settlements = list(self._settlements)
+        result._cities = list(self._cities)
+        result._roads = list(self._roads)
+        result._road_nodes = list(self._road_nodes)
+        return result
+
+    def rebuild(self, edge_pieces, node_pieces):
+        """
+        Recompute every mask from the board's piece arrays.
+
+        :param edge_pieces: edge piece array, indexed by edge coord, see Board
+        :param node_pieces: node piece array, indexed by node coord, see Board
+        """
+        self.__init__()
+        for edge in topology.EDGE_COORDS:
+            if edge_pieces[edge] is not None:
+                self.update(hexgrid.EDGE, edge, None, edge_pieces[edge])
+        for node in topology.NODE_COORDS:
+            if node_pieces[node] is not None:
+                self.update(hexgrid.NODE, node, None, node_pieces[node])
+
+    def update(self, hex_type, coord, old_piece, new_piece):
+        """
+        Account for the piece at a coordinate changing from old_piece to new_piece. Either may be None.
+
+        :param hex_type: hexgrid.EDGE, hexgrid.NODE, hexgrid.TILE
+        :param coord: coordinate, int
+        :param old_piece: Piece
+        :param new_piece: Piece
+        """
+        if hex_type == hexgrid.NODE:
+            bit = topology.NODE_BITS[coord]
+            if old_piece is not None:
+                seat_idx = old_piece.owner.seat - 1
+                self._settlements[seat_idx] &= ~bit
+                self._cities[seat_idx] &= ~bit
+                self._occupied_nodes &= ~bit
+            if new_piece is not None:
+                seat_idx = new_piece.owner.seat - 1
+                if new_piece.type == catan.pieces.PieceType.city:
+                    self._cities[seat_idx] |= bit
+                else:
+                    self._settlements[seat_idx] |= bit
+                self._occupied_nodes |= bit
+            if old_piece is None:
+                self._blocked_nodes |= topology.NODE_NEIGHBOURHOOD_MASKS[coord]
+            elif new_piece is None:
+                self._blocked_nodes = self._compute_blocked_nodes()
+        elif hex_type == hexgrid.EDGE:
+            bit = topology.EDGE_BITS[coord]
+            if old_piece is not None:
+                seat_idx = old_piece.owner.seat - 1
+                self._roads[seat_idx] &= ~bit
+                self._occupied_edges &= ~bit
+                self._road_nodes[seat_idx] = self._compute_road_nodes(seat_idx)
+            if new_piece is not None:
+                seat_idx = new_piece.owner.seat - 1
+                self._roads[seat_idx] |= bit
+                self._occupied_edges |= bit
+                self._road_nodes[seat_idx] |= topology.EDGE_NODE_MASKS[coord]
+
+    def _compute_blocked_nodes(self):
+        blocked = 0
+        for node in topology.node_coords_in_mask(self._occupied_nodes):
+            blocked |= topology.NODE_NEIGHBOURHOOD_MASKS[node]
+        return blocked
+
+    def _compute_road_nodes(self, seat_idx):
+        road_nodes = 0
+        for edge in topology.edge_coords_in_mask(self._roads[seat_idx]):
+            road_nodes |= topology.EDGE_NODE_MASKS[edge]
+        return road_nodes
+
+    def settlement_mask(self, player, connected=True):
+        """
+        :param player: Player
+        :param connected: if True, the settlement must touch one of the player's roads
+        :return: node bitmask of legal settlement locations, int
+        """
+        legal = topology.ALL_NODES_MASK & ~self._blocked_nodes
+        if connected:
+            legal &= self._road_nodes[player.seat - 1]
+        return legal
+
+    def city_mask(self, player):
+        """
+        :param player: Player
+        :return: node bitmask of legal city locations, int
+        """
+        return self._settlements[player.seat - 1]
+
+    def road_mask(self, player, pregame=False):
+        """
+        :param player: Player
+        :param pregame: if True, the road must touch the settlement just placed
+        :return: edge bitmask of legal road locations, int
+        """
+        anchors = self._road_anchors(player.seat - 1, pregame)
+        legal = 0
+        while anchors:
+            low = anchors & -anchors
+            legal |= topology.NODE_EDGE_MASKS[topology.NODE_COORDS[low.bit_length() - 1]]
+            anchors ^= low
+        return legal & ~self._occupied_edges
+
+    def _road_anchors(self, seat_idx, pregame=False):
+        """
+        :return: node bitmask of the nodes a new road of the given seat may start from, int
+        """
+        if pregame:
+            # each pregame settlement gets its road before the next settlement is placed, so the
+            # settlement just placed is the only one none of the seat's roads reach
+            return self._settlements[seat_idx] & ~self._road_nodes[seat_idx]
+        buildings = self._settlements[seat_idx] | self._cities[seat_idx]
+        opponents = self._occupied_nodes & ~buildings
+        return buildings | (self._road_nodes[seat_idx] & ~opponents)
+
+    def legal_settlement_nodes(self, player, connected=True):
+        """
+        :return: legal settlement node coords, list(int). See #settlement_mask.
+        """
+        return topology.node_coords_in_mask(self.settlement_mask(player, connected))
+
+    def legal_city_nodes(self, player):
+        """
+        :return: legal city node coords, list(int). See #city_mask.
+        """
+        return topology.node_coords_in_mask(self.city_mask(player))
+
+    def legal_road_edges(self, player, pregame=False):
+        """
+        :return: legal road edge coords, list(int). See #road_mask.
+        """
+        return topology.edge_coords_in_mask(self.road_mask(player, pregame))
+
+    def can_place_settlement(self, player, node, connected=True):
+        if not 0 <= node < topology.COORD_SPACE:
+            return False
+        return bool(self.settlement_mask(player, connected) & topology.NODE_BITS[node])
+
+    def can_place_city(self, player, node):
+        if not 0 <= node < topology.COORD_SPACE:
+            return False
+        return bool(self.city_mask(player) & topology.NODE_BITS[node])
+
+    def can_place_road(self, player, edge, pregame=False):
+        if not 0 <= edge < topology.COORD_SPACE:
+            return False
+        bit = topology.EDGE_BITS[edge]
+        if not bit or self._occupied_edges & bit:
+            return False
+        return bool(topology.EDGE_NODE_MASKS[edge] & self._road_anchors(player.seat - 1, pregame))
+
+    def num_settlements(self, player):
+        return bin(self._settlements[player.seat - 1]).count('1')
+
+    def num_cities(self, player):
+        return bin(self._cities[player.seat - 1]).count('1')
+
+    def num_roads(self, player):
+        return bin(self._roads[player.seat - 1]).count('1')
@@ -0,0 +1,136 @@
+"""
+module production works out which players collect which resources when the dice are rolled.
+
+class Production precomputes, for each dice number, the tiles which produce on that number,
+their terrain, and the settlements and cities touching them. It keeps the result as count
+arrays which are updated incrementally as pieces are placed and removed, so producing a roll
+costs the same no matter how many pieces are on the board.
+
+Count arrays have shape (NUM_SEATS, NUM_RESOURCES). Row i is the player in seat
+i+1, column j is the resource catan.board.RESOURCES[j].
+"""
+import numpy
+
+import catan.pieces
+from catan import topology
+from catan.resources import NUM_RESOURCES
+
+# Players sit in seats [1,4], see catan.game.Player
+NUM_SEATS = 4
+
+_PIECE_YIELD = {
+    catan.pieces.PieceType.settlement: 1,
+    catan.pieces.PieceType.city: 2,
+}
+
+# Dice sums are in [2,12]; arrays indexed by dice number have an entry for each of [0,12]
+_NUM_DICE_NUMBERS = 13
+
+
+def empty_counts():
+    """
+    :return: a count array of zeros, numpy.ndarray of shape (NUM_SEATS, NUM_RESOURCES)
+    """
+    return numpy.zeros((NUM_SEATS, NUM_RESOURCES), dtype=numpy.int64)
+
+
+class Production(object):
+    """
+    class Production maintains per-roll resource production for a board.
+
+    Use #rebuild when the tiles change, #update when a node's piece changes,
+    and #produce to get the resources each seat collects on a roll.
+    """
+    def __init__(self):
+        num_tiles = len(topology.TILE_ID_TO_COORD)
+        # tile id -> dice number (0 for no number), resource index (-1 for desert)
+        self._tile_numbers = [0] * num_tiles
+        self._tile_resources = [-1] * num_tiles
+        # dice number -> tile ids which produce on that number
+        self._tiles_by_number = tuple(tuple() for _ in range(_NUM_DICE_NUMBERS))
+        # resources collected by each seat from each tile, and on each dice number
+        self._by_tile = numpy.zeros((num_tiles, NUM_SEATS, NUM_RESOURCES), dtype=numpy.int64)
+        self._by_number = numpy.zeros((_NUM_DICE_NUMBERS, NUM_SEATS, NUM_RESOURCES), dtype=numpy.int64)
+
+    def copy(self):
+        """
+        :return: a Production which can be updated independently of this one
+        """
+        result = object.__new__(Production)
+        result._tile_numbers = self._tile_numbers
+        result._tile_resources = self._tile_resources
+        result._tiles_by_number = self._tiles_by_number
+        result._by_tile = self._by_tile.copy()
+        result._by_number = self._by_number.copy()
+        return result
+
+    def rebuild(self, tiles, node_pieces):
+        """
+        Recompute everything from the board's tiles and node pieces.
+
+        :param tiles: list(Tile)
+        :param node_pieces: node piece array, indexed by node coord, see Board
+        """
+        from catan.board import RESOURCE_INDEX
+        tiles_by_number = [list() for _ in range(_NUM_DICE_NUMBERS)]
+        self._tile_numbers = [0] * len(self._tile_numbers)
+        self._tile_resources = [-1] * len(self._tile_resources)
+        for tile in tiles:
+            number = tile.number.value or 0
+            self._tile_numbers[tile.tile_id] = number
+            self._tile_resources[tile.tile_id] = RESOURCE_INDEX.get(tile.terrain, -1)
+            if number and tile.terrain in RESOURCE_INDEX:
+                tiles_by_number[number].append(tile.tile_id)
+        self._tiles_by_number = tuple(tuple(tile_ids) for tile_ids in tiles_by_number)
+
+        self._by_tile[:] = 0
+        self._by_number[:] = 0
+        for node in topology.NODE_COORDS:
+            if node_pieces[node] is not None:
+                self.update(node, None, node_pieces[node])
+
+    def update(self, node, old_piece, new_piece):
+        """
+        Account for the piece on a node changing from old_piece to new_piece. Either may be None.
+
+        :param node: node coord, int
+        :param old_piece: Piece
+        :param new_piece: Piece
+        """
+        if old_piece is not None and old_piece.type in _PIECE_YIELD:
+            self._add(node, old_piece.owner.seat - 1, -_PIECE_YIELD[old_piece.type])
+        if new_piece is not None and new_piece.type in _PIECE_YIELD:
+            self._add(node, new_piece.owner.seat - 1, _PIECE_YIELD[new_piece.type])
+
+    def _add(self, node, seat_idx, amount):
+        for tile_id in topology.TILES_TOUCHING_NODE[node]:
+            resource = self._tile_resources[tile_id]
+            number = self._tile_numbers[tile_id]
+            if resource < 0 or not number:
+                continue
+            self._by_tile[tile_id, seat_idx, resource] += amount
+            self._by_number[number, seat_idx, resource] += amount
+
+    def produce(self, roll, robber_tile=None):
+        """
+        Get the resources each seat collects on the given roll. The robber's tile produces nothing.
+
+        :param roll: dice sum, int
+        :param robber_tile: tile id of the robber, int or None
+        :return: numpy.ndarray of shape (NUM_SEATS, NUM_RESOURCES), a new array owned by the caller
+        """
+        if not 0 <= roll < _NUM_DICE_NUMBERS:
+            return empty_counts()
+        counts = self._by_number[roll].copy()
+        if robber_tile is not None and robber_tile in self._tiles_by_number[roll]:
+            counts -= self._by_tile[robber_tile]
+        return counts
+
+    def tiles_producing_on(self, roll):
+        """
+        :param roll: dice sum, int
+        :return: tile ids which produce resources on the given roll, tuple(int)
+        """
+        if not 0 <= roll < _NUM_DICE_NUMBERS:
+            return tuple()
+        return self._tiles_by_number[roll]
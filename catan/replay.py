@@ -0,0 +1,481 @@
+"""
+module replay rebuilds a Game from its catanlog, reading the log lazily, one line at a time.
+
+class Replayer reads the log's header, builds the board and players it describes and starts the
+game, then applies one logged action per #step. #fast_forward applies actions until a given turn
+or a given number of events, without notifying the game's observers or subscribers, and without
+recording undo history.
+
+e.g. with Replayer('log/2016-01-01T12-00-00-yurick-josh-zach-ross.catan') as replayer:
+         replayer.fast_forward(turn=20)
+         game = replayer.game
+         game.observers.add(ui)
+         replayer.step()
+
+Events are the log's action lines after the header, counted from 1. Turns are counted as in
+Game, ie the number of turns ended so far, pregame turns included.
+
+Only the file handle and the game are held, so memory stays constant however long the log is.
+
+With validate=True, each action is checked against the rules before it is applied, and the first
+illegal one raises IllegalActionError. The rules checked are
+- turn order: the logged player is the current player (checked always, replay depends on it)
+- state: the action is allowed in the game's current state, see catan.states, eg no rolling
+  twice, no building before rolling, no ending the turn with the robber unmoved
+- placement: pieces go where catan.placement allows
+- robber: a 7 or a knight is followed by a robber move, to a different tile, stealing from a
+  player with a settlement or city on it, or from nobody only if there is no such player
+- trade: port trades use a port the player has, at its ratio
+Hands are not checked, since after a steal they are a guess.
+
+The catanlog holds public information only. In particular, it does not say which card was
+stolen, so hands after a steal are a guess, see Game._steal_resource. Pieces, rolls, trades,
+dev card plays, turns and the robber are replayed exactly.
+"""
+import contextlib
+import re
+
+import hexgrid
+
+import catan.board
+import catan.game
+import catan.states
+import catan.trading
+from catan import topology
+from catan.pieces import Piece, PieceType
+
+_LOCATION = r'(\(\d+ \w+\))'
+_RECORDS = (
+    ('roll', re.compile(r'(\w+) rolls (\d+)(?: \.\.\.DEUCES!)?$')),
+    ('robber', re.compile(r'(\w+) moves robber to (\d+), steals from (\w+)$')),
+    ('buy_piece', re.compile(r'(\w+) buys (road|settlement|city), builds at {}$'.format(_LOCATION))),
+    ('buy_dev_card', re.compile(r'(\w+) buys dev card$')),
+    ('trade', re.compile(r'(\w+) trades \[(.*)\] to (port|player) (\S+) for \[(.*)\]$')),
+    ('knight', re.compile(r'(\w+) plays knight$')),
+    ('road_builder', re.compile(r'(\w+) plays road builder, builds at {} and {}$'.format(_LOCATION, _LOCATION))),
+    ('year_of_plenty', re.compile(r'(\w+) plays year of plenty, takes (\w+) and (\w+)$')),
+    ('monopoly', re.compile(r'(\w+) plays monopoly on (\w+)$')),
+    ('victory_point', re.compile(r'(\w+) plays victory point$')),
+    ('end_turn', re.compile(r'(\w+) ends turn after (-?\d+)s$')),
+    ('win', re.compile(r'(\w+) wins$')),
+)
+_PLAYER = re.compile(r'name: (\S+), color: (\S+), seat: (\d+)$')
+_PORT = re.compile(r'(\S+)\((\d+) (\w+)\)')
+
+_PORT_RATIOS = {catan.board.PortType.any4: 4, catan.board.PortType.any3: 3} # resource ports are 2:1
+_NODE_COORDS = {topology.location(hexgrid.NODE, node): node for node in topology.NODE_COORDS}
+_EDGE_COORDS = {topology.location(hexgrid.EDGE, edge): edge for edge in topology.EDGE_COORDS}
+
+
+class IllegalActionError(ValueError):
+    """
+    class IllegalActionError is raised by a validating Replayer on the first action which breaks
+    the rules.
+    """
+    def __init__(self, rule, message, line):
+        """
+        :param rule: the rule broken, one of 'turn_order', 'state', 'placement', 'robber', 'trade'
+        :param message: str
+        :param line: line number in the log, int
+        """
+        super(IllegalActionError, self).__init__('Illegal action ({}): {}, at line {}'.format(rule, message, line))
+        self.rule = rule
+        self.line = line
+
+
+class Replayer(object):
+    """
+    class Replayer replays a catanlog file into a Game, one action at a time.
+    """
+    def __init__(self, file, validate=False):
+        """
+        Read the log's header, and start the game it describes.
+
+        :param file: path to a .catan log, str, or an open text file
+        :param validate: if True, check each action against the rules before applying it
+        """
+        if isinstance(file, str):
+            self._file = open(file, 'r')
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        self._line_number = 0
+        self._pending = None
+        self._end_turn_logged_by_game = False
+        self._validate = validate
+        self.events = 0
+        self.game = self._read_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        """
+        Apply the remaining actions one at a time, yielding each action's log line.
+        """
+        while True:
+            line = self._next_record()
+            if line is None:
+                return
+            self._apply(line)
+            yield line
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+
+    def step(self):
+        """
+        Apply the next action in the log.
+
+        :return: the action's log line, or None if the log has ended
+        """
+        line = self._next_record()
+        if line is not None:
+            self._apply(line)
+        return line
+
+    def fast_forward(self, turn=None, event=None):
+        """
+        Apply actions until the game reaches the turn, or the number of events, or the log ends.
+        Observers and subscribers are not told about each action, only notified once at the end,
+        and no undo history is recorded. Undo history from before is forgotten.
+
+        :param turn: stop once this many turns have ended, int
+        :param event: stop once this many events have been applied, int
+        :return: the number of events applied, int
+        """
+        applied = 0
+        with _silenced(self.game):
+            while not ((turn is not None and self.game._cur_turn >= turn) or
+                       (event is not None and self.events >= event)):
+                line = self._next_record()
+                if line is None:
+                    break
+                self._apply(line)
+                applied += 1
+        checkpoint = getattr(self.game.undo_manager, 'checkpoint', None)
+        if checkpoint is not None:
+            checkpoint()
+        self.game.notify_observers()
+        return applied
+
+    def _next_line(self):
+        if self._pending is not None:
+            line, self._pending = self._pending, None
+            return line
+        line = self._file.readline()
+        if not line:
+            return None
+        self._line_number += 1
+        return line.rstrip('\n')
+
+    def _next_record(self):
+        line = self._next_line()
+        while line is not None and not line.strip():
+            line = self._next_line()
+        return line
+
+    def _read_header(self):
+        version = self._next_line()
+        if version is None or not version.startswith('catanlog v'):
+            raise ValueError('Not a catanlog: first line={!r}'.format(version))
+        self._next_line()  # timestamp
+        num_players = int(self._header_field('players'))
+        players = list()
+        for _ in range(num_players):
+            match = _PLAYER.match(self._next_line() or '')
+            if match is None:
+                self._error('Expected a player')
+            name, color, seat = match.groups()
+            players.append(catan.game.Player(int(seat), name, color))
+        terrain = [catan.board.Terrain(value) for value in self._header_field('terrain').split()]
+        numbers = [catan.board.HexNumber.from_digit_or_none(value)
+                   for value in self._header_field('numbers').split()]
+        ports = [catan.board.Port(int(tile_id), direction, catan.board.PortType(port_type))
+                 for port_type, tile_id, direction in _PORT.findall(self._header_field('ports'))]
+        if self._next_line() != '...CATAN!':
+            self._error('Expected the end of the header')
+
+        board = catan.board.Board(terrain='empty', numbers='empty', ports='empty', pieces='empty')
+        board.tiles = [catan.board.Tile(tile_id, t, n) for tile_id, t, n in zip(topology.TILE_IDS, terrain, numbers)]
+        board.ports = ports
+        pieces = dict()
+        for tile in board.tiles:
+            if tile.terrain == catan.board.Terrain.desert:
+                # the log assumes the robber starts on the desert
+                pieces[hexgrid.TILE, topology.tile_id_to_coord(tile.tile_id)] = Piece(PieceType.robber, None)
+        board.pieces = pieces
+
+        # a log which opens with a settlement has a pregame
+        self._pending = self._next_record()
+        pregame = self._pending is not None and ' buys settlement, ' in self._pending
+        game = catan.game.Game(players=players, board=board, logging='off',
+                               pregame='on' if pregame else 'off')
+        with _silenced(game):
+            game.start(players)
+        checkpoint = getattr(game.undo_manager, 'checkpoint', None)
+        if checkpoint is not None:
+            checkpoint()
+        self._players_by_color = {player.color: player for player in players}
+        return game
+
+    def _header_field(self, name):
+        line = self._next_line() or ''
+        prefix = '{}: '.format(name)
+        if not line.startswith(prefix):
+            self._error('Expected the {} header'.format(name))
+        return line[len(prefix):]
+
+    def _apply(self, line):
+        for kind, pattern in _RECORDS:
+            match = pattern.match(line)
+            if match is not None:
+                break
+        else:
+            self._error('Unrecognized log line={!r}'.format(line))
+        self.events += 1
+        if kind == 'end_turn' and self._end_turn_logged_by_game:
+            # the game already ended this turn when it placed a pregame road
+            self._end_turn_logged_by_game = False
+            return
+        color = match.group(1)
+        if color != self.game.get_cur_player().color:
+            self._illegal('turn_order', 'Logged player={} is not the current player={}'.format(
+                color, self.game.get_cur_player().color))
+        if self._validate:
+            state = self.game.state
+            if (state.can_move_robber() or state.can_steal()) and kind not in ('robber', 'win'):
+                self._illegal('robber', 'Expected a robber move, got line={!r}'.format(line))
+            getattr(self, '_check_' + kind)(*match.groups()[1:])
+        getattr(self, '_apply_' + kind)(*match.groups()[1:])
+
+    def _check_roll(self, roll):
+        self._require('can_roll', 'roll')
+        if not 2 <= int(roll) <= 12:
+            self._illegal('state', 'Impossible roll={}'.format(roll))
+
+    def _check_robber(self, tile_id, victim):
+        game = self.game
+        self._require('can_move_robber', 'move the robber')
+        tile_id = int(tile_id)
+        if tile_id not in topology.TILE_IDS:
+            self._illegal('robber', 'Unknown tile={}'.format(tile_id))
+        if tile_id == game.robber_tile:
+            self._illegal('robber', 'Robber must move, but stays on tile={}'.format(tile_id))
+        stealable = set()
+        for node in topology.NODES_TOUCHING_TILE[tile_id]:
+            piece = game.board.get_piece_at(hexgrid.NODE, node)
+            if piece is not None and piece.owner != game.get_cur_player():
+                stealable.add(piece.owner.color)
+        if victim in stealable or (victim == 'nobody' and not stealable):
+            return
+        self._illegal('robber', 'Cannot steal from={} on tile={}, stealable={}'.format(
+            victim, tile_id, sorted(stealable)))
+
+    def _check_buy_piece(self, piece_type, location):
+        game = self.game
+        player = game.get_cur_player()
+        placement = game.board.placement
+        if game.state.is_in_pregame():
+            # the pregame waits in a placing state, for the piece due next in the snake draft
+            self._require('can_place_' + piece_type, 'place a ' + piece_type)
+        else:
+            self._require('can_buy_' + piece_type, 'buy a ' + piece_type)
+        if piece_type == 'road':
+            legal = placement.can_place_road(player, self._coord(_EDGE_COORDS, location),
+                                             pregame=game.state.is_in_pregame())
+        elif piece_type == 'settlement':
+            legal = placement.can_place_settlement(player, self._coord(_NODE_COORDS, location),
+                                                   connected=not game.state.is_in_pregame())
+        else:
+            legal = placement.can_place_city(player, self._coord(_NODE_COORDS, location))
+        if not legal:
+            self._illegal('placement', 'Cannot build {} at {}'.format(piece_type, location))
+
+    def _check_buy_dev_card(self):
+        self._require('can_buy_dev_card', 'buy a dev card')
+
+    def _check_trade(self, giving, getter_kind, getter, getting):
+        self._require('can_trade', 'trade')
+        if getter_kind == 'player':
+            if getter not in self._players_by_color or getter == self.game.get_cur_player().color:
+                self._illegal('trade', 'Cannot trade with player={}'.format(getter))
+            return
+        try:
+            port_type = catan.board.PortType(getter)
+        except ValueError:
+            self._illegal('trade', 'Unknown port={}'.format(getter))
+        if port_type != catan.board.PortType.any4 and \
+                port_type not in self.game.board.get_port_types(self.game.get_cur_player()):
+            self._illegal('trade', 'Player has no port={}'.format(getter))
+        exchanged = 0
+        for num, terrain in _resource_pairs(giving):
+            ratio = _PORT_RATIOS.get(port_type, 2)
+            if (ratio == 2 and terrain.value != port_type.value) or num % ratio:
+                self._illegal('trade', 'Cannot give {} {} to port={}'.format(num, terrain.value, getter))
+            exchanged += num // ratio
+        if exchanged != sum(num for num, _ in _resource_pairs(getting)):
+            self._illegal('trade', 'Port={} does not give [{}] for [{}]'.format(getter, getting, giving))
+
+    def _check_knight(self):
+        self._require('can_play_knight', 'play a knight')
+
+    def _check_road_builder(self, location1, location2):
+        # each road's placement is checked as it is built, see #_apply_road_builder
+        self._require('can_play_road_builder', 'play road builder')
+
+    def _check_year_of_plenty(self, resource1, resource2):
+        self._require('can_play_year_of_plenty', 'play year of plenty')
+
+    def _check_monopoly(self, resource):
+        self._require('can_play_monopoly', 'play monopoly')
+
+    def _check_victory_point(self):
+        self._require('can_play_victory_point', 'play a victory point')
+
+    def _check_end_turn(self, seconds):
+        self._require('can_end_turn', 'end the turn')
+
+    def _check_win(self):
+        pass
+
+    def _apply_roll(self, roll):
+        self.game.roll(int(roll))
+
+    def _apply_robber(self, tile_id, victim):
+        self.game.move_robber(int(tile_id))
+        self.game.steal(self._players_by_color.get(victim))
+
+    def _apply_buy_piece(self, piece_type, location):
+        game = self.game
+        in_pregame = game.state.is_in_pregame()
+        if piece_type == 'road':
+            game.begin_placing(PieceType.road)
+            game.place_road(self._coord(_EDGE_COORDS, location))
+            # placing a pregame road ends the turn, so the log's next line is that turn's end
+            self._end_turn_logged_by_game = in_pregame
+        elif piece_type == 'settlement':
+            game.begin_placing(PieceType.settlement)
+            game.place_settlement(self._coord(_NODE_COORDS, location))
+        else:
+            game.begin_placing(PieceType.city)
+            game.place_city(self._coord(_NODE_COORDS, location))
+
+    def _apply_buy_dev_card(self):
+        self.game.buy_dev_card()
+
+    def _apply_trade(self, giving, getter_kind, getter, getting):
+        if getter_kind == 'port':
+            getter = catan.board.Port(None, None, catan.board.PortType(getter))
+        else:
+            getter = self._players_by_color[getter]
+        trade = catan.trading.CatanTrade(self.game.get_cur_player(), getter)
+        for num, terrain in _resource_pairs(giving):
+            trade.give(terrain, num)
+        for num, terrain in _resource_pairs(getting):
+            trade.get(terrain, num)
+        self.game.trade(trade)
+
+    def _apply_knight(self):
+        self.game.play_knight()
+
+    def _apply_road_builder(self, location1, location2):
+        game = self.game
+        game.set_state(catan.states.GameStatePlacingRoadBuilderPieces(game))
+        for location in (location1, location2):
+            edge = self._coord(_EDGE_COORDS, location)
+            if self._validate and not game.board.placement.can_place_road(game.get_cur_player(), edge):
+                self._illegal('placement', 'Cannot build road at {}'.format(location))
+            game.place_road(edge)
+
+    def _apply_year_of_plenty(self, resource1, resource2):
+        self.game.play_year_of_plenty(catan.board.Terrain(resource1), catan.board.Terrain(resource2))
+
+    def _apply_monopoly(self, resource):
+        self.game.play_monopoly(catan.board.Terrain(resource))
+
+    def _apply_victory_point(self):
+        self.game.play_victory_point()
+
+    def _apply_end_turn(self, seconds):
+        self.game.end_turn()
+
+    def _apply_win(self):
+        self.game.end()
+
+    def _coord(self, coords, location):
+        try:
+            return coords[location]
+        except KeyError:
+            self._error('Unknown location={}'.format(location))
+
+    def _require(self, capability, action):
+        if not getattr(self.game.state, capability)():
+            self._illegal('state', 'Cannot {} in state={}'.format(action, type(self.game.state).__name__))
+
+    def _illegal(self, rule, message):
+        raise IllegalActionError(rule, message, self._line_number)
+
+    def _error(self, message):
+        raise ValueError('{}, at line {}'.format(message, self._line_number))
+
+
+def replay(file, turn=None, event=None):
+    """
+    Replay a catanlog into a new Game, up to the turn or number of events if given, otherwise
+    to the end of the log.
+
+    :param file: path to a .catan log, str, or an open text file
+    :param turn: see Replayer#fast_forward
+    :param event: see Replayer#fast_forward
+    :return: Game
+    """
+    with Replayer(file) as replayer:
+        replayer.fast_forward(turn=turn, event=event)
+        return replayer.game
+
+
+def _resource_pairs(text):
+    """
+    :param text: resources as logged in a trade, eg '2 wood, 1 brick'
+    :return: list((int, Terrain))
+    """
+    pairs = list()
+    for item in text.split(','):
+        if item.strip():
+            num, terrain = item.split()
+            pairs.append((int(num), catan.board.Terrain(terrain)))
+    return pairs
+
+
+class _Unrecorded(object):
+    """
+    class _Unrecorded is an undo manager which records nothing, it just does each command.
+    """
+    def do(self, command):
+        return command.do_method(command.obj, *command.args)
+
+
+@contextlib.contextmanager
+def _silenced(game):
+    """
+    Within the block, the game notifies no observers or subscribers, and records no undo history.
+    """
+    observers, board_observers = game.observers, game.board.observers
+    subscriptions, undo_manager = game._subscriptions, game.undo_manager
+    game.observers = set()
+    game.board.observers = {game}
+    game._subscriptions = dict()
+    game.undo_manager = _Unrecorded()
+    try:
+        yield
+    finally:
+        game.observers = observers
+        game.board.observers = board_observers
+        game._subscriptions = subscriptions
+        game.undo_manager = undo_manager
@@ -0,0 +1,97 @@
+"""
+module resources provides resource count vectors.
+
+A count vector is a numpy integer array of length NUM_RESOURCES. Entry i is the number of
+catan.board.RESOURCES[i]. Hands, trades and build costs are all count vectors, so adding,
+subtracting and checking affordability are single array operations.
+
+e.g.
+    hand = resources.vector(wood=1, brick=1)
+    if resources.can_afford(hand, resources.ROAD_COST):
+        hand -= resources.ROAD_COST
+"""
+import numpy
+
+import catan.pieces
+
+# len(catan.board.RESOURCES). catan.board imports this module indirectly, so it is imported
+# where needed rather than at the top.
+NUM_RESOURCES = 5
+
+
+def empty():
+    """
+    :return: a new count vector of zeros
+    """
+    return numpy.zeros(NUM_RESOURCES, dtype=numpy.int64)
+
+
+def vector(wood=0, brick=0, wheat=0, sheep=0, ore=0):
+    """
+    :return: a new count vector with the given counts
+    """
+    # in the order of catan.board.RESOURCES
+    return numpy.array([wood, brick, wheat, sheep, ore], dtype=numpy.int64)
+
+
+def from_pairs(pairs):
+    """
+    :param pairs: iterable of (num, Terrain), eg [(2, Terrain.wood), (1, Terrain.brick)]
+    :return: a new count vector
+    """
+    counts = empty()
+    for num, terrain in pairs:
+        counts[index(terrain)] += num
+    return counts
+
+
+def to_pairs(counts):
+    """
+    Inverse of #from_pairs. Resources with a count of zero are left out.
+
+    :param counts: count vector
+    :return: list of (num, Terrain), in RESOURCES order
+    """
+    from catan.board import RESOURCES
+    return [(int(num), terrain) for num, terrain in zip(counts, RESOURCES) if num]
+
+
+def index(terrain):
+    """
+    :param terrain: a resource-producing Terrain
+    :return: the index of the terrain in count vectors, int
+    """
+    from catan.board import RESOURCE_INDEX
+    try:
+        return RESOURCE_INDEX[terrain]
+    except KeyError:
+        raise ValueError('{} is not a resource'.format(terrain))
+
+
+def can_afford(counts, cost):
+    """
+    :param counts: count vector, usually a hand
+    :param cost: count vector
+    :return: Boolean
+    """
+    return bool((counts >= cost).all())
+
+
+def _frozen(counts):
+    counts.flags.writeable = False
+    return counts
+
+
+ROAD_COST = _frozen(vector(wood=1, brick=1))
+SETTLEMENT_COST = _frozen(vector(wood=1, brick=1, wheat=1, sheep=1))
+CITY_COST = _frozen(vector(wheat=2, ore=3))
+DEV_CARD_COST = _frozen(vector(wheat=1, sheep=1, ore=1))
+
+# UNITS[i] is one of resource i
+UNITS = tuple(_frozen(numpy.eye(NUM_RESOURCES, dtype=numpy.int64)[i]) for i in range(NUM_RESOURCES))
+
+COSTS = {
+    catan.pieces.PieceType.road: ROAD_COST,
+    catan.pieces.PieceType.settlement: SETTLEMENT_COST,
+    catan.pieces.PieceType.city: CITY_COST,
+}
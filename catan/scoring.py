@@ -0,0 +1,64 @@
+"""
+module scoring keeps score.
+
+Victory points come from:
+- settlements (1 each) and cities (2 each), counted by the board, see module placement
+- victory point dev cards played (1 each)
+- the longest road (2), see module longestroad
+- the largest army (2)
+
+class ScoreLedger keeps the parts of the score which are not on the board: victory point
+cards and knights played, and who holds the largest army. Game.score and Game.winner combine
+the ledger with the board in constant time.
+
+The largest army is held by the first player to play LARGEST_ARMY_MIN knights. It moves to
+another player only when they have played strictly more knights than the holder.
+"""
+from catan.production import NUM_SEATS
+
+VICTORY_POINTS_TO_WIN = 10
+
+LONGEST_ROAD_POINTS = 2
+LARGEST_ARMY_POINTS = 2
+
+# The largest army must be at least this many knights
+LARGEST_ARMY_MIN = 3
+
+
+class ScoreLedger(object):
+    """
+    class ScoreLedger counts victory point cards and knights per seat, and the largest army holder.
+
+    Seats are indexed from 0, ie seat_idx = Player.seat - 1.
+    """
+    def __init__(self):
+        self._victory_point_cards = [0] * NUM_SEATS
+        self._knights = [0] * NUM_SEATS
+        self.largest_army_seat_idx = None
+
+    def copy(self):
+        """
+        :return: a ScoreLedger which can be updated independently of this one
+        """
+        result = object.__new__(ScoreLedger)
+        result._victory_point_cards = list(self._victory_point_cards)
+        result._knights = list(self._knights)
+        result.largest_army_seat_idx = self.largest_army_seat_idx
+        return result
+
+    def play_victory_point(self, seat_idx):
+        self._victory_point_cards[seat_idx] += 1
+
+    def play_knight(self, seat_idx):
+        self._knights[seat_idx] += 1
+        holder = self.largest_army_seat_idx
+        if self._knights[seat_idx] < LARGEST_ARMY_MIN:
+            return
+        if holder is None or self._knights[seat_idx] > self._knights[holder]:
+            self.largest_army_seat_idx = seat_idx
+
+    def victory_point_cards(self, seat_idx):
+        return self._victory_point_cards[seat_idx]
+
+    def knights(self, seat_idx):
+        return self._knights[seat_idx]
@@ -0,0 +1,243 @@
+"""
+module sim plays complete games headlessly, with agents choosing every action.
+
+Games run on the real engine, ie Game and the state machine in catan.states, with logging off
+and no observers. Each turn the game's legal actions are listed by #legal_actions, from the
+game state's can_* methods and the board's placement, and the current player's agent picks one.
+
+An agent is a callable agent(game, actions, rng) -> Action, where actions is the non-empty list
+of legal actions and rng is the game's random.Random. See #random_agent.
+
+The board layout, the dice and the card taken by each steal are drawn from the seeded rng, which
+becomes the game's rng, see module streams. So a seed and the agents fix the game.
+
+e.g. result = sim.play([sim.random_agent] * 4, streams.RandomStream(7))
+     result.winner, result.turns, result.actions
+
+Run from the command line to measure games per second, actions per second and per-action
+latency:
+    python -m catan.sim --games 100 --seed 0
+"""
+import argparse
+import collections
+import time
+
+import hexgrid
+
+import catan.board
+import catan.boardbuilder
+import catan.game
+import catan.resources
+import catan.states
+import catan.trading
+from catan import streams, topology
+from catan.production import NUM_SEATS
+from catan.pieces import Piece, PieceType
+
+# Games still running after this many turns are stopped without a winner
+MAX_TURNS = 1000
+
+# An action, eg Action('place_road', (0x22,)). Its name is the Game method which applies it,
+# see #apply.
+Action = collections.namedtuple('Action', 'name args')
+
+# How a game ended. winner is a Player, or None if it ran out of turns.
+GameResult = collections.namedtuple('GameResult', 'winner turns actions')
+
+_ROLL = Action('roll', ())
+_END_TURN = Action('end_turn', ())
+_BUILDS = (
+    ('place_road', PieceType.road, catan.resources.ROAD_COST),
+    ('place_settlement', PieceType.settlement, catan.resources.SETTLEMENT_COST),
+    ('place_city', PieceType.city, catan.resources.CITY_COST),
+)
+
+
+def random_board(rng, board=None):
+    """
+    A board with the standard tiles and numbers shuffled by rng, preset ports, and the robber on
+    the desert.
+
+    :param rng: random.Random
+    :param board: Board to lay out again, eg the last game's, or None for a new Board
+    :return: Board
+    """
+    preset = catan.boardbuilder._generate_tiles(catan.boardbuilder.Opt.preset, catan.boardbuilder.Opt.preset)
+    terrain = [tile.terrain for tile in preset]
+    numbers = [tile.number for tile in preset if tile.number != catan.board.HexNumber.none]
+    rng.shuffle(terrain)
+    rng.shuffle(numbers)
+    desert = terrain.index(catan.board.Terrain.desert)
+    numbers.insert(desert, catan.board.HexNumber.none)
+
+    if board is None:
+        board = catan.board.Board(terrain='empty', numbers='empty', pieces='empty')
+    board.tiles = [catan.board.Tile(tile_id, t, n) for tile_id, t, n in zip(topology.TILE_IDS, terrain, numbers)]
+    board.pieces = {(hexgrid.TILE, topology.tile_id_to_coord(desert + 1)): Piece(PieceType.robber, None)}
+    return board
+
+
+def legal_actions(game):
+    """
+    Every action the current player may take now.
+
+    :param game: Game, in game
+    :return: list(Action)
+    """
+    state = game.state
+    player = game.get_cur_player()
+    placement = game.board.placement
+    if state.is_in_pregame():
+        if vars(state).get('piece_type') == PieceType.settlement:
+            return [Action('place_settlement', (node,))
+                    for node in placement.legal_settlement_nodes(player, connected=False)]
+        return [Action('place_road', (edge,)) for edge in placement.legal_road_edges(player, pregame=True)]
+    if state.can_move_robber():
+        return [Action('move_robber', (tile_id,)) for tile_id in topology.TILE_IDS if tile_id != game.robber_tile]
+    if state.can_steal():
+        # stealable_players is a set, whose order changes from process to process
+        victims = sorted(game.stealable_players(), key=lambda player: player.seat)
+        return [Action('steal', (victim,)) for victim in victims] or [Action('steal', (None,))]
+    if state.can_roll():
+        return [_ROLL]
+
+    actions = list()
+    for name, piece_type, cost in _BUILDS:
+        if getattr(state, 'can_buy_' + piece_type.value)() and game.can_afford(player, cost):
+            if piece_type == PieceType.road:
+                targets = placement.legal_road_edges(player)
+            elif piece_type == PieceType.settlement:
+                targets = placement.legal_settlement_nodes(player)
+            else:
+                targets = placement.legal_city_nodes(player)
+            actions.extend(Action(name, (coord,)) for coord in targets)
+    if state.can_trade():
+        actions.extend(Action('trade', (catan.trading.maritime_trade(player, give, get, ratio),))
+                       for give, get, ratio in game.maritime_trades(player))
+    if state.can_end_turn():
+        actions.append(_END_TURN)
+    return actions
+
+
+def apply(game, action, rng):
+    """
+    Apply the action to the game. Builds begin placing the piece, then place it. Rolls are drawn
+    from rng.
+
+    :param game: Game
+    :param action: Action, from #legal_actions
+    :param rng: random.Random
+    """
+    if action.name == 'roll':
+        game.roll(streams.roll_dice(rng))
+        return
+    if action.name.startswith('place_') and not game.state.is_in_pregame():
+        game.begin_placing(PieceType(action.name[len('place_'):]))
+    getattr(game, action.name)(*action.args)
+
+
+def random_agent(game, actions, rng):
+    """
+    Pick a kind of action uniformly, eg build a road or end the turn, then one action of that
+    kind uniformly. Picking among all actions uniformly would mostly build roads, since there
+    are many more edges than anything else.
+    """
+    kinds = dict()
+    for action in actions:
+        kinds.setdefault(action.name, list()).append(action)
+    return rng.choice(rng.choice(list(kinds.values())))
+
+
+def play(agents, rng, players=None, max_turns=MAX_TURNS, latencies=None, game=None):
+    """
+    Play one game to the end.
+
+    :param agents: one agent per player, in seat order, list(callable)
+    :param rng: streams.RandomStream or random.Random, for the board, the dice, steals and the agents
+    :param players: list(Player), defaults to Game.get_debug_players
+    :param max_turns: stop without a winner after this many turns, int
+    :param latencies: if given, the seconds taken to apply each action are appended to it, list
+    :param game: Game to reuse, eg the last call's, which is reset rather than constructing a new
+                 Game and Board. Its logging should be off.
+    :return: GameResult
+    """
+    players = players or catan.game.Game.get_debug_players()
+    if game is None:
+        game = catan.game.Game(players=players, board=random_board(rng), logging='off', rng=rng)
+    else:
+        game.reset()
+        game.rng = rng
+        random_board(rng, board=game.board)
+        game.set_dev_card_state(catan.states.DevCardNotPlayedState(game))
+        checkpoint = getattr(game.undo_manager, 'checkpoint', None)
+        if checkpoint is not None:
+            checkpoint()
+    game.start(players)
+    agents_by_seat = {player.seat: agent for player, agent in zip(players, agents)}
+    actions = 0
+    winner = None
+    while game._cur_turn < max_turns:
+        agent = agents_by_seat[game.get_cur_player().seat]
+        action = agent(game, legal_actions(game), rng)
+        if latencies is None:
+            apply(game, action, rng)
+        else:
+            start = time.perf_counter()
+            apply(game, action, rng)
+            latencies.append(time.perf_counter() - start)
+        actions += 1
+        winner = game.winner()
+        if winner is not None:
+            game.end()
+            break
+    return GameResult(winner, game._cur_turn, actions)
+
+
+def run(num_games, seed=0, agent=random_agent, max_turns=MAX_TURNS):
+    """
+    Play games with the agent in every seat, timing them.
+
+    :param num_games: int
+    :param seed: the key of the rng for every game, see module streams
+    :param agent: callable, see the module docstring
+    :param max_turns: see #play
+    :return: dict with games, wins (games with a winner), turns, actions, seconds, games and
+             actions per second, and 50th, 99th and 99.9th percentile per-action latency in seconds
+    """
+    rng = streams.RandomStream(seed)
+    latencies = list()
+    results = list()
+    start = time.perf_counter()
+    for _ in range(num_games):
+        results.append(play([agent] * NUM_SEATS, rng, max_turns=max_turns, latencies=latencies))
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    stats = {
+        'games': num_games,
+        'wins': sum(result.winner is not None for result in results),
+        'turns': sum(result.turns for result in results),
+        'actions': len(latencies),
+        'seconds': seconds,
+        'games_per_second': num_games / seconds,
+        'actions_per_second': len(latencies) / seconds,
+    }
+    for name, p in (('p50', 0.5), ('p99', 0.99), ('p999', 0.999)):
+        stats[name] = latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play headless games with random agents, and time them.')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-turns', type=int, default=MAX_TURNS)
+    args = parser.parse_args(argv)
+    stats = run(args.games, seed=args.seed, max_turns=args.max_turns)
+    print('games={games} wins={wins} turns={turns} actions={actions} seconds={seconds:.2f}'.format(**stats))
+    print('{:.1f} games/s, {:.0f} actions/s, per action p50={:.1f}us p99={:.1f}us p99.9={:.1f}us'.format(
+        stats['games_per_second'], stats['actions_per_second'],
+        stats['p50'] * 1e6, stats['p99'] * 1e6, stats['p999'] * 1e6))
+
+
+if __name__ == '__main__':
+    main()
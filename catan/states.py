@@ -58,7 +58,10 @@ If the method does not look like can_do_xyz(), it will be logged.
 """
 import logging
 import hexgrid
+import catan.events
 import catan.pieces
+import catan.topology
+import catan.trace
 
 
 class GameState(object):
@@ -88,7 +91,8 @@ class GameState(object):
             return None
         if 'can_' not in name:
             # can_do_xyz methods are ok to return None if not implemented
-            logging.debug('Method {0} not found'.format(name))
+            if __debug__ and catan.trace.enabled:
+                catan.trace.record('method_not_found', state=type(self).__name__, method=name)
         return method
 
     def is_in_game(self):
@@ -125,18 +129,15 @@ class GameStateNotInGameMoveRobber(GameStateNotInGame):
         return True
 
     def move_robber(self, tile_id):
-        robbers = self.game.board.get_pieces((catan.pieces.PieceType.robber, ),
-                                             hexgrid.tile_id_to_coord(self.game.robber_tile))
-        to_coord = hexgrid.tile_id_to_coord(tile_id)
-        if robbers:
-            robber = robbers[0]
-            from_coord = hexgrid.tile_id_to_coord(self.game.robber_tile)
+        from_coord = catan.topology.tile_id_to_coord(self.game.robber_tile)
+        robber = self.game.board.get_piece_at(hexgrid.TILE, from_coord)
+        to_coord = catan.topology.tile_id_to_coord(tile_id)
+        if robber is not None:
             self.game.board.move_piece(robber, from_coord, to_coord)
         else:
+            logging.warning('0 robbers found in board.pieces')
             robber = catan.pieces.Piece(catan.pieces.PieceType.robber, None)
             self.game.board.place_piece(robber, to_coord)
-        if len(robbers) != 1:
-            logging.warning('{} robbers found in board.pieces'.format(len(robbers)))
         self.game.robber_tile = tile_id
         self.game.set_state(GameStateNotInGame(self.game))
 
@@ -191,10 +192,8 @@ class GameStateInGame(GameState):
 
         :return Player
         """
-        logging.warning('turn={}, players={}'.format(
-            self.game._cur_turn,
-            self.game.players
-        ))
+        if __debug__ and catan.trace.enabled:
+            catan.trace.record('next_player', turn=self.game._cur_turn, players=self.game.players)
         return self.game.players[(self.game._cur_turn + 1) % len(self.game.players)]
 
     def begin_turn(self):
@@ -493,6 +492,9 @@ class GameStatePreGamePlacingPiece(GameStatePreGame):
                 self.__class__.__name__,
                 self.piece_type
             ))
+        if not self.game.board.placement.can_place_road(self.game.get_cur_player(), edge, pregame=True):
+            logging.warning('ILLEGAL: Attempted to place road on edge={}'.format(hex(edge)))
+            return
         self.game.buy_road(edge)
 
     def place_settlement(self, node):
@@ -501,6 +503,10 @@ class GameStatePreGamePlacingPiece(GameStatePreGame):
                 self.__class__.__name__,
                 self.piece_type
             ))
+        if not self.game.board.placement.can_place_settlement(self.game.get_cur_player(), node,
+                                                              connected=False):
+            logging.warning('ILLEGAL: Attempted to place settlement on node={}'.format(hex(node)))
+            return
         self.game.buy_settlement(node)
 
     def place_city(self, node):
@@ -509,6 +515,9 @@ class GameStatePreGamePlacingPiece(GameStatePreGame):
                 self.__class__.__name__,
                 self.piece_type
             ))
+        if not self.game.board.placement.can_place_city(self.game.get_cur_player(), node):
+            logging.warning('ILLEGAL: Attempted to place city on node={}'.format(hex(node)))
+            return
         self.game.buy_city(node)
 
 class GameStateBeginTurn(GameStateInGame):
@@ -534,13 +543,12 @@ class GameStateMoveRobber(GameStateInGame):
         return True
 
     def move_robber(self, tile_id):
-        robbers = self.game.board.get_pieces((catan.pieces.PieceType.robber, ),
-                                             hexgrid.tile_id_to_coord(self.game.robber_tile))
-        for robber in robbers:
-            self.game.board.move_piece(robber,
-                                       hexgrid.tile_id_to_coord(self.game.robber_tile), hexgrid.tile_id_to_coord(tile_id))
-        if len(robbers) != 1:
-            logging.warning('{} robbers found in board.pieces'.format(len(robbers)))
+        from_coord = catan.topology.tile_id_to_coord(self.game.robber_tile)
+        robber = self.game.board.get_piece_at(hexgrid.TILE, from_coord)
+        if robber is not None:
+            self.game.board.move_piece(robber, from_coord, catan.topology.tile_id_to_coord(tile_id))
+        else:
+            logging.warning('0 robbers found in board.pieces')
         self.game.robber_tile = tile_id
         self.game.set_state(GameStateSteal(self.game))
 
@@ -579,13 +587,12 @@ class GameStateMoveRobberUsingKnight(GameStateMoveRobber):
     - BEFORE the player has moved the robber
     """
     def move_robber(self, tile_id):
-        robbers = self.game.board.get_pieces((catan.pieces.PieceType.robber, ),
-                                             hexgrid.tile_id_to_coord(self.game.robber_tile))
-        for robber in robbers:
-            self.game.board.move_piece(robber,
-                                       hexgrid.tile_id_to_coord(self.game.robber_tile), hexgrid.tile_id_to_coord(tile_id))
-        if len(robbers) > 1:
-            logging.warning('More than one robber found in board.pieces')
+        from_coord = catan.topology.tile_id_to_coord(self.game.robber_tile)
+        robber = self.game.board.get_piece_at(hexgrid.TILE, from_coord)
+        if robber is not None:
+            self.game.board.move_piece(robber, from_coord, catan.topology.tile_id_to_coord(tile_id))
+        else:
+            logging.warning('0 robbers found in board.pieces')
         self.game.robber_tile = tile_id
         self.game.set_state(GameStateStealUsingKnight(self.game))
 
@@ -608,6 +615,7 @@ class GameStateSteal(GameStateInGame):
             hexgrid.location(hexgrid.TILE, self.game.robber_tile),
             victim
         )
+        self.game._steal_resource(victim)
         self.game.set_state(GameStateDuringTurnAfterRoll(self.game))
 
     def can_roll(self):
@@ -650,6 +658,7 @@ class GameStateStealUsingKnight(GameStateSteal):
             hexgrid.location(hexgrid.TILE, self.game.robber_tile),
             victim
         )
+        self.game._steal_resource(victim)
         self.game.set_state(GameStateDuringTurnAfterRoll(self.game))
 
 
@@ -693,6 +702,9 @@ class GameStatePlacingPiece(GameStateInGame):
                 self.__class__.__name__,
                 self.piece_type
             ))
+        if not self.game.board.placement.can_place_road(self.game.get_cur_player(), edge):
+            logging.warning('ILLEGAL: Attempted to place road on edge={}'.format(hex(edge)))
+            return
         self.game.buy_road(edge)
 
     def place_settlement(self, node):
@@ -701,6 +713,10 @@ class GameStatePlacingPiece(GameStateInGame):
                 self.__class__.__name__,
                 self.piece_type
             ))
+        if not self.game.board.placement.can_place_settlement(self.game.get_cur_player(), node,
+                                                              connected=True):
+            logging.warning('ILLEGAL: Attempted to place settlement on node={}'.format(hex(node)))
+            return
         self.game.buy_settlement(node)
 
     def place_city(self, node):
@@ -709,6 +725,9 @@ class GameStatePlacingPiece(GameStateInGame):
                 self.__class__.__name__,
                 self.piece_type
             ))
+        if not self.game.board.placement.can_place_city(self.game.get_cur_player(), node):
+            logging.warning('ILLEGAL: Attempted to place city on node={}'.format(hex(node)))
+            return
         self.game.buy_city(node)
 
     ###
@@ -763,9 +782,13 @@ class GameStatePlacingRoadBuilderPieces(GameStatePlacingPiece):
                 self.__class__.__name__,
                 self.piece_type
             ))
+        if not self.game.board.placement.can_place_road(self.game.get_cur_player(), edge):
+            logging.warning('ILLEGAL: Attempted to place road on edge={}'.format(hex(edge)))
+            return
         piece = catan.pieces.Piece(catan.pieces.PieceType.road, self.game.get_cur_player())
         self.game.board.place_piece(piece, edge)
-        self.edges.append(edge)
+        self.game._emit(catan.events.PiecePlaced(piece, edge))
+        self.edges = self.edges + [edge]
         if len(self.edges) == 2:
             self.game.play_road_builder(self.edges[0], self.edges[1])
             self.game.set_state(GameStateDuringTurnAfterRoll(self.game))
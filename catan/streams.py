@@ -0,0 +1,55 @@
+"""
+module streams provides seeded, splittable random number streams, one per game.
+
+A RandomStream is a random.Random seeded from a key, a str. #spawn makes a child stream whose
+key is the parent's key and a label, eg 'tournament-7/game-12'. Keys are hashed into the seed,
+so children are independent of their parent and of each other, and the same key gives the same
+stream in every process and run. A stream made without a seed gets a fresh key from os.urandom,
+which can be read back from #key to play the same stream again.
+
+Each Game has a stream, Game.rng, which draws its dice, see Game.roll_dice, and the card taken
+by each steal. Its Board has a child stream, Board.rng, which shuffles the tiles and numbers
+when they are randomized, see boardbuilder.
+
+e.g. tournament = RandomStream(7)
+     game = Game(rng=tournament.spawn(12))
+
+Nothing in the engine uses the module random, so games in different threads or processes never
+share, or contend for, random state.
+"""
+import os
+import random
+
+
+class RandomStream(random.Random):
+    """
+    class RandomStream is a random.Random which knows its key, and can spawn child streams.
+    """
+    def __init__(self, seed=None):
+        """
+        :param seed: the stream's key, any value with a stable str, eg int or str. None for a
+                     fresh key.
+        """
+        self.key = os.urandom(8).hex() if seed is None else str(seed)
+        super().__init__(self.key)
+
+    def spawn(self, label):
+        """
+        :param label: names the child among this stream's children, eg a game number
+        :return: the child stream, RandomStream
+        """
+        return RandomStream('{}/{}'.format(self.key, label))
+
+    def __reduce__(self):
+        return self.__class__, (self.key,), self.getstate()
+
+    def __repr__(self):
+        return 'RandomStream({!r})'.format(self.key)
+
+
+def roll_dice(rng):
+    """
+    :param rng: random.Random, eg a RandomStream
+    :return: the sum of two six-sided dice, int
+    """
+    return rng.randint(1, 6) + rng.randint(1, 6)
@@ -0,0 +1,78 @@
+import numpy
+import pytest
+
+from catan import batch, streams
+from catan.batch import AFTER_ROLL, BEGIN_TURN, BatchedGames, apply_actions, apply_to_games, random_actions
+from catan.game import Game
+
+PARITY_GAMES = 16
+STEPS = 300
+
+
+def _twin_picks(games, actions, twins):
+    """
+    Replace the steals' picks with the cards each Game will draw from its stream, as floats which
+    BatchedGames.steal maps back to the same cards.
+    """
+    for name, indexes, args in actions:
+        if name != 'steal':
+            continue
+        victims, picks = args
+        for row, i in enumerate(indexes):
+            if victims[row] >= 0:
+                total = int(games.hands[i, victims[row]].sum())
+                if total > 0:
+                    picks[row] = (twins[int(i)].randrange(total) + 0.5) / total
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_parity_with_game(seed):
+    rng = numpy.random.default_rng(seed)
+    games = BatchedGames.random(PARITY_GAMES, rng)
+    scalars = dict()
+    twins = dict()
+    for i in range(PARITY_GAMES):
+        scalars[i] = Game(board=games.board(i), logging='off', rng=streams.RandomStream(seed).spawn(i))
+        scalars[i].start(Game.get_debug_players())
+        twins[i] = streams.RandomStream(seed).spawn(i)
+    for step in range(STEPS):
+        actions = random_actions(games, rng)
+        _twin_picks(games, actions, twins)
+        apply_actions(games, actions)
+        apply_to_games(scalars, actions)
+        for i, game in scalars.items():
+            assert games.mismatches(i, game) == [], 'game {} differs at step {}'.format(i, step)
+    assert (games.turn > len(batch._SNAKE)).all()
+    assert games.points().sum() > PARITY_GAMES * 8
+
+
+def test_board_matches_layout():
+    games = BatchedGames.random(4, numpy.random.default_rng(0))
+    for i in range(games.size):
+        board = games.board(i)
+        assert [tile.number.value or 0 for tile in board.tiles] == games.numbers[i].tolist()
+        assert BatchedGames.from_boards([board]).terrain.tolist() == [games.terrain[i].tolist()]
+
+
+def test_illegal_actions_are_left_alone():
+    games = BatchedGames.random(2, numpy.random.default_rng(0), pregame=False)
+    every = numpy.arange(games.size)
+    assert not games.end_turn(every).any()
+    assert not games.place_road(every, batch._EDGE_COORDS[:2]).any()
+    assert games.roll(every, [6, 8]).all()
+    assert (games.state == AFTER_ROLL).all()
+    assert not games.roll(every, [6, 8]).any()
+    assert games.end_turn(every).all()
+    assert (games.state == BEGIN_TURN).all()
+    assert games.seat.tolist() == [1, 1]
+
+
+def test_repeated_games_are_rejected():
+    games = BatchedGames.random(3, numpy.random.default_rng(0), pregame=False)
+    hands = games.hands.copy()
+    with pytest.raises(ValueError):
+        games.roll([0, 2, 0], [6, 6, 6])
+    with pytest.raises(ValueError):
+        games.end_turn([1, 1])
+    assert (games.hands == hands).all()
+    assert (games.state == BEGIN_TURN).all()
@@ -0,0 +1,129 @@
+import hexgrid
+import pytest
+
+from catan import streams, topology
+from catan.board import (DEFAULT_TRADE_RATIOS, RESOURCE_INDEX, RESOURCES, Board, Port, PortType, Terrain,
+                         trade_ratios)
+from catan.game import Game
+from catan.pieces import Piece, PieceType
+
+
+def _board():
+    return Board(rng=streams.RandomStream('board'))
+
+
+def _players():
+    return Game.get_debug_players()
+
+
+def test_new_board_has_only_the_robber():
+    board = _board()
+    assert [hex_type for hex_type, _ in board.pieces] == [hexgrid.TILE]
+    assert len(board.pieces) == 1
+
+
+def test_place_get_remove():
+    board = _board()
+    red = _players()[0]
+    settlement = Piece(PieceType.settlement, red)
+    road = Piece(PieceType.road, red)
+    board.place_piece(settlement, 0x67)
+    board.place_piece(road, 0x67)
+    # the same coordinate is a different place for each hexgrid type
+    assert board.get_piece_at(hexgrid.NODE, 0x67) is settlement
+    assert board.get_piece_at(hexgrid.EDGE, 0x67) is road
+    assert board.get_pieces((PieceType.settlement, PieceType.road), 0x67) == [road, settlement]
+    assert board.get_pieces((PieceType.road,), 0x67) == [road]
+    assert board.pieces[hexgrid.NODE, 0x67] is settlement
+    board.remove_piece(settlement, 0x67)
+    assert board.get_piece_at(hexgrid.NODE, 0x67) is None
+    assert (hexgrid.NODE, 0x67) not in board.pieces
+    assert board.get_piece_at(hexgrid.NODE, -1) is None
+    assert board.get_piece_at(hexgrid.NODE, 1 << 12) is None
+
+
+def test_move_robber():
+    board = _board()
+    robber_coord = next(coord for hex_type, coord in board.pieces if hex_type == hexgrid.TILE)
+    to_coord = next(hexgrid.tile_id_to_coord(tile_id) for tile_id in range(1, 20)
+                    if hexgrid.tile_id_to_coord(tile_id) != robber_coord)
+    robber = board.get_piece_at(hexgrid.TILE, robber_coord)
+    board.move_piece(robber, robber_coord, to_coord)
+    assert board.get_piece_at(hexgrid.TILE, to_coord) is robber
+    assert board.get_piece_at(hexgrid.TILE, robber_coord) is None
+
+
+def test_pieces_view_assignment():
+    board = _board()
+    red, blue = _players()[:2]
+    pieces = {(hexgrid.NODE, 0x67): Piece(PieceType.city, red),
+              (hexgrid.EDGE, 0x56): Piece(PieceType.road, blue)}
+    board.pieces = pieces
+    assert dict(board.pieces.items()) == pieces
+    del board.pieces[hexgrid.EDGE, 0x56]
+    assert board.get_piece_at(hexgrid.EDGE, 0x56) is None
+    with pytest.raises(KeyError):
+        del board.pieces[hexgrid.EDGE, 0x56]
+    board.pieces[hexgrid.EDGE, 0x56] = Piece(PieceType.road, red)
+    assert board.get_piece_at(hexgrid.EDGE, 0x56).owner == red
+
+
+def test_coordinates_outside_the_grid_are_rejected():
+    board = _board()
+    with pytest.raises(ValueError):
+        board.pieces = {(hexgrid.NODE, 1 << 12): Piece(PieceType.settlement, _players()[0])}
+    with pytest.raises(ValueError):
+        board.pieces[hexgrid.NODE, -1] = Piece(PieceType.settlement, _players()[0])
+
+
+def _brute_force_port_types(board, player):
+    port_types = set()
+    for port in board.ports:
+        for node in topology.nodes_touching_port(port):
+            piece = board.get_piece_at(hexgrid.NODE, node)
+            if piece is not None and piece.owner == player:
+                port_types.add(port.type)
+    return port_types
+
+
+def test_port_index_follows_pieces():
+    board = _board()
+    red, blue = _players()[:2]
+    port = next(port for port in board.ports if port.type not in (PortType.any3, PortType.none))
+    node = topology.nodes_touching_port(port)[0]
+    assert not board.player_has_port_type(red, port.type)
+    assert board.get_trade_ratios(red) == DEFAULT_TRADE_RATIOS
+
+    board.place_piece(Piece(PieceType.settlement, red), node)
+    assert board.player_has_port_type(red, port.type)
+    assert not board.player_has_port_type(blue, port.type)
+    ratios = [4] * len(RESOURCES)
+    ratios[RESOURCE_INDEX[Terrain(port.type.value)]] = 2
+    assert board.get_trade_ratios(red) == tuple(ratios)
+
+    board.remove_piece(board.get_piece_at(hexgrid.NODE, node), node)
+    board.place_piece(Piece(PieceType.city, blue), node)
+    assert not board.player_has_port_type(red, port.type)
+    assert board.get_port_types(blue) == frozenset([port.type])
+
+
+def test_port_index_matches_brute_force():
+    board = _board()
+    players = _players()
+    for i, port in enumerate(board.ports):
+        node = topology.nodes_touching_port(port)[i % 2]
+        board.place_piece(Piece(PieceType.settlement, players[i % len(players)]), node)
+    for player in players:
+        assert board.get_port_types(player) == _brute_force_port_types(board, player)
+        assert board.get_trade_ratios(player) == trade_ratios(_brute_force_port_types(board, player))
+    # moving the ports reindexes them
+    board.set_ports([Port(port.tile_id, port.direction, PortType.any3) for port in board.ports])
+    for player in players:
+        assert board.get_port_types(player) == _brute_force_port_types(board, player)
+        assert board.get_trade_ratios(player) == (3, ) * len(RESOURCES)
+
+
+def test_trade_ratios():
+    assert trade_ratios([]) == DEFAULT_TRADE_RATIOS
+    assert trade_ratios([PortType.any3, PortType.ore]) == (3, 3, 3, 3, 2)
+    assert trade_ratios([PortType.wood, PortType.none, PortType.any4]) == (2, 4, 4, 4, 4)
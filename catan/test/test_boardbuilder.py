@@ -1 +1,76 @@
+import numpy
 
+from catan import boardbuilder, codec, streams
+from catan.board import HexNumber, Terrain
+from catan.boardbuilder import Layout, Opt
+
+DESERT = codec.TERRAIN.index(Terrain.desert)
+
+
+def _standard():
+    return boardbuilder._base_codes(Opt.random, Opt.random)
+
+
+def test_generate_layouts_is_determined_by_the_seed():
+    first = list(boardbuilder.generate_layouts(rng=streams.RandomStream(0), count=50))
+    second = list(boardbuilder.generate_layouts(rng=streams.RandomStream(0), count=50))
+    assert len(first) == 50
+    assert first == second
+    assert len(set(first)) == 50
+
+
+def test_generated_layouts_shuffle_the_standard_tiles():
+    terrain, numbers = _standard()
+    for layout in boardbuilder.generate_layouts(rng=streams.RandomStream(1), count=50):
+        assert sorted(layout.terrain) == sorted(terrain)
+        assert sorted(n for n in layout.numbers if n) == sorted(numbers)
+        assert [n for t, n in zip(layout.terrain, layout.numbers) if t == DESERT] == [0]
+
+
+def test_generated_layouts_match_generated_tiles():
+    layouts = boardbuilder.generate_layouts(rng=streams.RandomStream(2), count=10)
+    rng = streams.RandomStream(2)
+    for layout in layouts:
+        tiles = boardbuilder._generate_tiles(Opt.random, Opt.random, rng)
+        assert [(t.terrain, t.number) for t in layout.tiles()] == [(t.terrain, t.number) for t in tiles]
+
+
+def test_preset_layout_is_not_shuffled():
+    layouts = list(boardbuilder.generate_layouts(Opt.preset, Opt.preset, rng=streams.RandomStream(0), count=3))
+    assert layouts[0] == layouts[1] == layouts[2]
+    preset = boardbuilder._generate_tiles(Opt.preset, Opt.preset)
+    assert [(t.terrain, t.number) for t in layouts[0].tiles()] == [(t.terrain, t.number) for t in preset]
+
+
+def test_layout_board():
+    layout = next(boardbuilder.generate_layouts(rng=streams.RandomStream(3)))
+    board = layout.board(rng=streams.RandomStream(3))
+    assert [(t.tile_id, t.terrain, t.number) for t in board.tiles] == [
+        (t.tile_id, t.terrain, t.number) for t in layout.tiles()]
+    assert board.opts['board'] == layout.to_string()
+    board.reset()
+    assert [(t.terrain, t.number) for t in board.tiles] == [(t.terrain, t.number) for t in layout.tiles()]
+    desert = [t for t in layout.tiles() if t.terrain == Terrain.desert]
+    assert len(desert) == 1 and desert[0].number == HexNumber.none
+
+
+def test_generate_layout_blocks():
+    terrain_base, numbers_base = _standard()
+    blocks = list(boardbuilder.generate_layout_blocks(64, rng=numpy.random.default_rng(0), count=150))
+    assert [terrain.shape for terrain, _ in blocks] == [(64, 19), (64, 19), (22, 19)]
+    for terrain, numbers in blocks:
+        assert terrain.dtype == numbers.dtype == numpy.int8
+        assert (numpy.sort(terrain, axis=1) == sorted(terrain_base)).all()
+        assert ((terrain == DESERT) == (numbers == 0)).all()
+        assert (numpy.sort(numbers, axis=1)[:, 1:] == sorted(numbers_base)).all()
+        layout = Layout(tuple(terrain[0].tolist()), tuple(numbers[0].tolist()))
+        assert len(layout.board().tiles) == 19
+    again = boardbuilder.generate_layout_blocks(64, rng=numpy.random.default_rng(0), count=150)
+    assert all((a[0] == b[0]).all() and (a[1] == b[1]).all() for a, b in zip(blocks, again))
+
+
+def test_build_is_determined_by_the_seed():
+    opts = {'terrain': Opt.random, 'numbers': Opt.random}
+    first = boardbuilder.build(dict(opts), rng=streams.RandomStream(4))
+    second = boardbuilder.build(dict(opts), rng=streams.RandomStream(4))
+    assert [(t.terrain, t.number) for t in first.tiles] == [(t.terrain, t.number) for t in second.tiles]
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+import catan.sim
+from catan import streams
+from catan.bufferedlog import BufferedCatanLog
+from catan.game import Game
+
+
+def _game(logging):
+    return Game(logging=logging, rng=streams.RandomStream('log'))
+
+
+def _play(game, actions=150):
+    rng = game.rng
+    game.start(Game.get_debug_players())
+    policy = random.Random(0)
+    for _ in range(actions):
+        catan.sim.apply(game, catan.sim.random_agent(game, catan.sim.legal_actions(game), policy), rng)
+
+
+def _read(path):
+    with open(path) as file:
+        return file.read()
+
+
+def test_synced_file_matches_dump(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    game = _game('buffered')
+    _play(game)
+    game.end()
+    assert game.catanlog.dump()
+    assert _read(game.catanlog.logpath()) == game.catanlog.dump()
+
+
+def test_matches_unbuffered_log(tmp_path, monkeypatch):
+    logs = list()
+    for logging in ('on', 'buffered'):
+        (tmp_path / logging).mkdir()
+        monkeypatch.chdir(tmp_path / logging)
+        game = _game(logging)
+        _play(game)
+        game.end()
+        logs.append(_read(game.catanlog.logpath()))
+    # the headers hold the time the games started
+    assert logs[0].splitlines()[1:] == logs[1].splitlines()[1:]
+
+
+def test_flushes_by_size(tmp_path):
+    log = BufferedCatanLog(log_dir=str(tmp_path), flush_chars=1)
+    game = _game('off')
+    game.catanlog = log
+    _play(game, actions=20)
+    log.sync()
+    assert _read(log.logpath()) == log.dump()
+    log.flush()
+    log.sync()
+    assert _read(log.logpath()) == log.dump()
+
+
+def test_sync_raises_write_errors(tmp_path):
+    blocker = tmp_path / 'not a dir'
+    blocker.write_text('')
+    log = BufferedCatanLog(log_dir=str(blocker))
+    game = _game('off')
+    game.catanlog = log
+    _play(game, actions=5)
+    with pytest.raises(OSError):
+        log.sync()
@@ -0,0 +1,13 @@
+from catan.checkpoint import read_checkpoint
+
+
+def test_missing_file(tmp_path):
+    assert read_checkpoint(str(tmp_path / 'missing.jsonl')) == []
+
+
+def test_cut_short_line_is_removed(tmp_path):
+    out = tmp_path / 'out.jsonl'
+    out.write_text('{"a": 1}\n{"b": 2}\n{"c": ')
+    assert read_checkpoint(str(out)) == [{'a': 1}, {'b': 2}]
+    assert out.read_text() == '{"a": 1}\n{"b": 2}\n'
+    assert read_checkpoint(str(out)) == [{'a': 1}, {'b': 2}]
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+import catan.sim
+from catan import codec, streams
+from catan.game import Game
+from catan.longestroad import longest_road_lengths
+from catan.production import NUM_SEATS
+from catan.trading import CatanTrade
+
+
+def _played_game(seed, actions=150):
+    rng = streams.RandomStream(seed)
+    game = Game(logging='off', rng=rng.spawn('game'))
+    game.start(Game.get_debug_players())
+    policy = random.Random(seed)
+    for _ in range(actions):
+        if game.winner() is not None:
+            break
+        catan.sim.apply(game, catan.sim.random_agent(game, catan.sim.legal_actions(game), policy), rng)
+    return game
+
+
+def _actions(game):
+    # trades don't compare equal, compare what they give and get
+    return [(action.name, tuple(_trade_key(arg) if isinstance(arg, CatanTrade) else arg for arg in action.args))
+            for action in catan.sim.legal_actions(game)]
+
+
+def _trade_key(trade):
+    return trade.giver(), repr(trade.getter()), trade.giving_vector().tolist(), trade.getting_vector().tolist()
+
+
+def _assert_same_game(decoded, game):
+    assert codec.encode_game(decoded) == codec.encode_game(game)
+    assert decoded.zobrist_hash() == game.zobrist_hash()
+    assert (decoded.hands == game.hands).all()
+    assert type(decoded.state) is type(game.state)
+    assert decoded.state.game is decoded
+    assert _actions(decoded) == _actions(game)
+    assert decoded.board.longest_road.holder_seat_idx == game.board.longest_road.holder_seat_idx
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_round_trip(seed):
+    game = _played_game(seed)
+    record = codec.encode_game(game)
+    assert len(record) == codec.GAME_RECORD_SIZE
+    _assert_same_game(codec.decode_game(record, players=game.players), game)
+
+
+def test_round_trip_large_and_negative_hands():
+    game = _played_game(0)
+    game.hands[0] = [1000, 128, 0, 70000, 2 ** 31 - 1]
+    game.hands[1, 2] = -5
+    decoded = codec.decode_game(codec.encode_game(game), players=game.players)
+    assert decoded.hands.tolist() == game.hands.tolist()
+
+
+def test_encode_rejects_hands_beyond_int32():
+    game = _played_game(0)
+    game.hands[2, 1] = 2 ** 31
+    with pytest.raises(ValueError):
+        codec.encode_game(game)
+
+
+def test_decode_rejects_other_versions():
+    record = bytearray(codec.encode_game(_played_game(0)))
+    record[2] = codec.VERSION - 1
+    with pytest.raises(ValueError):
+        codec.decode_game(bytes(record))
+
+
+def test_decode_into_existing_game():
+    games = [_played_game(seed) for seed in range(3)]
+    into = codec.decode_game(codec.encode_game(games[0]), players=games[0].players)
+    board = into.board
+    for game in games:
+        decoded = codec.decode_game(codec.encode_game(game), players=game.players, game=into)
+        assert decoded is into
+        assert decoded.board is board
+        _assert_same_game(decoded, game)
+    catan.sim.apply(into, catan.sim.legal_actions(into)[0], streams.RandomStream(9))
+
+
+def test_iter_games():
+    games = [_played_game(seed) for seed in range(3)]
+    data = bytearray(codec.GAME_RECORD_SIZE * len(games))
+    for i, game in enumerate(games):
+        codec.encode_game(game, data, i * codec.GAME_RECORD_SIZE)
+    for decoded, game in zip(codec.iter_games(data, players=games[0].players), games):
+        _assert_same_game(decoded, game)
+    into = Game(logging='off')
+    for decoded, game in zip(codec.iter_games(data, players=games[0].players, game=into), games):
+        assert decoded is into
+        _assert_same_game(decoded, game)
+
+
+def test_decoded_longest_road_is_measured_on_demand():
+    game = _played_game(1, actions=300)
+    decoded = codec.decode_game(codec.encode_game(game), players=game.players)
+    lengths = longest_road_lengths(decoded.board._piece_arrays)
+    assert [decoded.board.longest_road.length(i) for i in range(NUM_SEATS)] == lengths
+    assert decoded.board.longest_road.holder_seat_idx == game.board.longest_road.holder_seat_idx
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+from catan import events
+from catan.dispatch import AsyncDispatcher
+from catan.game import Game
+
+
+class _Recorder(object):
+    def __init__(self):
+        self.notified = list()
+        self.events = list()
+
+    def notify(self, observable):
+        self.notified.append(observable)
+
+    def on_event(self, event):
+        self.events.append(event)
+
+
+class _Slow(object):
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.notified = 0
+
+    async def notify(self, observable):
+        await self.release.wait()
+        self.notified += 1
+
+
+class _Failing(object):
+    def notify(self, observable):
+        raise RuntimeError('spectator disconnected')
+
+
+def test_fans_out_to_every_observer():
+    async def main():
+        dispatcher = AsyncDispatcher()
+        recorders = [_Recorder() for _ in range(3)]
+        for recorder in recorders:
+            dispatcher.add(recorder)
+        dispatcher.add(_Failing())
+        game = Game(logging='off', pregame='off')
+        game.observers.add(dispatcher)
+        game.subscribe(dispatcher.publish, events.Rolled)
+        game.start(Game.get_debug_players())
+        await dispatcher.drain()
+        game.roll(8)
+        await dispatcher.drain()
+        await dispatcher.close()
+        for recorder in recorders:
+            assert recorder.notified and all(observable is game for observable in recorder.notified)
+            assert recorder.events == [events.Rolled(game.get_cur_player(), 8)]
+    asyncio.run(main())
+
+
+def test_slow_observer_is_coalesced_and_bounded():
+    async def main():
+        dispatcher = AsyncDispatcher(maxsize=4)
+        slow, fast = _Slow(), _Recorder()
+        dispatcher.add(slow)
+        dispatcher.add(fast)
+        observables = [object() for _ in range(10)]
+        for observable in observables:
+            for _ in range(3):
+                dispatcher.notify(observable)
+            await asyncio.sleep(0)
+        # the game never waits for the slow observer, and the fast one keeps up
+        assert fast.notified[-1] is observables[-1]
+        delivered, coalesced, dropped, queued = dispatcher.stats(slow)
+        assert coalesced >= 20
+        assert dropped > 0
+        assert queued <= 4
+        slow.release.set()
+        await dispatcher.drain()
+        assert dispatcher.stats(slow)[3] == 0
+        await dispatcher.close()
+    asyncio.run(main())
+
+
+def test_notify_from_another_thread():
+    async def main():
+        dispatcher = AsyncDispatcher()
+        recorder = _Recorder()
+        dispatcher.add(recorder)
+        observable = object()
+        thread = threading.Thread(target=dispatcher.notify, args=(observable, ))
+        thread.start()
+        thread.join()
+        for _ in range(100):
+            if recorder.notified:
+                break
+            await asyncio.sleep(0.01)
+        assert recorder.notified == [observable]
+        dispatcher.remove(recorder)
+        dispatcher.notify(observable)
+        await asyncio.sleep(0)
+        assert recorder.notified == [observable]
+        await dispatcher.close()
+    asyncio.run(main())
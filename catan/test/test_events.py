@@ -0,0 +1,87 @@
+import catan.states
+from catan import events, streams
+from catan.game import Game
+from catan.pieces import Piece, PieceType
+
+
+def _game():
+    game = Game(logging='off', pregame='off', rng=streams.RandomStream('events'))
+    game.start(Game.get_debug_players())
+    return game
+
+
+def test_typed_subscriptions():
+    game = _game()
+    rolls, everything = list(), list()
+    game.subscribe(rolls.append, events.Rolled)
+    game.subscribe(everything.append)
+    player = game.get_cur_player()
+    game.roll(8)
+    game.end_turn()
+    assert rolls == [events.Rolled(player, 8)]
+    assert events.Rolled(player, 8) in everything
+    assert events.StateChanged(catan.states.GameStateBeginTurn, catan.states.GameStateDuringTurnAfterRoll) in everything
+    assert events.TurnEnded(player, game.get_cur_player(), 1) in everything
+    assert [type(event) for event in everything].index(events.Rolled) < \
+        [type(event) for event in everything].index(events.TurnEnded)
+
+
+def test_unsubscribe():
+    game = _game()
+    received = list()
+    game.subscribe(received.append, events.Rolled, events.TurnEnded)
+    game.subscribe(received.append, events.Rolled)
+    game.unsubscribe(received.append, events.Rolled)
+    game.roll(8)
+    game.end_turn()
+    assert [type(event) for event in received] == [events.TurnEnded]
+    game.unsubscribe(received.append)
+    game.roll(8)
+    assert len(received) == 1
+
+
+def test_events_of_a_transaction_arrive_at_its_end():
+    game = _game()
+    player = game.get_cur_player()
+    game.board.place_piece(Piece(PieceType.settlement, player), 0x67)
+    game.hands[player.seat - 1] += 10
+    received = list()
+    game.subscribe(received.append, events.PiecePlaced, events.Rolled)
+    with game.transaction():
+        game.roll(8)
+        game.begin_placing(PieceType.road)
+        edge = game.board.placement.legal_road_edges(player)[0]
+        game.place_road(edge)
+        assert received == []
+    assert [type(event) for event in received] == [events.Rolled, events.PiecePlaced]
+    assert received[1].coord == edge
+    assert received[1].piece.owner == player
+
+
+def test_events_of_a_failed_transaction_are_dropped():
+    game = _game()
+    received = list()
+    game.subscribe(received.append)
+    try:
+        with game.transaction():
+            game.roll(8)
+            raise RuntimeError()
+    except RuntimeError:
+        pass
+    assert received == []
+
+
+def test_undo_event():
+    game = _game()
+    received = list()
+    game.subscribe(received.append, events.Undone)
+    game.roll(8)
+    game.undo()
+    assert received == [events.Undone()]
+
+
+def test_events_compare_by_payload():
+    assert events.Rolled(None, 8) == events.Rolled(None, 8)
+    assert events.Rolled(None, 8) != events.Rolled(None, 6)
+    assert len({events.Rolled(None, 8), events.Rolled(None, 8)}) == 1
+    assert repr(events.Rolled(None, 8)) == 'Rolled(player=None, roll=8)'
@@ -0,0 +1,186 @@
+import copy
+import random
+
+import hexgrid
+
+import catan.sim
+import catan.states
+import catan.streams
+from catan import streams
+from catan.game import Game
+from catan.pieces import Piece, PieceType
+
+
+def _game(pregame='on'):
+    game = Game(logging='off', pregame=pregame, rng=streams.RandomStream('test'))
+    game.start(Game.get_debug_players())
+    return game
+
+
+def _play(game, rng, actions=200):
+    """
+    Play random actions, see sim.random_agent.
+
+    :return: the number of actions played before the game ended
+    """
+    for played in range(actions):
+        if game.winner() is not None:
+            return played
+        action = catan.sim.random_agent(game, catan.sim.legal_actions(game), rng)
+        catan.sim.apply(game, action, rng)
+    return actions
+
+
+def test_copy_keeps_pregame_placing_state():
+    game = _game()
+    snapshot = game.copy()
+    assert isinstance(snapshot.state, catan.states.GameStatePreGamePlacingPiece)
+    assert vars(snapshot.state)['piece_type'] == PieceType.settlement
+    assert snapshot.state.game is snapshot
+    assert game.state.game is game
+    assert catan.sim.legal_actions(snapshot) == catan.sim.legal_actions(game)
+    _play(snapshot, random.Random(1))
+    assert snapshot.state is not game.state
+    assert game.board.placement.num_settlements(game.get_cur_player()) == 0
+    assert game.state.piece_type == PieceType.settlement
+
+
+def test_copy_keeps_placing_state():
+    game = _game(pregame='off')
+    player = game.get_cur_player()
+    game.board.place_piece(Piece(PieceType.settlement, player), 0x67)
+    game.roll(8)
+    game.hands[player.seat - 1] += 10
+    game.begin_placing(PieceType.road)
+    snapshot = game.copy()
+    assert isinstance(snapshot.state, catan.states.GameStatePlacingPiece)
+    assert vars(snapshot.state)['piece_type'] == PieceType.road
+    edge = snapshot.board.placement.legal_road_edges(player)[0]
+    snapshot.place_road(edge)
+    assert snapshot.board.get_piece_at(hexgrid.EDGE, edge) is not None
+    assert game.board.get_piece_at(hexgrid.EDGE, edge) is None
+    assert isinstance(game.state, catan.states.GameStatePlacingPiece)
+    _play(snapshot, random.Random(2))
+
+
+def test_copy_keeps_robber_states():
+    game = _game(pregame='off')
+    game.roll(7)
+    snapshot = game.copy()
+    assert snapshot.state.can_move_robber()
+    tile = next(tile for tile in (1, 2, 3) if tile != game.robber_tile)
+    snapshot.move_robber(tile)
+    assert snapshot.state.can_steal()
+    assert game.state.can_move_robber()
+    stolen = snapshot.copy()
+    assert stolen.state.can_steal()
+    stolen.steal(None)
+    assert stolen.state.can_end_turn()
+    assert snapshot.state.can_steal()
+    _play(stolen, random.Random(3))
+
+
+def test_copy_played_forward_matches_original():
+    game = _game()
+    rng = random.Random(4)
+    _play(game, rng, actions=40)
+    snapshot = game.copy()
+    _play(snapshot, random.Random(5), actions=100)
+    _play(game, random.Random(5), actions=100)
+    assert snapshot.zobrist_hash() == game.zobrist_hash()
+    assert (snapshot.hands == game.hands).all()
+
+
+def test_copy_has_its_own_rng():
+    game = _game(pregame='off')
+    expected = copy.deepcopy(game.rng)
+    snapshot = game.copy()
+    assert snapshot.rng is not game.rng
+    assert snapshot.board.rng is not game.board.rng
+    for _ in range(5):
+        snapshot.roll_dice()
+    _play(snapshot, random.Random(6), actions=100)
+    assert game.roll_dice() == catan.streams.roll_dice(expected)
+    assert game.rng.getstate() == expected.getstate()
+
+
+def test_copy_rolls_the_same_dice():
+    game = _game(pregame='off')
+    snapshot = game.copy()
+    assert [snapshot.roll_dice() for _ in range(10)] == [game.roll_dice() for _ in range(10)]
+
+
+class _Counter(object):
+    def __init__(self):
+        self.calls = 0
+
+    def notify(self, observable):
+        self.calls += 1
+
+
+def _building_game():
+    game = _game(pregame='off')
+    player = game.get_cur_player()
+    game.board.place_piece(Piece(PieceType.settlement, player), 0x67)
+    game.roll(8)
+    game.hands[player.seat - 1] += 10
+    game.undo_manager.checkpoint()
+    return game, player
+
+
+def test_transaction_notifies_once_and_undoes_as_one():
+    game, player = _building_game()
+    counter = _Counter()
+    game.observers.add(counter)
+    hash_before = game.zobrist_hash()
+    hands_before = game.hands.copy()
+    with game.transaction():
+        for _ in range(2):
+            game.begin_placing(PieceType.road)
+            game.place_road(game.board.placement.legal_road_edges(player)[0])
+        assert counter.calls == 0
+    assert counter.calls == 1
+    assert game.board.placement.num_roads(player) == 2
+    game.undo()
+    assert game.board.placement.num_roads(player) == 0
+    assert game.zobrist_hash() == hash_before
+    assert (game.hands == hands_before).all()
+    assert not game.undo_manager.can_undo()
+    game.redo()
+    assert game.board.placement.num_roads(player) == 2
+
+
+def test_transaction_rolls_back_when_an_action_raises():
+    game, player = _building_game()
+    counter = _Counter()
+    game.observers.add(counter)
+    hash_before = game.zobrist_hash()
+    hands_before = game.hands.copy()
+    try:
+        with game.transaction():
+            game.begin_placing(PieceType.road)
+            game.place_road(game.board.placement.legal_road_edges(player)[0])
+            raise RuntimeError('search gave up')
+    except RuntimeError:
+        pass
+    assert game.board.placement.num_roads(player) == 0
+    assert game.zobrist_hash() == hash_before
+    assert (game.hands == hands_before).all()
+    assert isinstance(game.state, catan.states.GameStateDuringTurnAfterRoll)
+    assert not game.undo_manager.can_undo()
+
+
+def test_nested_transactions_notify_once():
+    game, player = _building_game()
+    counter = _Counter()
+    game.observers.add(counter)
+    with game.transaction():
+        with game.transaction():
+            game.begin_placing(PieceType.road)
+            game.place_road(game.board.placement.legal_road_edges(player)[0])
+        assert counter.calls == 0
+        game.end_turn()
+    assert counter.calls == 1
+    game.undo()
+    assert game.get_cur_player() == player
+    assert game.board.placement.num_roads(player) == 0
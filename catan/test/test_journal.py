@@ -0,0 +1,108 @@
+import copy
+import random
+
+import pytest
+
+import catan.sim
+from catan import codec, journal, streams
+from catan.game import Game
+from catan.longestroad import longest_road_lengths
+from catan.production import NUM_SEATS
+
+
+def _game(pregame='on'):
+    game = Game(logging='off', pregame=pregame, rng=streams.RandomStream('journal'))
+    game.start(Game.get_debug_players())
+    game.undo_manager.checkpoint()
+    return game
+
+
+def _position(game):
+    """
+    Everything undo must put back: the encoded game, its hash and every seat's longest road.
+    """
+    return (codec.encode_game(game), game.zobrist_hash(),
+            [game.board.longest_road.length(i) for i in range(NUM_SEATS)])
+
+
+def _play(game, actions, seed):
+    """
+    :return: the position before and after each action, with how many steps undo had then.
+             Building takes two steps, begin_placing and placing the piece.
+    """
+    policy = random.Random(seed)
+    dice = random.Random(seed)
+    positions = [(0, _position(game))]
+    for _ in range(actions):
+        if game.winner() is not None:
+            break
+        catan.sim.apply(game, catan.sim.random_agent(game, catan.sim.legal_actions(game), policy), dice)
+        positions.append((len(game.undo_manager._undo_stack), _position(game)))
+    return positions
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_undo_and_redo_round_trip(seed):
+    game = _game()
+    rng = copy.copy(game.rng)
+    positions = _play(game, 300, seed)
+    for steps, position in reversed(positions[:-1]):
+        while len(game.undo_manager._undo_stack) > steps:
+            game.undo()
+        assert _position(game) == position
+        assert _position(game)[2] == longest_road_lengths(game.board._piece_arrays)
+    assert not game.undo_manager.can_undo()
+    # steals draw from the game's rng, which undo doesn't rewind
+    game.rng = rng
+    for steps, position in positions[1:]:
+        while len(game.undo_manager._undo_stack) < steps:
+            game.redo()
+        assert _position(game) == position
+    assert not game.undo_manager.can_redo()
+
+
+def test_new_command_clears_redo():
+    game = _game(pregame='off')
+    game.roll(8)
+    game.undo()
+    assert game.undo_manager.can_redo()
+    game.roll(6)
+    assert not game.undo_manager.can_redo()
+    assert game.last_roll == 6
+
+
+def test_pregame_road_is_one_step():
+    game = _game()
+    player = game.get_cur_player()
+    game.place_settlement(game.board.placement.legal_settlement_nodes(player, connected=False)[0])
+    before = _position(game)
+    game.place_road(game.board.placement.legal_road_edges(player, pregame=True)[0])
+    assert game.get_cur_player() != player
+    game.undo()
+    assert _position(game) == before
+    assert game.get_cur_player() == player
+
+
+def test_history_is_bounded():
+    game = _game(pregame='off')
+    game.undo_manager = journal.UndoJournal(max_steps=3)
+    positions = [_position(game)]
+    for roll in (8, 6):
+        game.roll(roll)
+        positions.append(_position(game))
+        game.end_turn()
+        positions.append(_position(game))
+    for position in reversed(positions[-4:-1]):
+        game.undo()
+        assert _position(game) == position
+    assert not game.undo_manager.can_undo()
+    assert _position(game) == positions[1]
+
+
+def test_checkpoint_forgets_history():
+    game = _game(pregame='off')
+    game.roll(8)
+    game.undo_manager.checkpoint()
+    assert not game.undo_manager.can_undo()
+    with pytest.raises(Exception):
+        game.undo()
@@ -0,0 +1,108 @@
+import random
+
+import hexgrid
+
+from catan import streams, topology
+from catan.board import Board
+from catan.game import Game
+from catan.longestroad import MIN_LENGTH, LongestRoad, longest_road_lengths
+from catan.pieces import Piece, PieceType
+from catan.production import NUM_SEATS
+
+
+def _board():
+    return Board(rng=streams.RandomStream('longest road'))
+
+
+def _lengths(board):
+    return [board.longest_road.length(i) for i in range(NUM_SEATS)]
+
+
+def _chain(start, length):
+    """
+    :return: a simple path of edges, as (edge, node) pairs, starting at a node
+    """
+    path = list()
+    node = start
+    visited = {node}
+    while len(path) < length:
+        edge = next(edge for edge in topology.EDGES_TOUCHING_NODE[node]
+                    if next(n for n in topology.NODES_TOUCHING_EDGE[edge] if n != node) not in visited)
+        node = next(n for n in topology.NODES_TOUCHING_EDGE[edge] if n != node)
+        visited.add(node)
+        path.append((edge, node))
+    return path
+
+
+def test_random_placements_match_from_scratch():
+    rng = random.Random(0)
+    board = _board()
+    players = Game.get_debug_players()
+    placed = list()
+    for step in range(300):
+        if placed and rng.random() < 0.3:
+            hex_type, coord = placed.pop(rng.randrange(len(placed)))
+            del board.pieces[hex_type, coord]
+        elif rng.random() < 0.8:
+            edge = rng.choice(topology.EDGE_COORDS)
+            if board.get_piece_at(hexgrid.EDGE, edge) is None:
+                board.pieces[hexgrid.EDGE, edge] = Piece(PieceType.road, rng.choice(players))
+                placed.append((hexgrid.EDGE, edge))
+        else:
+            node = rng.choice(topology.NODE_COORDS)
+            if board.get_piece_at(hexgrid.NODE, node) is None:
+                board.pieces[hexgrid.NODE, node] = Piece(PieceType.settlement, rng.choice(players))
+                placed.append((hexgrid.NODE, node))
+        assert _lengths(board) == longest_road_lengths(board._piece_arrays), step
+        rebuilt = LongestRoad()
+        rebuilt.rebuild(board._piece_arrays)
+        assert [rebuilt.length(i) for i in range(NUM_SEATS)] == _lengths(board)
+
+
+def _build(board, player, path):
+    for edge, _ in path:
+        board.place_piece(Piece(PieceType.road, player), edge)
+
+
+def test_holder():
+    board = _board()
+    red, blue, white = Game.get_debug_players()[:3]
+    red_path = _chain(topology.NODE_COORDS[0], MIN_LENGTH)
+    blue_path = _chain(topology.NODE_COORDS[-1], MIN_LENGTH + 1)
+    assert not {edge for edge, _ in red_path} & {edge for edge, _ in blue_path}
+
+    _build(board, red, red_path[:MIN_LENGTH - 1])
+    assert board.longest_road.length(0) == MIN_LENGTH - 1
+    assert board.longest_road.holder_seat_idx is None
+    _build(board, red, red_path[MIN_LENGTH - 1:])
+    assert board.longest_road.holder_seat_idx == 0
+    assert board.longest_road.holder_length() == MIN_LENGTH
+
+    # a tie doesn't take it from the holder, a longer road does
+    _build(board, blue, blue_path[:MIN_LENGTH])
+    assert board.longest_road.holder_seat_idx == 0
+    _build(board, blue, blue_path[MIN_LENGTH:])
+    assert board.longest_road.holder_seat_idx == 1
+
+    # an opponent's settlement breaks a road
+    board.place_piece(Piece(PieceType.settlement, white), blue_path[2][1])
+    assert board.longest_road.length(1) == 3
+    assert board.longest_road.holder_seat_idx == 0
+    assert _lengths(board) == longest_road_lengths(board._piece_arrays)
+
+    # nobody holds a road shorter than MIN_LENGTH
+    board.remove_piece(board.get_piece_at(hexgrid.EDGE, red_path[-1][0]), red_path[-1][0])
+    assert board.longest_road.holder_seat_idx is None
+    assert board.longest_road.holder_length() == 0
+
+
+def test_copy_is_independent():
+    board = _board()
+    red = Game.get_debug_players()[0]
+    path = _chain(topology.NODE_COORDS[0], MIN_LENGTH)
+    _build(board, red, path)
+    snapshot = board.copy()
+    snapshot.remove_piece(snapshot.get_piece_at(hexgrid.EDGE, path[0][0]), path[0][0])
+    assert snapshot.longest_road.length(0) == MIN_LENGTH - 1
+    assert board.longest_road.length(0) == MIN_LENGTH
+    assert board.longest_road.holder_seat_idx == 0
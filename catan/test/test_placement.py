@@ -0,0 +1,89 @@
+import hexgrid
+
+import catan.batch
+import catan.sim
+from catan import topology
+from catan.game import Game
+
+
+def _first_round(game):
+    """
+    Place each player's first settlement and road, taking the first legal node and edge.
+    """
+    for _ in range(4):
+        player = game.get_cur_player()
+        game.place_settlement(game.board.placement.legal_settlement_nodes(player, connected=False)[0])
+        game.place_road(game.board.placement.legal_road_edges(player, pregame=True)[0])
+
+
+def _started_game():
+    game = Game(logging='off')
+    game.start(Game.get_debug_players())
+    return game
+
+
+def _detached_edge(game, player, settlement):
+    """
+    :return: an empty edge next to the player's first road, away from the settlement
+    """
+    placement = game.board.placement
+    for edge in placement.legal_road_edges(player):
+        if not topology.NODE_EDGE_MASKS[settlement] & topology.EDGE_BITS[edge]:
+            return edge
+    raise AssertionError('no detached edge')
+
+
+def test_pregame_road_must_touch_first_settlement():
+    game = _started_game()
+    player = game.get_cur_player()
+    settlement = game.board.placement.legal_settlement_nodes(player, connected=False)[0]
+    game.place_settlement(settlement)
+    edges = game.board.placement.legal_road_edges(player, pregame=True)
+    assert edges
+    assert all(topology.NODE_EDGE_MASKS[settlement] & topology.EDGE_BITS[edge] for edge in edges)
+
+
+def test_detached_setup_road_is_rejected():
+    game = _started_game()
+    _first_round(game)
+    player = game.get_cur_player()
+    placement = game.board.placement
+    settlement = placement.legal_settlement_nodes(player, connected=False)[-1]
+    game.place_settlement(settlement)
+    detached = _detached_edge(game, player, settlement)
+
+    assert not placement.can_place_road(player, detached, pregame=True)
+    assert placement.can_place_road(player, detached)
+    game.place_road(detached)
+    assert game.board.get_piece_at(hexgrid.EDGE, detached) is None
+    assert game.get_cur_player() == player
+    assert game.state.can_place_road()
+
+    edges = placement.legal_road_edges(player, pregame=True)
+    assert all(topology.NODE_EDGE_MASKS[settlement] & topology.EDGE_BITS[edge] for edge in edges)
+    assert {action.args[0] for action in catan.sim.legal_actions(game)} == set(edges)
+    game.place_road(edges[0])
+    assert game.board.get_piece_at(hexgrid.EDGE, edges[0]) is not None
+
+
+def test_batch_pregame_road_mask_matches_placement():
+    game = _started_game()
+    games = catan.batch.BatchedGames.from_boards([game.board])
+    every = [0]
+    for _ in range(4):
+        player = game.get_cur_player()
+        node = game.board.placement.legal_settlement_nodes(player, connected=False)[0]
+        game.place_settlement(node)
+        assert games.place_settlement(every, [node])[0]
+        edge = game.board.placement.legal_road_edges(player, pregame=True)[0]
+        game.place_road(edge)
+        assert games.place_road(every, [edge])[0]
+    player = game.get_cur_player()
+    settlement = game.board.placement.legal_settlement_nodes(player, connected=False)[-1]
+    game.place_settlement(settlement)
+    assert games.place_settlement(every, [settlement])[0]
+
+    mask = games.road_mask(every)[0]
+    assert set(catan.batch._EDGE_COORDS[mask].tolist()) == set(
+        game.board.placement.legal_road_edges(player, pregame=True))
+    assert not games.place_road(every, [_detached_edge(game, player, settlement)])[0]
@@ -0,0 +1,71 @@
+import random
+
+import hexgrid
+import numpy
+
+import catan.sim
+from catan import streams, topology
+from catan.board import RESOURCE_INDEX
+from catan.game import Game
+from catan.pieces import PieceType
+from catan.production import NUM_SEATS, Production, empty_counts
+
+
+def _played_game(seed, actions=200):
+    rng = streams.RandomStream(seed)
+    game = Game(logging='off', rng=rng.spawn('game'))
+    game.start(Game.get_debug_players())
+    policy = random.Random(seed)
+    for _ in range(actions):
+        if game.winner() is not None:
+            break
+        catan.sim.apply(game, catan.sim.random_agent(game, catan.sim.legal_actions(game), policy), rng)
+    return game
+
+
+def _brute_force(board, roll, robber_tile):
+    counts = empty_counts()
+    for tile in board.tiles:
+        if tile.number.value != roll or tile.tile_id == robber_tile or tile.terrain not in RESOURCE_INDEX:
+            continue
+        for node in topology.NODES_TOUCHING_TILE[tile.tile_id]:
+            piece = board.get_piece_at(hexgrid.NODE, node)
+            if piece is not None:
+                counts[piece.owner.seat - 1, RESOURCE_INDEX[tile.terrain]] += 2 if piece.type == PieceType.city else 1
+    return counts
+
+
+def test_produce_matches_brute_force():
+    for seed in range(3):
+        board = _played_game(seed).board
+        for roll in range(2, 13):
+            for robber_tile in (None, ) + tuple(topology.TILE_IDS):
+                assert (board.production.produce(roll, robber_tile) == _brute_force(board, roll, robber_tile)).all()
+
+
+def test_rebuild_matches_updates():
+    board = _played_game(1).board
+    rebuilt = Production()
+    rebuilt.rebuild(board.tiles, board._piece_arrays[hexgrid.NODE])
+    for roll in range(2, 13):
+        assert (rebuilt.produce(roll) == board.production.produce(roll)).all()
+
+
+def test_produce_returns_a_new_array():
+    board = _played_game(0).board
+    roll = next(roll for roll in range(2, 13) if board.production.produce(roll).any())
+    counts = board.production.produce(roll)
+    counts[:] = 0
+    assert board.production.produce(roll).any()
+    assert not board.production.produce(7).any()
+    assert board.production.produce(13).shape == (NUM_SEATS, len(RESOURCE_INDEX))
+
+
+def test_roll_pays_production():
+    game = _played_game(2)
+    while not game.state.can_roll():
+        catan.sim.apply(game, catan.sim.legal_actions(game)[-1], streams.RandomStream(0))
+    roll = next(roll for roll in (6, 8, 5, 9, 4, 10) if game.board.production.produce(roll, game.robber_tile).any())
+    expected = game.hands + game.board.production.produce(roll, game.robber_tile)
+    game.roll(roll)
+    assert numpy.array_equal(game.hands, expected)
@@ -0,0 +1,97 @@
+import io
+import random
+import re
+
+import pytest
+
+import catan.sim
+from catan import streams
+from catan.game import Game
+from catan.replay import IllegalActionError, Replayer
+
+
+@pytest.fixture
+def logged_game(tmp_path, monkeypatch):
+    """
+    A game played with logging on, and its position after each turn ended.
+    """
+    monkeypatch.chdir(tmp_path)
+    rng = streams.RandomStream('replay')
+    game = Game(logging='on', rng=rng)
+    game.start(Game.get_debug_players())
+    policy = random.Random(0)
+    positions = {0: game.zobrist_hash()}
+    for _ in range(400):
+        if game.winner() is not None:
+            break
+        catan.sim.apply(game, catan.sim.random_agent(game, catan.sim.legal_actions(game), policy), rng)
+        positions.setdefault(game._cur_turn, game.zobrist_hash())
+    return game, positions
+
+
+def _replayer(text, validate=False):
+    return Replayer(io.StringIO(text), validate=validate)
+
+
+def test_replay_rebuilds_the_game(logged_game):
+    game, _ = logged_game
+    with Replayer(game.catanlog.logpath(), validate=True) as replayer:
+        lines = list(replayer)
+    assert lines
+    assert replayer.events == len(lines)
+    assert replayer.game._cur_turn == game._cur_turn
+    assert replayer.game.zobrist_hash() == game.zobrist_hash()
+    assert replayer.game.board.zobrist == game.board.zobrist
+    assert replayer.game.robber_tile == game.robber_tile
+    assert [replayer.game.score(player) for player in replayer.game.players] == \
+        [game.score(player) for player in game.players]
+
+
+def test_fast_forward_to_turn(logged_game):
+    game, positions = logged_game
+    text = game.catanlog.dump()
+    for turn in (1, 8, 20, game._cur_turn // 2):
+        replayer = _replayer(text)
+        replayer.fast_forward(turn=turn)
+        assert replayer.game._cur_turn == turn
+        assert replayer.game.zobrist_hash() == positions[turn]
+        assert not replayer.game.undo_manager.can_undo()
+    replayer = _replayer(text)
+    assert replayer.fast_forward(event=5) == 5
+    assert replayer.step() is not None
+    assert replayer.events == 6
+
+
+def _break(text, pattern, replacement, count=1):
+    broken, n = re.subn(pattern, replacement, text, count=count, flags=re.MULTILINE)
+    assert n == count
+    return broken
+
+
+def _rule(text):
+    with pytest.raises(IllegalActionError) as error:
+        for _ in _replayer(text, validate=True):
+            pass
+    return error.value.rule
+
+
+def test_validation_rejects_illegal_logs(logged_game):
+    game, _ = logged_game
+    text = game.catanlog.dump()
+    # pregame turns end by themselves, break the log after the first roll
+    first_roll = re.search(r'^\w+ rolls \d+$', text, flags=re.MULTILINE).start()
+    pregame, rest = text[:first_roll], text[first_roll:]
+    # a player taking the next player's turn
+    assert _rule(pregame + _break(rest, r'^\w+ ends turn after -?\d+s\n', '')) == 'turn_order'
+    # rolling twice in a turn
+    assert _rule(pregame + _break(rest, r'^(\w+ rolls \d+\n)', r'\1\1')) == 'state'
+    # building a road twice on the same edge
+    assert _rule(pregame + _break(rest, r'^(\w+ buys road, builds at \(\w+ \w+\)\n)', r'\1\1')) == 'placement'
+
+
+def test_malformed_log_raises(logged_game):
+    game, _ = logged_game
+    text = _break(game.catanlog.dump(), r'^(\w+) rolls (\d+)$', r'\1 juggles \2')
+    with pytest.raises(ValueError):
+        for _ in _replayer(text):
+            pass
@@ -0,0 +1,56 @@
+import numpy
+import pytest
+
+from catan import resources
+from catan.board import Terrain
+from catan.game import Game
+from catan.trading import CatanTrade
+
+
+def test_vectors_and_pairs():
+    counts = resources.vector(wood=2, ore=1)
+    assert counts.tolist() == [2, 0, 0, 0, 1]
+    assert resources.to_pairs(counts) == [(2, Terrain.wood), (1, Terrain.ore)]
+    assert resources.from_pairs([(2, Terrain.wood), (1, Terrain.ore), (1, Terrain.wood)]).tolist() == [3, 0, 0, 0, 1]
+    assert resources.index(Terrain.sheep) == 3
+    with pytest.raises(ValueError):
+        resources.index(Terrain.desert)
+
+
+def test_costs():
+    hand = resources.vector(wood=1, brick=1, wheat=1, sheep=1)
+    assert resources.can_afford(hand, resources.SETTLEMENT_COST)
+    assert not resources.can_afford(hand, resources.CITY_COST)
+    hand -= resources.ROAD_COST
+    assert hand.tolist() == [0, 0, 1, 1, 0]
+    with pytest.raises(ValueError):
+        resources.ROAD_COST[0] = 2
+
+
+def test_trade_vectors():
+    red, blue = Game.get_debug_players()[:2]
+    trade = CatanTrade(red, blue)
+    trade.give(Terrain.wood, 2)
+    trade.give(Terrain.wood)
+    trade.get(Terrain.ore)
+    assert trade.giving() == [(3, Terrain.wood)]
+    assert trade.getting() == [(1, Terrain.ore)]
+    assert trade.num_giving() == 3
+    assert trade.num_getting() == 1
+    same = CatanTrade.from_vectors(red, blue, resources.vector(wood=3), resources.vector(ore=1))
+    assert numpy.array_equal(same.giving_vector(), trade.giving_vector())
+    assert numpy.array_equal(same.getting_vector(), trade.getting_vector())
+
+
+def test_game_trade_between_players():
+    game = Game(logging='off', pregame='off')
+    game.start(Game.get_debug_players())
+    red, blue = game.players[:2]
+    game.hands[red.seat - 1] = resources.vector(wood=3)
+    game.hands[blue.seat - 1] = resources.vector(ore=2)
+    trade = CatanTrade.from_vectors(red, blue, resources.vector(wood=2), resources.vector(ore=1))
+    game.trade(trade)
+    assert game.hand(red).tolist() == [1, 0, 0, 0, 1]
+    assert game.hand(blue).tolist() == [2, 0, 0, 0, 1]
+    assert game.can_afford(red, resources.vector(wood=1, ore=1))
+    assert not game.can_afford(blue, resources.ROAD_COST)
@@ -0,0 +1,82 @@
+import random
+
+import hexgrid
+
+import catan.sim
+from catan import scoring, streams, topology
+from catan.game import Game
+from catan.pieces import PieceType
+from catan.scoring import LARGEST_ARMY_MIN, ScoreLedger
+
+
+def _brute_force_score(game, player):
+    points = 0
+    for node in topology.NODE_COORDS:
+        piece = game.board.get_piece_at(hexgrid.NODE, node)
+        if piece is not None and piece.owner == player:
+            points += 2 if piece.type == PieceType.city else 1
+    points += game.score_ledger.victory_point_cards(player.seat - 1)
+    if game.longest_road_holder() == player:
+        points += scoring.LONGEST_ROAD_POINTS
+    if game.largest_army_holder() == player:
+        points += scoring.LARGEST_ARMY_POINTS
+    return points
+
+
+def test_largest_army():
+    ledger = ScoreLedger()
+    for _ in range(LARGEST_ARMY_MIN - 1):
+        ledger.play_knight(0)
+    assert ledger.largest_army_seat_idx is None
+    ledger.play_knight(0)
+    assert ledger.largest_army_seat_idx == 0
+    for _ in range(LARGEST_ARMY_MIN):
+        ledger.play_knight(1)
+    assert ledger.largest_army_seat_idx == 0
+    ledger.play_knight(1)
+    assert ledger.largest_army_seat_idx == 1
+    assert ledger.knights(1) == LARGEST_ARMY_MIN + 1
+
+
+def test_ledger_copy_is_independent():
+    ledger = ScoreLedger()
+    ledger.play_victory_point(2)
+    copied = ledger.copy()
+    copied.play_victory_point(2)
+    for _ in range(LARGEST_ARMY_MIN):
+        copied.play_knight(3)
+    assert ledger.victory_point_cards(2) == 1
+    assert copied.victory_point_cards(2) == 2
+    assert ledger.largest_army_seat_idx is None
+    assert copied.largest_army_seat_idx == 3
+
+
+def test_score_matches_brute_force():
+    for seed in range(3):
+        rng = streams.RandomStream(seed)
+        game = Game(logging='off', rng=rng.spawn('game'))
+        game.start(Game.get_debug_players())
+        policy = random.Random(seed)
+        for _ in range(400):
+            if game.winner() is not None:
+                break
+            catan.sim.apply(game, catan.sim.random_agent(game, catan.sim.legal_actions(game), policy), rng)
+            for player in game.players:
+                assert game.score(player) == _brute_force_score(game, player)
+
+
+def test_dev_cards_score_and_win():
+    game = Game(logging='off', pregame='off', rng=streams.RandomStream('score'))
+    game.start(Game.get_debug_players())
+    player = game.get_cur_player()
+    game.roll(8)
+    game.play_victory_point()
+    assert game.score(player) == 1
+    for _ in range(LARGEST_ARMY_MIN):
+        game.score_ledger.play_knight(player.seat - 1)
+    assert game.largest_army_holder() == player
+    assert game.score(player) == 1 + scoring.LARGEST_ARMY_POINTS
+    assert game.winner() is None
+    for _ in range(scoring.VICTORY_POINTS_TO_WIN - game.score(player)):
+        game.score_ledger.play_victory_point(player.seat - 1)
+    assert game.winner() == player
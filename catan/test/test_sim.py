@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+import catan.sim
+from catan import codec, streams
+from catan.board import HexNumber, Terrain
+from catan.game import Game
+from catan.production import NUM_SEATS
+
+
+def _game(seed):
+    rng = streams.RandomStream(seed)
+    game = Game(board=catan.sim.random_board(rng), logging='off', rng=rng)
+    game.start(Game.get_debug_players())
+    return game
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_play_is_determined_by_the_seed(seed):
+    agents = [catan.sim.random_agent] * NUM_SEATS
+    first = catan.sim.play(agents, streams.RandomStream(seed))
+    second = catan.sim.play(agents, streams.RandomStream(seed))
+    assert first.winner is not None
+    assert (first.winner.seat, first.turns, first.actions) == (second.winner.seat, second.turns, second.actions)
+
+
+def test_play_stops_at_max_turns():
+    result = catan.sim.play([catan.sim.random_agent] * NUM_SEATS, streams.RandomStream(0), max_turns=10)
+    assert result.winner is None
+    assert result.turns == 10
+
+
+def test_play_reuses_a_game():
+    agents = [catan.sim.random_agent] * NUM_SEATS
+    game = Game(logging='off')
+    for seed in range(3):
+        fresh = catan.sim.play(agents, streams.RandomStream(seed))
+        reused = catan.sim.play(agents, streams.RandomStream(seed), game=game)
+        assert (reused.winner.seat, reused.turns, reused.actions) == (fresh.winner.seat, fresh.turns, fresh.actions)
+
+
+def test_latencies_are_recorded_per_action():
+    latencies = list()
+    result = catan.sim.play([catan.sim.random_agent] * NUM_SEATS, streams.RandomStream(0), latencies=latencies)
+    assert len(latencies) == result.actions
+    assert all(latency >= 0 for latency in latencies)
+
+
+@pytest.mark.parametrize('seed', range(2))
+def test_legal_actions_can_all_be_applied(seed):
+    game = _game(seed)
+    policy = random.Random(seed)
+    for _ in range(120):
+        actions = catan.sim.legal_actions(game)
+        assert actions
+        before = codec.encode_game(game)
+        for action in actions:
+            trial = game.copy()
+            catan.sim.apply(trial, action, streams.RandomStream(seed))
+            assert codec.encode_game(trial) != before, action
+        catan.sim.apply(game, catan.sim.random_agent(game, actions, policy), game.rng)
+
+
+def test_random_board():
+    board = catan.sim.random_board(streams.RandomStream(0))
+    assert len(board.tiles) == 19
+    assert sorted(tile.terrain.value for tile in board.tiles) == sorted(
+        tile.terrain.value for tile in catan.sim.random_board(streams.RandomStream(1)).tiles)
+    deserts = [tile for tile in board.tiles if tile.terrain == Terrain.desert]
+    assert len(deserts) == 1 and deserts[0].number == HexNumber.none
+    assert all(tile.number != HexNumber.none for tile in board.tiles if tile.terrain != Terrain.desert)
+    again = catan.sim.random_board(streams.RandomStream(0), board=catan.sim.random_board(streams.RandomStream(5)))
+    assert [(t.terrain, t.number) for t in again.tiles] == [(t.terrain, t.number) for t in board.tiles]
+
+
+def test_run():
+    stats = catan.sim.run(3, seed=0)
+    assert stats['games'] == 3
+    assert stats['wins'] == 3
+    assert stats['actions'] > stats['turns'] > 0
+    assert stats['p50'] <= stats['p99'] <= stats['p999']
+    assert stats['games_per_second'] > 0
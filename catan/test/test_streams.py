@@ -0,0 +1,57 @@
+import copy
+import pickle
+
+import catan.sim
+from catan import streams
+
+
+def test_same_key_same_stream():
+    assert [streams.RandomStream(7).random() for _ in range(3)] == [streams.RandomStream('7').random()] * 3
+    a = streams.RandomStream('tournament')
+    b = streams.RandomStream('tournament')
+    assert [a.random() for _ in range(10)] == [b.random() for _ in range(10)]
+
+
+def test_fresh_key_can_be_replayed():
+    rng = streams.RandomStream()
+    draws = [rng.random() for _ in range(10)]
+    again = streams.RandomStream(rng.key)
+    assert [again.random() for _ in range(10)] == draws
+
+
+def test_spawn():
+    parent = streams.RandomStream(7)
+    child = parent.spawn(12)
+    assert child.key == '7/12'
+    state = parent.getstate()
+    again = parent.spawn(12)
+    assert [child.random() for _ in range(5)] == [again.random() for _ in range(5)]
+    assert parent.getstate() == state
+    assert parent.spawn(1).random() != parent.spawn(2).random()
+    assert child.random() != streams.RandomStream(7).random()
+
+
+def test_pickle_and_copy_keep_position():
+    rng = streams.RandomStream(3)
+    rng.random()
+    for clone in (pickle.loads(pickle.dumps(rng)), copy.copy(rng), copy.deepcopy(rng)):
+        assert clone.key == rng.key
+        assert clone is not rng
+        assert clone.getstate() == rng.getstate()
+    clone = copy.copy(rng)
+    clone.random()
+    assert clone.getstate() != rng.getstate()
+
+
+def test_roll_dice():
+    rng = streams.RandomStream(0)
+    rolls = [streams.roll_dice(rng) for _ in range(1000)]
+    assert min(rolls) == 2
+    assert max(rolls) == 12
+
+
+def test_seed_replays_game():
+    agents = [catan.sim.random_agent] * 4
+    results = [catan.sim.play(agents, streams.RandomStream('replay')) for _ in range(2)]
+    assert results[0] == results[1]
+    assert catan.sim.play(agents, streams.RandomStream('other')) != results[0]
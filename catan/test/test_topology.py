@@ -0,0 +1,72 @@
+import hexgrid
+import pytest
+
+from catan import topology
+
+
+def test_locations_match_hexgrid():
+    assert list(topology.TILE_IDS) == sorted(hexgrid.legal_tile_ids())
+    assert list(topology.NODE_COORDS) == sorted(hexgrid.legal_node_coords())
+    assert list(topology.EDGE_COORDS) == sorted(hexgrid.legal_edge_coords())
+    assert len(topology.NODE_COORDS) == 54
+    assert len(topology.EDGE_COORDS) == 72
+
+
+def test_tile_tables_match_hexgrid():
+    for tile_id in topology.TILE_IDS:
+        coord = hexgrid.tile_id_to_coord(tile_id)
+        assert topology.TILE_ID_TO_COORD[tile_id] == coord
+        assert topology.tile_id_to_coord(tile_id) == coord
+        assert topology.TILE_COORD_TO_ID[coord] == tile_id
+        assert list(topology.NODES_TOUCHING_TILE[tile_id]) == list(hexgrid.nodes_touching_tile(tile_id))
+        assert list(topology.EDGES_TOUCHING_TILE[tile_id]) == list(hexgrid.edges_touching_tile(tile_id))
+    assert topology.tile_id_to_coord(None) == -1
+    assert topology.tile_id_to_coord(20) == -1
+
+
+def test_node_and_edge_tables_agree():
+    for edge in topology.EDGE_COORDS:
+        assert sorted(topology.NODES_TOUCHING_EDGE[edge]) == sorted(hexgrid.nodes_touching_edge(edge))
+        for node in topology.NODES_TOUCHING_EDGE[edge]:
+            assert edge in topology.EDGES_TOUCHING_NODE[node]
+    for node in topology.NODE_COORDS:
+        assert 2 <= len(topology.EDGES_TOUCHING_NODE[node]) <= 3
+        assert 1 <= len(topology.TILES_TOUCHING_NODE[node]) <= 3
+        for tile_id in topology.TILES_TOUCHING_NODE[node]:
+            assert node in topology.NODES_TOUCHING_TILE[tile_id]
+        for adjacent in topology.NODES_ADJACENT_TO_NODE[node]:
+            assert node in topology.NODES_ADJACENT_TO_NODE[adjacent]
+
+
+def test_coast():
+    coastal_edges = {edge for tile_id in hexgrid.coastal_tile_ids() for edge in hexgrid.coastal_edges(tile_id)}
+    assert sorted(topology.COASTAL_EDGES) == sorted(coastal_edges)
+    assert len(topology.COASTAL_COORDS) == 30
+    for tile_id, direction in topology.COASTAL_COORDS:
+        assert topology.edge_coord_in_direction(tile_id, direction) == \
+            hexgrid.edge_coord_in_direction(tile_id, direction)
+    with pytest.raises(ValueError):
+        topology.edge_coord_in_direction(20, 'NW')
+
+
+def test_masks():
+    for i, node in enumerate(topology.NODE_COORDS):
+        assert topology.NODE_BITS[node] == 1 << i
+        assert topology.node_coords_in_mask(topology.NODE_NEIGHBOURHOOD_MASKS[node]) == \
+            sorted((node,) + tuple(topology.NODES_ADJACENT_TO_NODE[node]))
+        assert topology.edge_coords_in_mask(topology.NODE_EDGE_MASKS[node]) == \
+            sorted(topology.EDGES_TOUCHING_NODE[node])
+    for edge in topology.EDGE_COORDS:
+        assert topology.node_coords_in_mask(topology.EDGE_NODE_MASKS[edge]) == \
+            sorted(topology.NODES_TOUCHING_EDGE[edge])
+    assert topology.node_coords_in_mask(topology.ALL_NODES_MASK) == list(topology.NODE_COORDS)
+    assert topology.edge_coords_in_mask(topology.ALL_EDGES_MASK) == list(topology.EDGE_COORDS)
+    assert topology.NODE_BITS[0] == 0
+
+
+def test_location_matches_hexgrid():
+    for node in topology.NODE_COORDS:
+        assert topology.location(hexgrid.NODE, node) == hexgrid.location(hexgrid.NODE, node)
+    for edge in topology.EDGE_COORDS:
+        assert topology.location(hexgrid.EDGE, edge) == hexgrid.location(hexgrid.EDGE, edge)
+    assert topology.location(hexgrid.TILE, 5) == hexgrid.location(hexgrid.TILE, 5)
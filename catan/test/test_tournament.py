@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from catan import tournament
+
+AGENTS = ['catan.sim:random_agent'] * 4
+
+
+def _records(out):
+    with open(out) as file:
+        return [json.loads(line) for line in file]
+
+
+def test_run_writes_header_and_records(tmp_path):
+    out = str(tmp_path / 'results.jsonl')
+    standings = tournament.run(AGENTS, 3, out, seed=5, workers=1, max_turns=50)
+    records = _records(out)
+    assert records[0] == {'tournament': {'seed': 5, 'agents': AGENTS, 'games': 3, 'max_turns': 50}}
+    assert sorted(record['game'] for record in records[1:]) == [0, 1, 2]
+    assert standings.games == 3
+
+
+def test_resume_plays_only_missing_games(tmp_path):
+    out = str(tmp_path / 'results.jsonl')
+    tournament.run(AGENTS, 4, out, seed=5, workers=1, max_turns=50)
+    full = _records(out)
+    with open(out, 'w') as file:
+        for record in full[:3]:
+            file.write(json.dumps(record) + '\n')
+        file.write('{"game": 3, "se')
+    standings = tournament.run(AGENTS, 4, out, seed=5, workers=1, max_turns=50)
+    resumed = _records(out)
+    assert standings.games == 4
+    assert resumed[0] == full[0]
+    assert sorted(resumed[1:], key=lambda r: r['game']) == sorted(full[1:], key=lambda r: r['game'])
+
+
+@pytest.mark.parametrize('changed', [dict(seed=6), dict(num_games=5), dict(max_turns=60),
+                                     dict(agents=AGENTS[:3] + ['catan.sim:legal_actions'])])
+def test_resume_refuses_other_tournament(tmp_path, changed):
+    out = str(tmp_path / 'results.jsonl')
+    tournament.run(AGENTS, 2, out, seed=5, workers=1, max_turns=50)
+    before = _records(out)
+    args = dict(agents=AGENTS, num_games=2, out=out, seed=5, workers=1, max_turns=50)
+    args.update(changed)
+    with pytest.raises(ValueError):
+        tournament.run(**args)
+    assert _records(out) == before
+
+
+def test_resume_refuses_file_without_header(tmp_path):
+    out = tmp_path / 'results.jsonl'
+    out.write_text('{"game": 0, "seats": [0, 1, 2, 3], "winner": 0, "turns": 9, "actions": 40}\n')
+    with pytest.raises(ValueError):
+        tournament.run(AGENTS, 2, str(out), seed=5, workers=1, max_turns=50)
+
+
+def test_seating_rotates():
+    assert tournament.seating(0) == [0, 1, 2, 3]
+    assert tournament.seating(1) == [1, 2, 3, 0]
+    assert tournament.seating(4) == tournament.seating(0)
+
+
+def test_wilson_interval():
+    assert tournament.wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = tournament.wilson_interval(50, 100)
+    assert low == pytest.approx(0.4038, abs=1e-4)
+    assert high == pytest.approx(0.5962, abs=1e-4)
+    assert tournament.wilson_interval(0, 10)[0] == 0.0
+    assert tournament.wilson_interval(10, 10)[1] == pytest.approx(1.0)
+
+
+def test_standings():
+    standings = tournament.Standings(['a', 'b'])
+    standings.add({'winner': 1, 'turns': 10, 'actions': 50})
+    standings.add({'winner': None, 'turns': 20, 'actions': 70})
+    assert standings.games == 2
+    assert standings.unfinished == 1
+    assert standings.wins == [0, 1]
+    assert standings.win_rate(1) == 0.5
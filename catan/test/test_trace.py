@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+import catan.trace
+from catan import streams
+from catan.game import Game
+
+
+def _start_game():
+    game = Game(logging='off', rng=streams.RandomStream('trace'))
+    game.start(Game.get_debug_players())
+    return game
+
+
+def test_records_go_to_ring_while_enabled():
+    catan.trace.enable(ring_size=5)
+    try:
+        _start_game()
+    finally:
+        catan.trace.disable()
+    records = catan.trace.recent()
+    assert 0 < len(records) <= 5
+    assert all(isinstance(name, str) and isinstance(fields, dict) for _, name, fields in records)
+    catan.trace.clear()
+    _start_game()
+    assert catan.trace.recent() == []
+
+
+def test_optimized_run_drops_trace_points():
+    script = ('import catan.trace\n'
+              'from catan.game import Game\n'
+              'catan.trace.enable(ring_size=100)\n'
+              'Game(logging="off").start(Game.get_debug_players())\n'
+              'assert catan.trace.recent() == [], catan.trace.recent()\n')
+    subprocess.run([sys.executable, '-O', '-c', script], check=True)
@@ -0,0 +1,65 @@
+import itertools
+
+import numpy
+
+from catan import resources, trading
+from catan.board import PortType
+from catan.game import Game
+
+
+def _brute_force(hand, ratios):
+    trades = set()
+    for give_idx, get_idx in itertools.permutations(range(resources.NUM_RESOURCES), 2):
+        ratio = ratios[give_idx]
+        if hand[give_idx] >= ratio:
+            trades.add((give_idx, get_idx, ratio))
+    return trades
+
+
+def _as_set(trades):
+    found = set()
+    for give, get, ratio in trades:
+        assert give.sum() == ratio and give.max() == ratio
+        assert get.sum() == 1
+        found.add((int(give.argmax()), int(get.argmax()), ratio))
+    return found
+
+
+def test_maritime_trades_match_brute_force():
+    rng = numpy.random.default_rng(0)
+    for _ in range(200):
+        hand = rng.integers(0, 6, resources.NUM_RESOURCES)
+        ratios = tuple(int(r) for r in rng.choice([2, 3, 4], resources.NUM_RESOURCES))
+        trades = trading.maritime_trades(hand, ratios)
+        assert len(trades) == len(_as_set(trades))
+        assert _as_set(trades) == _brute_force(hand, ratios)
+
+
+def test_maritime_trades_are_read_only():
+    give, get, _ = trading.maritime_trades(resources.vector(wood=4), (4, ) * 5)[0]
+    assert not give.flags.writeable
+    assert not get.flags.writeable
+
+
+def test_maritime_trade_picks_the_port():
+    player = Game.get_debug_players()[0]
+    for ratio, give, port_type in ((4, resources.vector(brick=4), PortType.any4),
+                                   (3, resources.vector(brick=3), PortType.any3),
+                                   (2, resources.vector(brick=2), PortType.brick)):
+        trade = trading.maritime_trade(player, give, resources.UNITS[0], ratio)
+        assert trade.getter().type == port_type
+        assert trade.giver() == player
+
+
+def test_game_makes_maritime_trades():
+    game = Game(logging='off', pregame='off')
+    game.start(Game.get_debug_players())
+    player = game.get_cur_player()
+    game.roll(8)
+    game.hands[player.seat - 1] = resources.vector(wheat=5)
+    trades = game.maritime_trades()
+    assert _as_set(trades) == {(2, get_idx, 4) for get_idx in (0, 1, 3, 4)}
+    give, get, ratio = trades[0]
+    game.trade(trading.maritime_trade(player, give, get, ratio))
+    assert game.hand(player).sum() == 2
+    assert game.hand(player)[2] == 1
@@ -0,0 +1,70 @@
+import json
+import random
+import re
+
+import catan.sim
+from catan import streams, validate
+from catan.game import Game
+
+
+def _log_game(seed):
+    """
+    Play a game with logging on, in the current directory.
+
+    :return: the log's text, str
+    """
+    rng = streams.RandomStream(seed)
+    game = Game(logging='on', rng=rng)
+    game.start(Game.get_debug_players())
+    policy = random.Random(seed)
+    for _ in range(200):
+        catan.sim.apply(game, catan.sim.random_agent(game, catan.sim.legal_actions(game), policy), rng)
+    return game.catanlog.dump()
+
+
+def _archive(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    archive = tmp_path / 'archive'
+    archive.mkdir()
+    texts = {'legal-{}.catan'.format(seed): _log_game(seed) for seed in range(3)}
+    legal = texts['legal-0.catan']
+    first_roll = re.search(r'^\w+ rolls \d+$', legal, flags=re.MULTILINE).start()
+    texts['illegal.catan'] = legal[:first_roll] + re.sub(r'^(\w+ rolls \d+\n)', r'\1\1', legal[first_roll:],
+                                                         count=1, flags=re.MULTILINE)
+    texts['malformed.catan'] = 'not a catanlog\n'
+    for name, text in texts.items():
+        (archive / name).write_text(text)
+    return archive
+
+
+def test_validate_archive(tmp_path, monkeypatch):
+    archive = _archive(tmp_path, monkeypatch)
+    out = str(tmp_path / 'verdicts.jsonl')
+    paths = list(validate._find_logs([str(archive)]))
+    assert len(paths) == 5
+    summary = validate.validate_archive(paths, out, workers=1)
+    assert summary['files'] == 5
+    assert summary['verdicts'] == {'legal': 3, 'illegal': 1, 'malformed': 1}
+    assert summary['rules'] == {'state': 1}
+    with open(out) as file:
+        verdicts = {verdict['file'].rsplit('/', 1)[-1]: verdict for verdict in map(json.loads, file)}
+    assert verdicts['illegal.catan']['line'] > 0
+    assert verdicts['legal-0.catan']['events'] > verdicts['illegal.catan']['events']
+
+
+def test_resume_skips_files_with_verdicts(tmp_path, monkeypatch):
+    archive = _archive(tmp_path, monkeypatch)
+    out = str(tmp_path / 'verdicts.jsonl')
+    paths = sorted(validate._find_logs([str(archive)]))
+    validate.validate_archive(paths[:2], out, workers=1)
+    summary = validate.validate_archive(paths, out, workers=1)
+    assert summary['files'] == 5
+    with open(out) as file:
+        assert sorted(json.loads(line)['file'] for line in file) == paths
+
+
+def test_main_exit_status(tmp_path, monkeypatch, capsys):
+    archive = _archive(tmp_path, monkeypatch)
+    assert validate.main([str(archive / 'legal-1.catan'), '--out', str(tmp_path / 'a.jsonl'), '--workers', '1']) == 0
+    assert validate.main([str(archive), '--out', str(tmp_path / 'b.jsonl'), '--workers', '1']) == 1
+    assert json.loads(capsys.readouterr().out.splitlines()[-1])['files'] == 5
@@ -0,0 +1,64 @@
+import random
+
+import hexgrid
+
+import catan.sim
+from catan import streams, zobrist
+from catan.game import Game
+from catan.pieces import Piece, PieceType
+
+
+def _played_game(seed, actions=200):
+    rng = streams.RandomStream(seed)
+    game = Game(logging='off', rng=rng.spawn('game'))
+    game.start(Game.get_debug_players())
+    policy = random.Random(seed)
+    for _ in range(actions):
+        if game.winner() is not None:
+            break
+        catan.sim.apply(game, catan.sim.random_agent(game, catan.sim.legal_actions(game), policy), rng)
+        assert game.board.zobrist == zobrist.board_key(game.board)
+    return game
+
+
+def test_incremental_hash_matches_from_scratch():
+    for seed in range(3):
+        _played_game(seed)
+
+
+def test_keys_are_stable():
+    assert zobrist.key('piece', 'road', 1, 0x67) == zobrist.key('piece', 'road', 1, 0x67)
+    assert zobrist.key('piece', 'road', 1, 0x67) != zobrist.key('piece', 'road', 2, 0x67)
+    assert zobrist.label_key('turn', 3) == zobrist.key('turn', 3)
+    assert 0 <= zobrist.key('turn', 3) < 1 << 64
+    assert zobrist.piece_key(0x67, None) == 0
+
+
+def test_same_position_same_hash():
+    game = Game(logging='off', pregame='off')
+    game.start(Game.get_debug_players())
+    red, blue = game.players[:2]
+    other = game.copy()
+    game.board.place_piece(Piece(PieceType.road, red), 0x67)
+    game.board.place_piece(Piece(PieceType.road, blue), 0x89)
+    other.board.place_piece(Piece(PieceType.road, blue), 0x89)
+    other.board.place_piece(Piece(PieceType.road, red), 0x67)
+    assert game.zobrist_hash() == other.zobrist_hash()
+    before = game.zobrist_hash()
+    game.board.remove_piece(game.board.get_piece_at(hexgrid.EDGE, 0x67), 0x67)
+    assert game.zobrist_hash() != before
+    game.board.place_piece(Piece(PieceType.road, blue), 0x67)
+    assert game.zobrist_hash() != before
+
+
+def test_game_fields_change_the_hash():
+    game = Game(logging='off', pregame='off')
+    game.start(Game.get_debug_players())
+    hashes = {game.zobrist_hash()}
+    game.roll(8)
+    hashes.add(game.zobrist_hash())
+    game.end_turn()
+    hashes.add(game.zobrist_hash())
+    assert len(hashes) == 3
+    game.hands[0, 0] += 5
+    assert game.zobrist_hash() in hashes
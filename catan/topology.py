@@ -0,0 +1,217 @@
+"""
+module topology provides precomputed adjacency tables for the catan board.
+
+Every table is built once, from module hexgrid, when this module is first imported.
+Tables are immutable tuples. Tables keyed by tile are indexed by tile identifier (1-19).
+Tables keyed by node or edge are indexed directly by hexgrid coordinate, and have
+COORD_SPACE entries. Entries for coordinates which are not on the board are empty tuples
+(or -1, or 0, see each table).
+
+Tables:
+- TILE_IDS, TILE_COORDS, NODE_COORDS, EDGE_COORDS: all legal locations, sorted
+- TILE_ID_TO_COORD: tile id -> tile coord, -1 at index 0
+- TILE_COORD_TO_ID: tile coord -> tile id, 0 where there is no tile
+- NODES_TOUCHING_TILE, EDGES_TOUCHING_TILE: tile id -> coords, in hexgrid order
+- NODES_TOUCHING_EDGE: edge coord -> the 2 node coords on the edge
+- EDGES_TOUCHING_NODE: node coord -> the 2 or 3 edge coords meeting at the node
+- TILES_TOUCHING_NODE: node coord -> the 1 to 3 tile ids touching the node
+- NODES_ADJACENT_TO_NODE: node coord -> node coords one edge away
+- COASTAL_COORDS: (tile id, direction) pairs which lie on the coast, ie possible port locations
+- COASTAL_EDGES: edge coords on the coast
+- NODE_LOCATIONS, EDGE_LOCATIONS: coord -> display string, see hexgrid.location
+
+Bitmask tables, for bitboards over nodes and edges. Node bit i is NODE_COORDS[i], edge bit i
+is EDGE_COORDS[i]. Masks are python ints.
+- NODE_BITS, EDGE_BITS: coord -> the coord's single bit, 0 for coords not on the board
+- ALL_NODES_MASK, ALL_EDGES_MASK: every node, every edge
+- NODE_NEIGHBOURHOOD_MASKS: node coord -> the node and the nodes adjacent to it (distance rule)
+- NODE_EDGE_MASKS: node coord -> the edges meeting at the node
+- EDGE_NODE_MASKS: edge coord -> the 2 nodes on the edge
+
+Use the helper functions for lookups which may miss, eg a port on an arbitrary (tile, direction).
+"""
+import hexgrid
+
+# Size of the hexgrid coordinate space. Coordinates are two hexadecimal digits, see module hexgrid.
+COORD_SPACE = 0x100
+
+_TILE_DIRECTIONS = ('NW', 'W', 'SW', 'SE', 'E', 'NE')
+
+
+def _build_tables():
+    tile_ids = tuple(sorted(hexgrid.legal_tile_ids()))
+    tile_coords = tuple(sorted(hexgrid.legal_tile_coords()))
+    node_coords = tuple(sorted(hexgrid.legal_node_coords()))
+    edge_coords = tuple(sorted(hexgrid.legal_edge_coords()))
+
+    tile_id_to_coord = [-1] * (len(tile_ids) + 1)
+    tile_coord_to_id = [0] * COORD_SPACE
+    nodes_touching_tile = [tuple()] * (len(tile_ids) + 1)
+    edges_touching_tile = [tuple()] * (len(tile_ids) + 1)
+    for tile_id in tile_ids:
+        coord = hexgrid.tile_id_to_coord(tile_id)
+        tile_id_to_coord[tile_id] = coord
+        tile_coord_to_id[coord] = tile_id
+        nodes_touching_tile[tile_id] = tuple(hexgrid.nodes_touching_tile(tile_id))
+        edges_touching_tile[tile_id] = tuple(hexgrid.edges_touching_tile(tile_id))
+
+    nodes_touching_edge = [tuple()] * COORD_SPACE
+    edges_touching_node = [list() for _ in range(COORD_SPACE)]
+    nodes_adjacent_to_node = [list() for _ in range(COORD_SPACE)]
+    for edge in edge_coords:
+        a, b = hexgrid.nodes_touching_edge(edge)
+        nodes_touching_edge[edge] = (a, b)
+        edges_touching_node[a].append(edge)
+        edges_touching_node[b].append(edge)
+        nodes_adjacent_to_node[a].append(b)
+        nodes_adjacent_to_node[b].append(a)
+
+    tiles_touching_node = [list() for _ in range(COORD_SPACE)]
+    for tile_id in tile_ids:
+        for node in nodes_touching_tile[tile_id]:
+            tiles_touching_node[node].append(tile_id)
+
+    edge_in_direction = dict()
+    for tile_id in tile_ids:
+        for direction in _TILE_DIRECTIONS:
+            edge_in_direction[(tile_id, direction)] = hexgrid.edge_coord_in_direction(tile_id, direction)
+
+    coastal_coords = tuple(hexgrid.coastal_coords())
+    coastal_edges = tuple(sorted(set(edge_in_direction[coastal] for coastal in coastal_coords)))
+
+    node_locations = [None] * COORD_SPACE
+    for node in node_coords:
+        node_locations[node] = hexgrid.location(hexgrid.NODE, node)
+    edge_locations = [None] * COORD_SPACE
+    for edge in edge_coords:
+        edge_locations[edge] = hexgrid.location(hexgrid.EDGE, edge)
+
+    return (tile_ids, tile_coords, node_coords, edge_coords,
+            tuple(tile_id_to_coord), tuple(tile_coord_to_id),
+            tuple(nodes_touching_tile), tuple(edges_touching_tile),
+            tuple(nodes_touching_edge),
+            tuple(tuple(sorted(edges)) for edges in edges_touching_node),
+            tuple(tuple(tiles) for tiles in tiles_touching_node),
+            tuple(tuple(sorted(nodes)) for nodes in nodes_adjacent_to_node),
+            edge_in_direction, coastal_coords, coastal_edges,
+            tuple(node_locations), tuple(edge_locations))
+
+
+(TILE_IDS, TILE_COORDS, NODE_COORDS, EDGE_COORDS,
+ TILE_ID_TO_COORD, TILE_COORD_TO_ID,
+ NODES_TOUCHING_TILE, EDGES_TOUCHING_TILE,
+ NODES_TOUCHING_EDGE, EDGES_TOUCHING_NODE, TILES_TOUCHING_NODE, NODES_ADJACENT_TO_NODE,
+ _EDGE_IN_DIRECTION, COASTAL_COORDS, COASTAL_EDGES,
+ NODE_LOCATIONS, EDGE_LOCATIONS) = _build_tables()
+
+_TILE_ID_TO_COORD_MAP = {tile_id: TILE_ID_TO_COORD[tile_id] for tile_id in TILE_IDS}
+
+
+def _build_masks():
+    node_bits = [0] * COORD_SPACE
+    for i, node in enumerate(NODE_COORDS):
+        node_bits[node] = 1 << i
+    edge_bits = [0] * COORD_SPACE
+    for i, edge in enumerate(EDGE_COORDS):
+        edge_bits[edge] = 1 << i
+
+    node_neighbourhood_masks = [0] * COORD_SPACE
+    node_edge_masks = [0] * COORD_SPACE
+    for node in NODE_COORDS:
+        mask = node_bits[node]
+        for adjacent in NODES_ADJACENT_TO_NODE[node]:
+            mask |= node_bits[adjacent]
+        node_neighbourhood_masks[node] = mask
+        for edge in EDGES_TOUCHING_NODE[node]:
+            node_edge_masks[node] |= edge_bits[edge]
+    edge_node_masks = [0] * COORD_SPACE
+    for edge in EDGE_COORDS:
+        for node in NODES_TOUCHING_EDGE[edge]:
+            edge_node_masks[edge] |= node_bits[node]
+
+    return (tuple(node_bits), tuple(edge_bits),
+            (1 << len(NODE_COORDS)) - 1, (1 << len(EDGE_COORDS)) - 1,
+            tuple(node_neighbourhood_masks), tuple(node_edge_masks), tuple(edge_node_masks))
+
+
+(NODE_BITS, EDGE_BITS, ALL_NODES_MASK, ALL_EDGES_MASK,
+ NODE_NEIGHBOURHOOD_MASKS, NODE_EDGE_MASKS, EDGE_NODE_MASKS) = _build_masks()
+
+
+def node_coords_in_mask(mask):
+    """
+    :param mask: node bitmask, int
+    :return: the node coords whose bits are set, ascending, list(int)
+    """
+    coords = list()
+    while mask:
+        low = mask & -mask
+        coords.append(NODE_COORDS[low.bit_length() - 1])
+        mask ^= low
+    return coords
+
+
+def edge_coords_in_mask(mask):
+    """
+    :param mask: edge bitmask, int
+    :return: the edge coords whose bits are set, ascending, list(int)
+    """
+    coords = list()
+    while mask:
+        low = mask & -mask
+        coords.append(EDGE_COORDS[low.bit_length() - 1])
+        mask ^= low
+    return coords
+
+
+def tile_id_to_coord(tile_id):
+    """
+    Convert a tile identifier to its tile coordinate.
+
+    Like hexgrid.tile_id_to_coord, returns -1 for an unknown tile identifier (including None).
+
+    :param tile_id: tile identifier, int
+    :return: tile coordinate, int
+    """
+    return _TILE_ID_TO_COORD_MAP.get(tile_id, -1)
+
+
+def edge_coord_in_direction(tile_id, direction):
+    """
+    Returns the edge coordinate in the given direction at the given tile identifier.
+
+    Like hexgrid.edge_coord_in_direction, raises ValueError if there is no such edge.
+
+    :param tile_id: tile identifier, int
+    :param direction: direction, str
+    :return: edge coord, int
+    """
+    try:
+        return _EDGE_IN_DIRECTION[(tile_id, direction)]
+    except KeyError:
+        raise ValueError('No edge found in direction={} at tile_id={}'.format(direction, tile_id))
+
+
+def nodes_touching_port(port):
+    """
+    Returns the two node coordinates which give access to the given port.
+
+    :param port: catan.board.Port
+    :return: tuple of 2 node coordinates
+    """
+    return NODES_TOUCHING_EDGE[edge_coord_in_direction(port.tile_id, port.direction)]
+
+
+def location(hexgrid_type, coord):
+    """
+    Precomputed equivalent of hexgrid.location, used for display and for the catanlog.
+
+    :param hexgrid_type: hexgrid.TILE, hexgrid.NODE, hexgrid.EDGE
+    :param coord: integer coordinate, for tiles this is the tile identifier (like hexgrid.location)
+    :return: formatted string
+    """
+    if hexgrid_type == hexgrid.NODE and 0 <= coord < COORD_SPACE and NODE_LOCATIONS[coord] is not None:
+        return NODE_LOCATIONS[coord]
+    elif hexgrid_type == hexgrid.EDGE and 0 <= coord < COORD_SPACE and EDGE_LOCATIONS[coord] is not None:
+        return EDGE_LOCATIONS[coord]
+    return hexgrid.location(hexgrid_type, coord)
@@ -0,0 +1,257 @@
+"""
+module tournament plays many seeded self-play games across worker processes, to evaluate agents.
+
+Agents are named by import path, eg 'catan.sim:random_agent', so that worker processes can load
+them. A tournament has one agent per seat. Seats rotate from game to game, so that no agent
+keeps the first move.
+
+Each worker process loads the agents and makes one Game, which it resets for every game it
+plays, see sim.play. Games are handed out in chunks, and each game's result comes back as a
+compact record, a dict:
+- game: the game's number, from 0. With the tournament's seed it fixes the board, dice, steals
+  and agents' choices, see #game_rng
+- seats: the agent in each seat, as indexes into the tournament's agents, list(int)
+- winner: the winning agent's index, or None if the game ran out of turns
+- turns, actions: how long the game went on
+
+Records are appended to a JSON lines file as they come in, after a header record naming the
+tournament: {'tournament': {'seed', 'agents', 'games', 'max_turns'}}. Run again with the same
+file to resume: games already in it are not played again, and count toward the standings. A
+file written by a tournament with other settings is refused, rather than mixing the two.
+
+Standings are kept online as records arrive, see class Standings: each agent's win rate, with
+a Wilson score confidence interval.
+
+Run from the command line:
+    python -m catan.tournament mybot:agent catan.sim:random_agent catan.sim:random_agent \\
+        catan.sim:random_agent --games 10000 --out results.jsonl
+"""
+import argparse
+import collections
+import concurrent.futures
+import importlib
+import json
+import logging
+import math
+import os
+import sys
+import time
+
+import catan.game
+import catan.sim
+from catan import streams
+from catan.production import NUM_SEATS
+from catan.checkpoint import read_checkpoint
+
+# Games per task. Larger chunks cost less to hand out, smaller ones balance better at the end.
+CHUNK_SIZE = 16
+
+# z for a 95% confidence interval
+Z_95 = 1.959964
+
+
+class Standings(object):
+    """
+    class Standings aggregates game records into each agent's wins, as they arrive.
+    """
+    def __init__(self, agents):
+        """
+        :param agents: the agents' names, list(str)
+        """
+        self.agents = list(agents)
+        self.games = 0
+        self.unfinished = 0
+        self.turns = 0
+        self.actions = 0
+        self.wins = [0] * len(self.agents)
+
+    def add(self, record):
+        self.games += 1
+        self.turns += record['turns']
+        self.actions += record['actions']
+        if record['winner'] is None:
+            self.unfinished += 1
+        else:
+            self.wins[record['winner']] += 1
+
+    def win_rate(self, agent_idx):
+        """
+        :return: the agent's share of games won, float
+        """
+        return self.wins[agent_idx] / self.games if self.games else 0.0
+
+    def interval(self, agent_idx, z=Z_95):
+        """
+        :return: the Wilson score interval of the agent's win rate, (low, high)
+        """
+        return wilson_interval(self.wins[agent_idx], self.games, z)
+
+    def table(self):
+        """
+        :return: the standings as text, one line per agent
+        """
+        lines = list()
+        for idx, agent in enumerate(self.agents):
+            low, high = self.interval(idx)
+            lines.append('{:>2} {:<40} {:>7} wins  {:6.2%}  [{:6.2%}, {:6.2%}]'.format(
+                idx, agent, self.wins[idx], self.win_rate(idx), low, high))
+        lines.append('games={} unfinished={} turns={} actions={}'.format(
+            self.games, self.unfinished, self.turns, self.actions))
+        return '\n'.join(lines)
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """
+    Wilson score interval for a binomial proportion.
+
+    :param successes: int
+    :param trials: int
+    :param z: standard normal quantile, eg Z_95
+    :return: (low, high), each in [0, 1]. (0.0, 1.0) if there are no trials.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+def game_rng(seed, game):
+    """
+    :return: the rng for a game of a tournament, a child of the tournament's stream, streams.RandomStream
+    """
+    return streams.RandomStream(seed).spawn(game)
+
+
+def seating(game, num_agents=NUM_SEATS):
+    """
+    :return: the agent in each seat for the game, as indexes into the agents, list(int)
+    """
+    return [(seat + game) % num_agents for seat in range(num_agents)]
+
+
+def run(agents, num_games, out, seed=0, workers=None, max_turns=catan.sim.MAX_TURNS, progress=None):
+    """
+    Play a tournament across worker processes, appending each game's record to out.
+
+    :param agents: one agent per seat, as import paths 'module:name', list(str)
+    :param num_games: the tournament's size, int. Games already in out are not played again.
+    :param out: path to the JSON lines file of records, str. If it holds records of a tournament
+                with another seed, agents, size or max_turns, a ValueError is raised.
+    :param seed: the tournament's seed, int
+    :param workers: number of worker processes, int, default os.cpu_count()
+    :param max_turns: see sim.play
+    :param progress: called with Standings as records come in, or None
+    :return: Standings over every game in out
+    """
+    if len(agents) != NUM_SEATS:
+        raise ValueError('Expected {} agents, one per seat, got {}'.format(NUM_SEATS, len(agents)))
+    for agent in agents:
+        _load_agent(agent)  # fail here rather than in every worker
+    header = {'tournament': {'seed': seed, 'agents': list(agents), 'games': num_games, 'max_turns': max_turns}}
+    records = read_checkpoint(out)
+    if records and records[0] != header:
+        raise ValueError('{} holds another tournament, {}, not {}. Use another file.'.format(
+            out, records[0].get('tournament', 'without a header'), header['tournament']))
+    standings = Standings(agents)
+    done = set()
+    for record in records[1:]:
+        done.add(record['game'])
+        standings.add(record)
+    todo = [game for game in range(num_games) if game not in done]
+    chunks = collections.deque(todo[i:i + CHUNK_SIZE] for i in range(0, len(todo), CHUNK_SIZE))
+    workers = workers or os.cpu_count() or 1
+    with open(out, 'a') as out_file, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                   initargs=(agents, max_turns)) as pool:
+        if not records:
+            out_file.write(json.dumps(header, separators=(',', ':')) + '\n')
+        pending = set()
+        while chunks or pending:
+            while chunks and len(pending) < workers * 2:
+                pending.add(pool.submit(_play_games, seed, chunks.popleft()))
+            finished, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                for record in future.result():
+                    out_file.write(json.dumps(record, separators=(',', ':')) + '\n')
+                    standings.add(record)
+            out_file.flush()
+            if progress is not None:
+                progress(standings)
+    return standings
+
+
+# Set in each worker process by #_init_worker
+_agents = None
+_max_turns = None
+_game = None
+
+
+def _init_worker(agents, max_turns):
+    global _agents, _max_turns, _game
+    logging.disable(logging.CRITICAL)
+    _agents = [_load_agent(agent) for agent in agents]
+    _max_turns = max_turns
+    _game = catan.game.Game(logging='off')
+
+
+def _play_games(seed, games):
+    """
+    Play the games in this worker, reusing its Game.
+
+    :return: a record per game, list(dict)
+    """
+    records = list()
+    players = catan.game.Game.get_debug_players()
+    for game in games:
+        seats = seating(game, len(_agents))
+        result = catan.sim.play([_agents[idx] for idx in seats], game_rng(seed, game), players=players,
+                                max_turns=_max_turns, game=_game)
+        winner = None if result.winner is None else seats[result.winner.seat - 1]
+        records.append({'game': game, 'seats': seats, 'winner': winner,
+                        'turns': result.turns, 'actions': result.actions})
+    return records
+
+
+def _load_agent(path):
+    """
+    :param path: 'module:name', str
+    :return: the agent, callable
+    """
+    module, _, name = path.partition(':')
+    if not name:
+        raise ValueError('Expected an agent as module:name, got {!r}'.format(path))
+    return getattr(importlib.import_module(module), name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play a self-play tournament across worker processes.')
+    parser.add_argument('agents', nargs=NUM_SEATS, help='one agent per seat, as module:name')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='results.jsonl', help='JSON lines file of game records, and checkpoint')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, default one per cpu')
+    parser.add_argument('--max-turns', type=int, default=catan.sim.MAX_TURNS)
+    args = parser.parse_args(argv)
+
+    last = [0.0]
+
+    def progress(standings):
+        now = time.perf_counter()
+        if now - last[0] >= 1 or standings.games == args.games:
+            last[0] = now
+            sys.stderr.write('\r{}/{} games'.format(standings.games, args.games))
+            sys.stderr.flush()
+
+    start = time.perf_counter()
+    standings = run(args.agents, args.games, args.out, seed=args.seed, workers=args.workers,
+                    max_turns=args.max_turns, progress=progress)
+    sys.stderr.write('\n')
+    print(standings.table())
+    print('{:.1f}s'.format(time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
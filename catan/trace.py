@@ -0,0 +1,87 @@
+"""
+module trace provides structured trace points for the engine's hot paths.
+
+A trace point is a name and a few keyword fields, eg trace.record('set_state', now=..., was=...).
+Call sites guard it with __debug__ and the module switch, so while tracing is off (the default)
+a trace point costs one attribute check and formats nothing:
+
+    if __debug__ and catan.trace.enabled:
+        catan.trace.record('set_state', now=type(new).__name__, was=type(old).__name__)
+
+Under python -O, __debug__ is False and the compiler drops the trace point entirely, so tracing
+can't be enabled.
+
+While tracing is on, each record goes to logging.getLogger('catan.trace') at DEBUG, formatted
+lazily, and into the ring buffer if there is one. The ring buffer keeps the most recent records,
+for post-mortems:
+
+    catan.trace.enable(ring_size=1000)
+    ...
+    for timestamp, name, fields in catan.trace.recent():
+        print(timestamp, name, fields)
+
+Warnings and errors about illegal actions still go through logging directly, whether tracing
+is on or not.
+"""
+import collections
+import logging
+import time
+
+# Whether trace points record anything. Read it, but use #enable and #disable to change it.
+enabled = False
+
+# Default number of records kept by the ring buffer
+DEFAULT_RING_SIZE = 1000
+
+_logger = logging.getLogger('catan.trace')
+_ring = None
+
+
+def enable(ring_size=None):
+    """
+    Turn tracing on.
+
+    :param ring_size: keep this many of the most recent records for #recent, int. If None,
+                      records only go to the log.
+    """
+    global enabled, _ring
+    _ring = collections.deque(maxlen=ring_size) if ring_size else None
+    enabled = True
+
+
+def disable():
+    """
+    Turn tracing off. The ring buffer is kept, so it can still be read with #recent.
+    """
+    global enabled
+    enabled = False
+
+
+def record(name, **fields):
+    """
+    Record a trace point. Call sites should only call this if #enabled.
+
+    :param name: what happened, str
+    :param fields: what it happened to, shown with repr
+    """
+    if _ring is not None:
+        _ring.append((time.time(), name, fields))
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug('%s %s', name, fields)
+
+
+def recent():
+    """
+    :return: the ring buffer's records, oldest first, list((timestamp, name, fields))
+    """
+    if _ring is None:
+        return list()
+    return list(_ring)
+
+
+def clear():
+    """
+    Empty the ring buffer.
+    """
+    if _ring is not None:
+        _ring.clear()
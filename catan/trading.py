@@ -1,5 +1,7 @@
-import logging
-from collections import Counter
+import functools
+
+import catan.board
+from catan import resources
 
 
 class CatanTrade(object):
@@ -16,13 +18,31 @@ class CatanTrade(object):
 
     Resources cannot be removed from the trade. If you want this functionality,
     delete the trade and build a new one instead.
+
+    The resources in each direction are stored as count vectors, see module resources.
     """
     def __init__(self, giver=None, getter=None):
-        self._give = list()
-        self._get = list()
+        self._give = resources.empty()
+        self._get = resources.empty()
         self._giver = giver
         self._getter = getter
 
+    @classmethod
+    def from_vectors(cls, giver, getter, give, get):
+        """
+        Build a trade from count vectors.
+
+        :param giver: the giver, usually a Player
+        :param getter: the getter, a Player or a Port
+        :param give: count vector from giver->getter
+        :param get: count vector from getter->giver
+        :return: CatanTrade
+        """
+        trade = cls(giver, getter)
+        trade._give += give
+        trade._get += get
+        return trade
+
     def give(self, terrain, num=1):
         """
         Add a certain number of resources to the trade from giver->getter
@@ -30,9 +50,7 @@ class CatanTrade(object):
         :param num: number to add, int
         :return: None
         """
-        for _ in range(num):
-            logging.debug('terrain={}'.format(terrain))
-            self._give.append(terrain)
+        self._give[resources.index(terrain)] += num
 
     def get(self, terrain, num=1):
         """
@@ -41,9 +59,7 @@ class CatanTrade(object):
         :param num: number to add, int
         :return: None
         """
-        for _ in range(num):
-            logging.debug('terrain={}'.format(terrain))
-            self._get.append(terrain)
+        self._get[resources.index(terrain)] += num
 
     def giver(self):
         return self._giver
@@ -58,9 +74,7 @@ class CatanTrade(object):
 
         :return: eg [(2, Terrain.wood), (1, Terrain.brick)]
         """
-        logging.debug('give={}'.format(self._give))
-        c = Counter(self._give.copy())
-        return [(n, t) for t, n in c.items()]
+        return resources.to_pairs(self._give)
 
     def getting(self):
         """
@@ -69,17 +83,84 @@ class CatanTrade(object):
 
         :return: eg [(2, Terrain.wood), (1, Terrain.brick)]
         """
-        c = Counter(self._get.copy())
-        return [(n, t) for t, n in c.items()]
+        return resources.to_pairs(self._get)
+
+    def giving_vector(self):
+        """
+        :return: count vector of the resources from giver->getter. Do not modify it.
+        """
+        return self._give
+
+    def getting_vector(self):
+        """
+        :return: count vector of the resources from getter->giver. Do not modify it.
+        """
+        return self._get
 
     def num_giving(self):
-        return len(self._give)
+        return int(self._give.sum())
 
     def num_getting(self):
-        return len(self._get)
+        return int(self._get.sum())
 
     def set_giver(self, giver):
         self._giver = giver
 
     def set_getter(self, getter):
         self._getter = getter
+
+
+# _GIVE_VECTORS[ratio][i] is ratio of resource i, for each possible trade ratio
+_GIVE_VECTORS = {ratio: tuple(resources._frozen(ratio * unit) for unit in resources.UNITS)
+                 for ratio in (2, 3, 4)}
+
+
+def maritime_trades(hand, ratios):
+    """
+    Every trade with the bank or a port that a hand can afford right now.
+
+    The give and get vectors are shared and read-only. Results are cached by which resources
+    are affordable at which ratio, so repeated calls from a search loop cost a few comparisons.
+
+    :param hand: count vector
+    :param ratios: best trade ratio for each resource, see Board.get_trade_ratios
+    :return: tuple of (give vector, get vector, ratio)
+    """
+    offers = tuple(ratio if count >= ratio else 0 for count, ratio in zip(hand.tolist(), ratios))
+    return _maritime_trades(offers)
+
+
+@functools.lru_cache(maxsize=None)
+def _maritime_trades(offers):
+    """
+    :param offers: for each resource, the ratio it can be traded at, or 0 if it can't be traded
+    """
+    trades = list()
+    for give_idx, ratio in enumerate(offers):
+        if not ratio:
+            continue
+        give = _GIVE_VECTORS[ratio][give_idx]
+        for get_idx, get in enumerate(resources.UNITS):
+            if get_idx != give_idx:
+                trades.append((give, get, ratio))
+    return tuple(trades)
+
+
+def maritime_trade(player, give, get, ratio):
+    """
+    Build the CatanTrade for a trade returned by #maritime_trades, to pass to Game.trade.
+
+    :param player: the giver, Player
+    :param give: count vector
+    :param get: count vector
+    :param ratio: trade ratio, int
+    :return: CatanTrade
+    """
+    if ratio == 2:
+        resource = catan.board.RESOURCES[int(give.argmax())]
+        port_type = catan.board.PortType(resource.value)
+    elif ratio == 3:
+        port_type = catan.board.PortType.any3
+    else:
+        port_type = catan.board.PortType.any4
+    return CatanTrade.from_vectors(player, catan.board.Port(None, None, port_type), give, get)
@@ -0,0 +1,160 @@
+"""
+module validate checks archives of catanlog files for legality, replaying them in parallel.
+
+Each file is replayed by replay.Replayer with validate=True, in a pool of worker processes, one
+file per task. Each file gets a compact verdict, a dict:
+- file: the file's path
+- verdict: 'legal', 'illegal' (an action broke the rules), or 'malformed' (the log can't be read)
+- events, turns: how far the replay got
+- rule, line, error: for illegal and malformed files, what went wrong and where
+- seconds: time taken to replay the file
+
+Verdicts are appended to a JSON lines file as they come back, which is also the checkpoint: run
+again with the same output file and the files already in it are skipped.
+
+Run from the command line:
+    python -m catan.validate log/ --out verdicts.jsonl --workers 8
+"""
+import argparse
+import collections
+import concurrent.futures
+import json
+import logging
+import os
+import sys
+import time
+
+from catan import replay
+from catan.checkpoint import read_checkpoint
+
+# Tasks kept queued per worker, so the pool never waits for the parent to submit more
+TASKS_PER_WORKER = 4
+
+
+def validate_file(path):
+    """
+    Replay one catanlog, checking every action.
+
+    :param path: path to a .catan log, str
+    :return: the file's verdict, dict, see the module docstring
+    """
+    start = time.perf_counter()
+    verdict = {'file': path, 'verdict': 'legal', 'events': 0, 'turns': 0}
+    replayer = None
+    try:
+        replayer = replay.Replayer(path, validate=True)
+        for _ in replayer:
+            pass
+    except replay.IllegalActionError as e:
+        verdict.update(verdict='illegal', rule=e.rule, line=e.line, error=str(e))
+    except Exception as e:
+        verdict.update(verdict='malformed', error='{}: {}'.format(type(e).__name__, e))
+    finally:
+        if replayer is not None:
+            verdict.update(events=replayer.events, turns=replayer.game._cur_turn)
+            replayer.close()
+    verdict['seconds'] = round(time.perf_counter() - start, 6)
+    return verdict
+
+
+def validate_archive(paths, out, workers=None, progress=None):
+    """
+    Validate many catanlogs in a process pool, appending each file's verdict to out as it
+    comes back. Files which already have a verdict in out are skipped.
+
+    :param paths: paths to .catan logs, iterable(str)
+    :param out: path to the JSON lines file of verdicts, str
+    :param workers: number of worker processes, int, default os.cpu_count()
+    :param progress: called with (done, total, counts) as verdicts come back, where counts is a
+                     Counter of verdicts so far, or None
+    :return: summary stats over every verdict in out, dict, see #summarize, with the time taken
+             and files and events per second over the files validated in this run
+    """
+    verdicts = read_checkpoint(out)
+    done = {verdict['file'] for verdict in verdicts}
+    todo = collections.deque(path for path in paths if path not in done)
+    total = len(verdicts) + len(todo)
+    counts = collections.Counter(verdict['verdict'] for verdict in verdicts)
+    workers = workers or os.cpu_count() or 1
+    resumed = len(verdicts)
+    start = time.perf_counter()
+    with open(out, 'a') as out_file, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        while todo or pending:
+            while todo and len(pending) < workers * TASKS_PER_WORKER:
+                pending.add(pool.submit(validate_file, todo.popleft()))
+            finished, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                verdict = future.result()
+                out_file.write(json.dumps(verdict, sort_keys=True) + '\n')
+                verdicts.append(verdict)
+                counts[verdict['verdict']] += 1
+            out_file.flush()
+            if progress is not None:
+                progress(len(verdicts), total, counts)
+    elapsed = time.perf_counter() - start
+    summary = summarize(verdicts)
+    if elapsed:
+        summary['elapsed'] = round(elapsed, 3)
+        summary['files_per_second'] = round((len(verdicts) - resumed) / elapsed, 1)
+        summary['events_per_second'] = round(sum(verdict['events'] for verdict in verdicts[resumed:]) / elapsed, 1)
+    return summary
+
+
+def summarize(verdicts):
+    """
+    :param verdicts: list(dict)
+    :return: dict with the number of files, the count of each verdict and of each broken rule,
+             and total events and turns
+    """
+    summary = {
+        'files': len(verdicts),
+        'verdicts': dict(collections.Counter(verdict['verdict'] for verdict in verdicts)),
+        'rules': dict(collections.Counter(verdict['rule'] for verdict in verdicts if 'rule' in verdict)),
+        'events': sum(verdict['events'] for verdict in verdicts),
+        'turns': sum(verdict['turns'] for verdict in verdicts),
+    }
+    return summary
+
+
+def _init_worker():
+    # the engine logs a warning for each illegal action, which the verdict already reports
+    logging.disable(logging.CRITICAL)
+
+
+def _find_logs(targets):
+    for target in targets:
+        if os.path.isdir(target):
+            for root, _, files in os.walk(target):
+                for name in sorted(files):
+                    if name.endswith('.catan'):
+                        yield os.path.join(root, name)
+        else:
+            yield target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check catanlog files for legality, in parallel.')
+    parser.add_argument('targets', nargs='+', help='.catan files, or directories to search for them')
+    parser.add_argument('--out', default='verdicts.jsonl', help='JSON lines file of verdicts, and checkpoint')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, default one per cpu')
+    args = parser.parse_args(argv)
+
+    last = [0.0]
+
+    def progress(done, total, counts):
+        now = time.perf_counter()
+        if now - last[0] >= 1 or done == total:
+            last[0] = now
+            sys.stderr.write('\r{}/{} files, {}'.format(done, total, dict(counts)))
+            sys.stderr.flush()
+
+    summary = validate_archive(list(_find_logs(args.targets)), args.out, args.workers, progress)
+    sys.stderr.write('\n')
+    print(json.dumps(summary, sort_keys=True))
+    return 0 if summary['verdicts'].get('legal', 0) == summary['files'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
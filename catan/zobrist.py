@@ -0,0 +1,104 @@
+"""
+module zobrist provides Zobrist hashing of catan positions, for transposition tables.
+
+Every (piece type, owner seat, coordinate) has a 64-bit key, and so does every value of the
+game's state, dev card state, current player, turn and robber tile. A position's hash is the
+XOR of the keys of everything in it.
+
+The board's part of the hash, Board.zobrist, is kept up to date by Board._set_piece as pieces
+change: placing a piece XORs its key in, removing it XORs it back out. Undo goes through the
+same path, so it restores the hash too. The game's part is a handful of key lookups, see
+#game_key. Game.zobrist_hash combines the two.
+
+Keys are derived from SEED with blake2b, so they are the same in every process and run.
+Hands, dev cards held, and the score ledger are not part of the hash.
+"""
+import hashlib
+
+from catan.pieces import PieceType
+from catan.topology import COORD_SPACE
+
+SEED = b'catan-zobrist'
+
+# Players sit in seats [1,4]. Pieces without an owner, ie the robber, use seat 0.
+_NUM_OWNER_SEATS = 5
+
+
+def key(*labels):
+    """
+    :param labels: anything with a stable repr, eg str and int
+    :return: the 64-bit key for the labels, int
+    """
+    digest = hashlib.blake2b(repr(labels).encode('utf8'), digest_size=8, key=SEED).digest()
+    return int.from_bytes(digest, 'little')
+
+
+# (PieceType, owner seat) -> keys indexed by coordinate
+_PIECE_KEYS = {(piece_type, seat): tuple(key('piece', piece_type.value, seat, coord)
+                                         for coord in range(COORD_SPACE))
+               for piece_type in PieceType
+               for seat in range(_NUM_OWNER_SEATS)}
+
+_label_keys = dict()
+
+
+def piece_key(coord, piece):
+    """
+    :param coord: coordinate, int
+    :param piece: Piece, or None
+    :return: the key of the piece at the coordinate, or 0 for no piece, int
+    """
+    if piece is None:
+        return 0
+    seat = piece.owner.seat if piece.owner is not None else 0
+    return _PIECE_KEYS[piece.type, seat][coord]
+
+
+def label_key(*labels):
+    """
+    Cached #key.
+    """
+    try:
+        return _label_keys[labels]
+    except KeyError:
+        _label_keys[labels] = key(*labels)
+        return _label_keys[labels]
+
+
+def game_key(game):
+    """
+    The game's part of the hash: its state, dev card state, current player, turn and robber tile.
+
+    States are told apart by class, and by the piece type being placed or the road builder
+    roads placed so far, where they have them.
+
+    :param game: Game
+    :return: int
+    """
+    # not getattr, GameState.__getattr__ makes up a method for any missing attribute
+    state_fields = vars(game.state)
+    piece_type = state_fields.get('piece_type')
+    h = label_key('state', type(game.state).__name__,
+                  piece_type.value if piece_type is not None else None,
+                  tuple(state_fields.get('edges', ())))
+    h ^= label_key('dev_card_state', type(game.dev_card_state).__name__)
+    if game._cur_player is not None:
+        h ^= label_key('cur_player', game._cur_player.seat)
+    h ^= label_key('turn', game._cur_turn)
+    h ^= label_key('robber_tile', game.robber_tile)
+    return h
+
+
+def board_key(board):
+    """
+    The board's part of the hash, computed from scratch. Board.zobrist should always equal it.
+
+    :param board: Board
+    :return: int
+    """
+    h = 0
+    for array in board._piece_arrays:
+        for coord, piece in enumerate(array):
+            if piece is not None:
+                h ^= piece_key(coord, piece)
+    return h
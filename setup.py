@@ -24,6 +24,7 @@ setup(name="catan",
           'hexgrid',
           'catanlog',
           'undoredo',
+          'numpy',
       ],
 	)
 